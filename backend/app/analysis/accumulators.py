@@ -0,0 +1,326 @@
+import os
+import numpy as np
+
+# KLL 분위수 스케치 정확도 파라미터 (클수록 정확하고 스케치가 커짐)
+QUANTILE_SKETCH_K = int(os.environ.get("QUANTILE_SKETCH_K", "200"))
+# 레벨별 최소 용량과 아래 레벨로 갈수록 줄어드는 용량 비율
+KLL_MIN_CAPACITY = 8
+KLL_CAPACITY_RATIO = 2 / 3
+
+class MomentAccumulator:
+    """개수/평균/분산/최솟값/최댓값을 청크 단위로 누적하는 온라인 집계기
+
+    청크별 통계량을 Chan 등의 병합 공식으로 합치므로 전체 데이터를
+    메모리에 올리지 않고도 pandas의 mean/std/min/max와 같은 값을 얻는다.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, values):
+        """결측치를 제외한 값 배열로 누적"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        self._merge(n, mean, m2, values.min(), values.max())
+
+    def add_constant(self, value, n):
+        """같은 값을 n개 추가 (결측치 대체용)"""
+        if n > 0 and not np.isnan(value):
+            self._merge(n, float(value), 0.0, value, value)
+
+    def _merge(self, n, mean, m2, vmin, vmax):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = vmin if np.isnan(self.min) else min(self.min, vmin)
+        self.max = vmax if np.isnan(self.max) else max(self.max, vmax)
+
+    def get_mean(self):
+        return self.mean if self.count > 0 else np.nan
+
+    def get_std(self, ddof=1):
+        return np.sqrt(self.m2 / (self.count - ddof)) if self.count > ddof else np.nan
+
+
+class ValueCounter:
+    """값별 빈도를 누적하여 정확한 중앙값/분위수를 계산하는 집계기
+
+    메모리 사용량은 행 수가 아니라 서로 다른 값의 개수에 비례한다.
+    혈당치처럼 정수(또는 소수 한 자리)로 기록되는 측정값에서는 수백 개 수준이다.
+    서로 다른 값이 max_distinct를 넘으면 resolution 단위로 반올림하여 근사한다.
+    """
+
+    def __init__(self, max_distinct=200_000, resolution=0.1):
+        self.max_distinct = max_distinct
+        self.resolution = resolution
+        self.rounded = False
+        self.values = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        if self.rounded:
+            values = self._round(values)
+        uniq, cnt = np.unique(values, return_counts=True)
+        self._merge(uniq, cnt)
+        if not self.rounded and len(self.values) > self.max_distinct:
+            self.rounded = True
+            self._merge(np.empty(0), np.empty(0, dtype=np.int64), rebin=True)
+
+    def add_constant(self, value, n):
+        if n > 0 and not np.isnan(value):
+            value = self._round(np.array([value])) if self.rounded else np.array([value])
+            self._merge(value, np.array([n], dtype=np.int64))
+
+    def _round(self, values):
+        return np.round(values / self.resolution) * self.resolution
+
+    def _merge(self, uniq, cnt, rebin=False):
+        values = np.concatenate([self.values, uniq])
+        counts = np.concatenate([self.counts, cnt])
+        if rebin:
+            values = self._round(values)
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(self.values)).astype(np.int64)
+
+    def quantile(self, q):
+        """pandas 기본값(linear 보간)과 같은 방식의 분위수"""
+        n = self.total
+        if n == 0:
+            return np.nan
+        pos = q * (n - 1)
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        cum = np.cumsum(self.counts)
+        v_lo = self.values[np.searchsorted(cum, lo, side='right')]
+        v_hi = self.values[np.searchsorted(cum, hi, side='right')]
+        return v_lo + (v_hi - v_lo) * (pos - lo)
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class WeightedHistogram:
+    """resolution 격자로 반올림한 값별 가중치 합계를 누적하는 가중 분위수 집계기
+
+    정렬 없이 bincount로 누적하므로 청크 크기에 비례하는 시간만 걸리고,
+    메모리 사용량은 값의 범위를 resolution으로 나눈 칸 수에 비례한다.
+    분위수 오차는 resolution의 절반 이하다 (정수나 소수 한 자리로 기록된 측정값은 정확).
+    """
+
+    def __init__(self, resolution=0.1):
+        self.resolution = resolution
+        self.offset = 0
+        self.weights = np.zeros(0)
+
+    @property
+    def total(self):
+        return float(self.weights.sum())
+
+    def update(self, values, weights):
+        """결측치와 가중치가 0 이하인 행을 제외하고 누적"""
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        keep = ~np.isnan(values) & (weights > 0)
+        if not keep.any():
+            return
+        keys = np.rint(values[keep] / self.resolution).astype(np.int64)
+        lo = int(keys.min())
+        sums = np.bincount(keys - lo, weights=weights[keep])
+        self._add(lo, sums)
+
+    def add_constant(self, value, weight):
+        """value에 가중치 weight 추가 (결측치 대체용)"""
+        if weight > 0 and not np.isnan(value):
+            self._add(int(np.rint(value / self.resolution)), np.array([float(weight)]))
+
+    def _add(self, lo, sums):
+        if len(self.weights) == 0:
+            self.offset, self.weights = lo, sums.astype(np.float64)
+            return
+        start = min(self.offset, lo)
+        end = max(self.offset + len(self.weights), lo + len(sums))
+        if start != self.offset or end != self.offset + len(self.weights):
+            expanded = np.zeros(end - start)
+            expanded[self.offset - start:self.offset - start + len(self.weights)] = self.weights
+            self.offset, self.weights = start, expanded
+        self.weights[lo - self.offset:lo - self.offset + len(sums)] += sums
+
+    def quantile(self, q):
+        """가중 경험분포의 역함수로 구한 분위수 (누적 가중치 비율이 처음으로 q 이상이 되는 값)"""
+        if len(self.weights) == 0:
+            return np.nan
+        cum = np.cumsum(self.weights)
+        index = min(np.searchsorted(cum, q * cum[-1], side='left'), len(cum) - 1)
+        # 격자 값의 부동소수점 오차(예: 18.400000000000002) 제거
+        return round((self.offset + index) * self.resolution, 10)
+
+
+class QuantileSketch:
+    """병합 가능한 KLL 분위수 스케치 (Karnin, Lang, Liberty 2016)
+
+    레벨 h에 보관한 값은 원래 값 2^h개를 대표한다. 레벨이 용량을 넘으면 정렬한 뒤
+    하나 건너 하나(시작 위치는 무작위)를 다음 레벨로 올리는 압축을 반복하므로,
+    보관하는 값은 약 3k개 + 레벨 수 수준으로 행 수와 관계없이 거의 일정하다.
+    순위 오차는 k에만 의존하며(정규화 순위 오차 약 2.3/k^0.97, 99% 확률), 전체 행 수가
+    레벨 0 용량 이하이면 정확하다. 최솟값과 최댓값은 정확히 보관한다.
+    같은 k의 스케치는 merge()로 합칠 수 있고 합친 결과도 같은 오차 한계를 가진다.
+    """
+
+    def __init__(self, k=QUANTILE_SKETCH_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def rank_error(k=QUANTILE_SKETCH_K):
+        """k에 대한 정규화 순위 오차 한계 (99% 확률, 분위수 하나 기준)"""
+        return 2.296 / k ** 0.9723
+
+    def update(self, values):
+        """결측치를 제외한 값 배열로 누적"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._extend(0, values, values.min(), values.max(), len(values))
+        self._compress()
+
+    def add_constant(self, value, n):
+        """같은 값을 n개 추가 (결측치 대체용, n의 이진 표현대로 각 레벨에 하나씩 넣음)"""
+        if n <= 0 or np.isnan(value):
+            return
+        n = int(n)
+        for level in range(n.bit_length()):
+            if n >> level & 1:
+                self._extend(level, np.array([float(value)]), value, value, 1 << level)
+        self._compress()
+
+    def merge(self, other):
+        """같은 k의 다른 스케치를 병합"""
+        if other.k != self.k:
+            raise ValueError("k가 다른 분위수 스케치는 병합할 수 없습니다.")
+        if other.n:
+            for level, items in enumerate(other.levels):
+                self._extend(level, items, other.min, other.max, 0)
+            self.n += other.n
+            self._compress()
+        return self
+
+    def copy(self):
+        return QuantileSketch.from_dict(self.to_dict())
+
+    def _extend(self, level, items, vmin, vmax, n):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += n
+        self.min = vmin if np.isnan(self.min) else min(self.min, vmin)
+        self.max = vmax if np.isnan(self.max) else max(self.max, vmax)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(KLL_MIN_CAPACITY, int(np.ceil(self.k * KLL_CAPACITY_RATIO ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # 홀수 개면 하나는 같은 레벨에 남김 (남긴 값은 순위를 바꾸지 않음)
+                odd = len(items) % 2
+                promoted = items[odd + self._rng.integers(2)::2]
+                self.levels[level] = items[:odd]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def _sorted(self):
+        """보관한 값(오름차순)과 누적 가중치"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """가중 경험분포의 역함수로 구한 분위수 (q는 스칼라 또는 배열, 0과 1은 정확한 최솟값/최댓값)"""
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        values, cum = self._sorted()
+        index = np.searchsorted(cum, q * self.n, side='left').clip(max=len(values) - 1)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, values[index]))
+        return result if q.ndim else float(result)
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def histogram(self, edges):
+        """edges 구간([e_i, e_i+1), 마지막 구간은 최댓값 포함)별 추정 개수"""
+        edges = np.asarray(edges, dtype=np.float64)
+        if self.n == 0:
+            return np.zeros(len(edges) - 1)
+        values, cum = self._sorted()
+        cum = np.concatenate([[0.0], cum])
+        below = cum[np.searchsorted(values, edges, side='left')]
+        below[-1] = cum[np.searchsorted(values, edges[-1], side='right')]
+        return np.diff(below)
+
+    def describe(self, quantiles, bins=None):
+        """행 수, 최솟값/최댓값, 분위수({q: 값})와 (bins가 주어지면) 최솟값~최댓값 등간격 히스토그램"""
+        result = {
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'quantiles': dict(zip((str(q) for q in quantiles), np.atleast_1d(self.quantile(quantiles)).tolist())),
+        }
+        if bins:
+            edges = np.linspace(self.min, self.max, bins + 1) if self.n else np.zeros(bins + 1)
+            result['histogram'] = {
+                'edges': edges.tolist(),
+                'counts': np.rint(self.histogram(edges)).astype(np.int64).tolist(),
+            }
+        return result
+
+    def to_dict(self):
+        """JSON으로 저장/전송 가능한 형태"""
+        return {
+            'k': self.k,
+            'n': self.n,
+            'min': self.min,
+            'max': self.max,
+            'levels': [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        # 압축 위치를 정하는 난수는 누적 행 수로 시드를 정해 같은 입력이면 같은 결과가 나오도록 함
+        sketch = cls(data['k'], seed=data['n'])
+        sketch.n = data['n']
+        sketch.min = np.nan if data['min'] is None else data['min']
+        sketch.max = np.nan if data['max'] is None else data['max']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data['levels']]
+        return sketch
+
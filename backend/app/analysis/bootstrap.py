@@ -0,0 +1,127 @@
+import os
+import numpy as np
+
+# 부트스트랩 신뢰구간 모듈
+# 재표본마다 pandas로 다시 적합하지 않고, multinomial 가중치 행렬과 행별 교차곱의 행렬곱으로
+# 모든 재표본의 가중 Gram 행렬(평균과 중심화 교차곱)을 한 번에 구한 뒤
+# 상관계수와 회귀계수를 재표본 축으로 벡터화해 계산한다.
+
+# 기본 반복 수 (0이면 신뢰구간을 계산하지 않음), 시드, 신뢰수준
+BOOTSTRAP_REPLICATES = int(os.environ.get("BOOTSTRAP_REPLICATES", "0"))
+BOOTSTRAP_SEED = int(os.environ.get("BOOTSTRAP_SEED", "0"))
+BOOTSTRAP_CONFIDENCE = float(os.environ.get("BOOTSTRAP_CONFIDENCE", "0.95"))
+# API로 요청할 수 있는 최대 반복 수
+BOOTSTRAP_MAX_REPLICATES = int(os.environ.get("BOOTSTRAP_MAX_REPLICATES", "10000"))
+
+# 가중치 행렬 크기 상한 (재표본 수 × 행 수, 이보다 크면 행을 나눠 누적)
+BOOTSTRAP_MAX_WEIGHT_CELLS = int(os.environ.get("BOOTSTRAP_MAX_WEIGHT_CELLS", "4000000"))
+# 재표본 묶음 크기: 묶음마다 SeedSequence의 자식 시드를 하나씩 사용하므로
+# 프로세스 수와 관계없이 (시드, 반복 수)가 같으면 결과가 같다
+BOOTSTRAP_BLOCK = 100
+# 실행기(프로세스 풀)가 주어지고 재표본 수 × 행 수가 이 값 이상이면 묶음을 여러 프로세스에 나눠 계산
+BOOTSTRAP_PARALLEL_MIN_WORK = int(os.environ.get("BOOTSTRAP_PARALLEL_MIN_WORK", "50000000"))
+BOOTSTRAP_WORKERS = max(1, int(os.environ.get("BOOTSTRAP_WORKERS", str(os.cpu_count() or 1))))
+
+
+def resampled_moments(values, replicates, seed):
+    """values (n, k)의 복원추출 재표본별 평균 (B, k)과 중심화 교차곱 행렬 (B, k, k)
+
+    재표본은 multinomial(n, 1/n) 가중치 w로 표현하고 Σ w_i z_i, Σ w_i z_i z_i'를
+    (B, 행) 가중치 행렬과 (행, 변수) 행렬의 곱으로 구한다. 수치 안정성을 위해
+    전체 평균으로 중심화한 값 z를 사용한다.
+    가중치 행렬이 BOOTSTRAP_MAX_WEIGHT_CELLS를 넘지 않도록 행을 구간으로 나누고,
+    각 구간의 추출 수를 남은 추출 수의 이항분포로 정한 뒤 구간 안에서 다시 나누므로
+    전체 (B, n) 가중치를 한 번에 만든 것과 같은 분포다.
+    """
+    rng = np.random.default_rng(seed)
+    n, k = values.shape
+    center = values.mean(axis=0)
+    z = values - center
+    upper = np.triu_indices(k)
+
+    rows = max(1, BOOTSTRAP_MAX_WEIGHT_CELLS // replicates)
+    owners = np.arange(replicates)
+    sums = np.zeros((replicates, k))
+    cross = np.zeros((replicates, len(upper[0])))
+    remaining = np.full(replicates, n, dtype=np.int64)
+    for start in range(0, n, rows):
+        block = z[start:start + rows]
+        size = len(block)
+        left = n - start
+        taken = remaining if size == left else rng.binomial(remaining, size / left)
+        remaining = remaining - taken
+        draws = rng.integers(0, size, taken.sum()) + np.repeat(owners * size, taken)
+        weights = np.bincount(draws, minlength=replicates * size).reshape(replicates, size).astype(np.float64)
+        sums += weights @ block
+        cross += weights @ (block[:, upper[0]] * block[:, upper[1]])
+
+    shift = sums / n
+    comoment = np.empty((replicates, k, k))
+    comoment[:, upper[0], upper[1]] = cross
+    comoment[:, upper[1], upper[0]] = cross
+    comoment -= n * shift[:, :, None] * shift[:, None, :]
+    return center + shift, comoment
+
+
+def _moments_blocks(values, blocks):
+    """(반복 수, 시드) 묶음들을 순서대로 계산해 이어 붙임 (프로세스 풀에서도 호출)"""
+    results = [resampled_moments(values, size, seed) for size, seed in blocks]
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def bootstrap_moments(values, replicates, seed=BOOTSTRAP_SEED, executor=None, max_workers=None):
+    """replicates개 재표본의 평균과 중심화 교차곱 (BOOTSTRAP_BLOCK개씩 독립 시드로 계산)
+
+    executor(concurrent.futures 실행기)가 주어지고 계산량이 충분히 크면
+    묶음을 max_workers개(기본 BOOTSTRAP_WORKERS)로 나눠 executor에서 계산한다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    children = np.random.SeedSequence(seed).spawn(-(-replicates // BOOTSTRAP_BLOCK))
+    blocks = [
+        (min(BOOTSTRAP_BLOCK, replicates - i * BOOTSTRAP_BLOCK), child)
+        for i, child in enumerate(children)
+    ]
+
+    workers = min(max_workers or BOOTSTRAP_WORKERS, len(blocks))
+    if executor is None or workers <= 1 or replicates * len(values) < BOOTSTRAP_PARALLEL_MIN_WORK:
+        return _moments_blocks(values, blocks)
+
+    # 묶음을 프로세스별로 연속 구간으로 나눠 결과 순서를 유지
+    step = -(-len(blocks) // workers)
+    futures = [
+        executor.submit(_moments_blocks, values, blocks[i:i + step])
+        for i in range(0, len(blocks), step)
+    ]
+    results = [future.result() for future in futures]
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def percentile_interval(estimates, confidence=BOOTSTRAP_CONFIDENCE):
+    """재표본 추정값 (B, m)의 백분위수 신뢰구간 (하한 (m,), 상한 (m,))
+
+    재표본에서 정의되지 않은 값(예: 분산이 0인 변수의 상관계수)은 제외한다.
+    """
+    tail = (1 - confidence) / 2 * 100
+    with np.errstate(invalid='ignore'):
+        lower, upper = np.nanpercentile(estimates, [tail, 100 - tail], axis=0)
+    return lower, upper
+
+
+def correlation_estimates(comoment, target):
+    """재표본별 target 변수와 각 변수의 Pearson 상관계수 (B, k)"""
+    variance = np.diagonal(comoment, axis1=1, axis2=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return comoment[:, target, :] / np.sqrt(variance[:, target, None] * variance)
+
+
+def ols_estimates(mean, comoment, features, target):
+    """재표본별 OLS 계수 (B, 1 + 독립변수 수, 첫 열은 상수항)
+
+    SufficientStats.ols()와 같이 중심화 교차곱으로 정규방정식을 풀고(특이 행렬은 의사역행렬)
+    상수항은 평균으로 복원한다.
+    """
+    sxx = comoment[:, features][:, :, features]
+    sxy = comoment[:, features, target]
+    beta = np.einsum('bij,bj->bi', np.linalg.pinv(sxx), sxy)
+    intercept = mean[:, target] - np.einsum('bi,bi->b', beta, mean[:, features])
+    return np.column_stack([intercept, beta])
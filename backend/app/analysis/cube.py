@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+from app.analysis.kernels import BMI_EDGES
+from app.preprocessing.health_data_processor import GLUCOSE_BINS, GLUCOSE_LABELS, WEIGHT_COLUMN
+
+# 집계 큐브 모듈
+# 카디널리티가 낮은 차원(학년×성별×혈당수준×BMI구간×주3회이상운동)의 모든 조합별 행 수와
+# 측정값 합계를 밀집 배열로 누적해 분석 결과와 함께 저장한다. 대시보드의 필터/그룹 질의는
+# 원본 행을 다시 읽지 않고 배열 인덱싱과 축 합계만으로 답한다.
+
+# 값이 없거나 수준 목록에 없는 값을 모으는 칸 (각 차원의 마지막 칸)
+MISSING_LABEL = '결측'
+
+# 차원 이름: 수준 목록 (숫자 수준은 오름차순)
+DIMENSIONS = {
+    '학년': list(range(1, 13)),
+    '성별': ['남', '여'],
+    '혈당수준': list(GLUCOSE_LABELS),
+    'BMI구간': ['저체중', '정상', '과체중', '비만'],
+    '주3회이상운동': [0, 1],
+}
+# 원본 컬럼을 경계값으로 나눠 만드는 차원: (컬럼, 경계값)
+BINNED_DIMENSIONS = {'BMI구간': ('BMI', BMI_EDGES)}
+
+# 합계와 값이 있는 행 수를 누적하는 측정값 (결과 키: 컬럼)
+CUBE_MEASURES = {
+    'blood_glucose': '혈당치_mgdL',
+    'bmi': 'BMI',
+    'waist': '허리둘레_cm',
+    'weight': WEIGHT_COLUMN,
+}
+
+
+def dimension_codes(df, name, levels):
+    """df 행별 차원 수준 번호 (결측이거나 알 수 없는 값은 len(levels))"""
+    missing = len(levels)
+    column, edges = BINNED_DIMENSIONS.get(name, (name, None))
+    if column not in df.columns:
+        return np.full(len(df), missing, dtype=np.intp)
+
+    series = df[column]
+    if edges is not None:
+        values = series.to_numpy(dtype=np.float64)
+        codes = np.searchsorted(edges, values, side='right')
+        codes[np.isnan(values)] = missing
+        return codes
+    if series.dtype.kind in 'fiu':
+        values = series.to_numpy(dtype=np.float64)
+        numeric = np.asarray(levels, dtype=np.float64)
+        positions = np.searchsorted(numeric, values).clip(max=len(levels) - 1)
+        return np.where(numeric[positions] == values, positions, missing)
+    codes = pd.Categorical(series, categories=levels).codes.astype(np.intp)
+    codes[codes < 0] = missing
+    return codes
+
+
+class Cube:
+    """차원 조합별 행 수(counts)와 측정값 합계(sums)·값이 있는 행 수(known)를 담는 밀집 배열 큐브
+
+    각 차원의 마지막 칸은 MISSING_LABEL이다. 청크별로 update()를 호출해 누적할 수 있고,
+    to_dict()는 행이 하나도 없는 수준을 뺀 배열을 저장한다.
+    세 종류의 값은 첫 축으로 쌓은 하나의 float64 배열(data)의 뷰이므로 질의 한 번에
+    인덱싱과 축 합계를 한 번만 수행한다 (행 수는 2^53까지 정확).
+    """
+
+    def __init__(self, dimensions, measures):
+        """dimensions: 차원 이름별 수준 목록 (MISSING_LABEL 포함), measures: 측정값 키 목록"""
+        self.dimensions = {name: list(labels) for name, labels in dimensions.items()}
+        self.measures = list(measures)
+        shape = tuple(len(labels) for labels in self.dimensions.values())
+        self._set_data(np.zeros((1 + 2 * len(self.measures),) + shape))
+
+    def _set_data(self, data):
+        self.data = data
+        self.counts = data[0]
+        self.sums = {key: data[1 + i] for i, key in enumerate(self.measures)}
+        self.known = {key: data[1 + len(self.measures) + i] for i, key in enumerate(self.measures)}
+
+    @classmethod
+    def for_columns(cls, columns):
+        """기본 차원과 columns에 있는 측정값으로 빈 큐브 생성"""
+        dimensions = {name: levels + [MISSING_LABEL] for name, levels in DIMENSIONS.items()}
+        return cls(dimensions, [key for key, col in CUBE_MEASURES.items() if col in columns])
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls.for_columns(df.columns).update(df)
+
+    @property
+    def shape(self):
+        return self.counts.shape
+
+    def update(self, df):
+        """전처리된 데이터프레임(또는 청크)의 행을 누적 (기본 차원 구성에서만 사용)"""
+        if len(df) == 0:
+            return self
+        codes = [dimension_codes(df, name, labels[:-1]) for name, labels in self.dimensions.items()]
+        cells = np.ravel_multi_index(codes, self.shape)
+        size = self.counts.size
+        self.counts += np.bincount(cells, minlength=size).reshape(self.shape)
+        for key in self.measures:
+            values = df[CUBE_MEASURES[key]].to_numpy(dtype=np.float64)
+            known = ~np.isnan(values)
+            self.sums[key] += np.bincount(cells[known], weights=values[known], minlength=size).reshape(self.shape)
+            self.known[key] += np.bincount(cells[known], minlength=size).reshape(self.shape)
+        return self
+
+    def copy(self):
+        other = Cube(self.dimensions, self.measures)
+        other._set_data(self.data.copy())
+        return other
+
+    def fill_glucose(self, missing, median):
+        """혈당치 결측 행만 누적한 큐브 missing을 median으로 대체해 더한 큐브 (스트리밍 모드 결측치 대체용)
+
+        preprocess()의 fillna와 같이 혈당치가 NaN인 행만 대체하며, 혈당치는 있지만 혈당수준 구간
+        밖인 행(0 이하)은 self의 결측 칸에 그대로 남는다. missing의 행은 모두 혈당수준 결측 칸에
+        있으므로 혈당치 합계에 행 수만큼 median을 더하고 median의 혈당수준 칸으로 옮겨 더한다.
+        """
+        data = missing.data.copy()
+        if np.isnan(median) or 'blood_glucose' not in missing.sums:
+            self.data += data
+            return self
+        index = 1 + missing.measures.index('blood_glucose')
+        data[index] += median * data[0]
+        data[index + len(missing.measures)] = data[0]
+
+        level = pd.cut([median], bins=GLUCOSE_BINS, labels=GLUCOSE_LABELS)[0]
+        labels = self.dimensions['혈당수준']
+        if level in labels:
+            # 첫 축(값 종류)을 포함한 인덱스
+            axis = 1 + list(self.dimensions).index('혈당수준')
+            source = [slice(None)] * data.ndim
+            target = list(source)
+            source[axis], target[axis] = len(labels) - 1, labels.index(level)
+            data[tuple(target)] += data[tuple(source)]
+            data[tuple(source)] = 0
+        self.data += data
+        return self
+
+    def to_dict(self):
+        """JSON으로 저장 가능한 형태 (행이 없는 수준은 제외, 배열은 C 순서로 편 목록)"""
+        keep = []
+        for axis in range(len(self.shape)):
+            others = tuple(i for i in range(len(self.shape)) if i != axis)
+            keep.append(np.flatnonzero(self.counts.sum(axis=others)))
+        index = np.ix_(*keep)
+        return {
+            'dimensions': {
+                name: [labels[i] for i in kept] for (name, labels), kept in zip(self.dimensions.items(), keep)
+            },
+            'counts': self.counts[index].astype(np.int64).ravel(),
+            'sums': {key: self.sums[key][index].ravel() for key in self.measures},
+            'known': {key: self.known[key][index].astype(np.int64).ravel() for key in self.measures},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cube = cls(data['dimensions'], list(data['sums']))
+        cube.counts[...] = np.asarray(data['counts'], dtype=np.float64).reshape(cube.shape)
+        for key in cube.measures:
+            cube.sums[key][...] = np.asarray(data['sums'][key], dtype=np.float64).reshape(cube.shape)
+            cube.known[key][...] = np.asarray(data['known'][key], dtype=np.float64).reshape(cube.shape)
+        return cube
+
+    def _selection(self, filters):
+        """filters({차원: [수준 문자열, ...]})를 축별 인덱스 배열로 변환"""
+        unknown = [name for name in filters if name not in self.dimensions]
+        if unknown:
+            raise ValueError(f"알 수 없는 차원: {', '.join(unknown)} ({', '.join(self.dimensions)} 중에서 선택)")
+        selection = []
+        for name, labels in self.dimensions.items():
+            if name not in filters:
+                selection.append(np.arange(len(labels)))
+                continue
+            allowed = [str(level) for level in DIMENSIONS.get(name, [])] + [MISSING_LABEL]
+            invalid = [value for value in filters[name] if value not in allowed]
+            if invalid:
+                raise ValueError(f"{name}의 수준이 아닙니다: {', '.join(invalid)} ({', '.join(allowed)} 중에서 선택)")
+            # 저장할 때 빠진(행이 없는) 수준은 선택할 행이 없음
+            wanted = set(filters[name])
+            selection.append(np.array([i for i, label in enumerate(labels) if str(label) in wanted], dtype=np.intp))
+        return selection
+
+    def query(self, by=(), filters=None):
+        """filters로 행을 거른 뒤 by 차원 조합별 행 수와 측정값 합계·평균
+
+        Args:
+            by: 그룹 차원 이름 목록 (비어 있으면 전체 한 그룹)
+            filters: {차원 이름: [허용할 수준 문자열, ...]}
+
+        행이 없는 조합은 결과에서 제외한다.
+        """
+        by = list(by)
+        unknown = [name for name in by if name not in self.dimensions]
+        if unknown or len(set(by)) != len(by):
+            raise ValueError(f"그룹 차원은 {', '.join(self.dimensions)} 중에서 중복 없이 선택해야 합니다.")
+        selection = self._selection(filters or {})
+        names = list(self.dimensions)
+        axes = [names.index(name) for name in by]
+        # 선택한 칸만 남기고 그룹 차원이 아닌 축을 합친 뒤 by 순서로 축 정렬 (첫 축은 값 종류)
+        reduced = self.data[np.ix_(np.arange(len(self.data)), *selection)].sum(
+            axis=tuple(i + 1 for i in range(len(names)) if i not in axes)
+        )
+        ordered = sorted(axes)
+        reduced = reduced.transpose([0] + [ordered.index(axis) + 1 for axis in axes])
+
+        m = len(self.measures)
+        groups = []
+        if axes:
+            cells = zip(*np.nonzero(reduced[0]))
+        else:
+            # 그룹 차원이 없으면 전체 한 그룹 (0차원 배열)
+            cells = [()] if reduced[0] else []
+        for cell in cells:
+            values = reduced[(slice(None),) + cell].tolist()
+            group = {
+                'key': {name: self.dimensions[name][selection[axis][i]] for name, axis, i in zip(by, axes, cell)},
+                'count': int(values[0]),
+            }
+            for i, key in enumerate(self.measures):
+                total, n = values[1 + i], int(values[1 + m + i])
+                group[key] = {'sum': total, 'n': n, 'mean': total / n if n else None}
+            groups.append(group)
+
+        return {'by': by, 'filters': filters or {}, 'groups': groups}
@@ -1,16 +1,171 @@
 import pandas as pd
 import numpy as np
 from scipy import stats
-import statsmodels.api as sm
+import os
 import warnings
+from app.analysis.kernels import describe, mean, category_counts, bucket_counts, BMI_EDGES
+from app.analysis.ols import fit_ols
+from app.analysis.cube import Cube
+from app.analysis.accumulators import QuantileSketch, QUANTILE_SKETCH_K
+from app.analysis.bootstrap import (
+    BOOTSTRAP_REPLICATES, BOOTSTRAP_SEED, BOOTSTRAP_CONFIDENCE,
+    bootstrap_moments, percentile_interval, correlation_estimates, ols_estimates
+)
+from app.preprocessing.health_data_processor import WEIGHT_COLUMN
 # 경고 무시
 warnings.filterwarnings('ignore')
 
+# 회귀분석 엔진: 'numpy' (QR 기반 자체 구현) 또는 'statsmodels'
+REGRESSION_BACKEND = os.environ.get("REGRESSION_BACKEND", "numpy")
+
+# 층화 분석: 실행기(프로세스 풀)가 주어지고 그룹 수와 행 수가 모두 이 값 이상이면
+# 그룹을 나눠 여러 프로세스에서 분석 (프로세스 시작 비용이 커서 작은 데이터는 순차 처리가 더 빠름)
+STRATIFIED_PARALLEL_MIN_GROUPS = int(os.environ.get("STRATIFIED_PARALLEL_MIN_GROUPS", "32"))
+STRATIFIED_PARALLEL_MIN_ROWS = int(os.environ.get("STRATIFIED_PARALLEL_MIN_ROWS", "1000000"))
+STRATIFIED_WORKERS = max(1, int(os.environ.get("STRATIFIED_WORKERS", str(os.cpu_count() or 1))))
+
+# 상관관계 분석 대상 변수
+CORRELATION_COLUMNS = [
+    '혈당치_mgdL', 'BMI', '허리둘레_cm', 
+    '라면', '음료수', '패스트푸드',
+    '주3회이상운동', '하루30분이상운동',
+    'TV시청2시간이상', '게임2시간이상'
+]
+
+# 회귀 분석 독립변수 후보
+REGRESSION_COLUMNS = [
+    'BMI', '라면', '음료수', '패스트푸드',
+    '주3회이상운동', '하루30분이상운동',
+    'TV시청2시간이상', '게임2시간이상'
+]
+
+# 분위수 스케치를 만드는 측정값 (결과 키: 컬럼)
+SKETCH_MEASURES = {'blood_glucose': '혈당치_mgdL', 'bmi': 'BMI', 'waist': '허리둘레_cm'}
+
+def sketch_result(sketches):
+    """분위수 스케치 결과 형식 (sketches: {결과 키: QuantileSketch})"""
+    return {
+        'method': 'kll',
+        'k': QUANTILE_SKETCH_K,
+        'rank_error': QuantileSketch.rank_error(QUANTILE_SKETCH_K),
+        'sketches': {key: sketch.to_dict() for key, sketch in sketches.items()}
+    }
+
+def empty_regression_result(error):
+    """회귀분석을 수행할 수 없을 때의 기본 결과"""
+    return {
+        'model_summary': {
+            'r_squared': 0,
+            'adj_r_squared': 0,
+            'f_pvalue': 1
+        },
+        'coefficients': {'error': error}
+    }
+
+def fit_regression(X, y, backend=REGRESSION_BACKEND):
+    """상수항을 포함한 OLS 적합
+
+    statsmodels는 import 비용이 크므로 해당 엔진을 선택한 경우에만 불러온다.
+    """
+    if backend == 'statsmodels':
+        import statsmodels.api as sm
+        return sm.OLS(y, sm.add_constant(X)).fit()
+    if backend == 'numpy':
+        return fit_ols(X, y)
+    raise ValueError(f"지원하지 않는 회귀분석 엔진: {backend}")
+
+def regression_result(model):
+    """회귀 모델 결과를 API 응답 형식으로 정리
+
+    model은 statsmodels 결과 또는 같은 속성(rsquared, rsquared_adj, f_pvalue,
+    params, pvalues)을 가진 객체
+    """
+    results = {
+        'model_summary': {
+            'r_squared': model.rsquared,
+            'adj_r_squared': model.rsquared_adj,
+            'f_pvalue': model.f_pvalue
+        },
+        'coefficients': {}
+    }
+    
+    # 계수 정보 정리
+    for variable, coef, pval in zip(model.params.index, model.params, model.pvalues):
+        results['coefficients'][variable] = {
+            'coefficient': coef,
+            'p_value': pval,
+            'significant': pval < 0.05
+        }
+    
+    return results
+
+def analyze_groups(df, by, regression_backend=REGRESSION_BACKEND, indices=None,
+                   bootstrap=0, executor=None):
+    """by 컬럼 조합별로 요약 통계, 상관관계, 회귀분석 수행
+
+    프로세스 풀에서도 호출되므로 모듈 수준 함수로 둔다.
+    결측 그룹 값이 있는 행은 제외한다.
+    indices는 groupby(...).indices 결과 (이미 계산한 경우 재사용)
+    bootstrap이 0보다 크면 그룹마다 해당 반복 수의 부트스트랩 신뢰구간을 함께 계산한다
+    (executor가 주어지면 재표본 계산에 사용).
+    """
+    if indices is None:
+        indices = df.groupby(by, observed=True, sort=True).indices
+    results = []
+    for key, positions in indices.items():
+        key = key if isinstance(key, tuple) else (key,)
+        analyzer = DiabetesAnalyzer(df.take(positions), regression_backend, bootstrap, executor)
+        results.append({
+            'key': dict(zip(by, key)),
+            'size': len(positions),
+            'summary': analyzer.get_summary_stats(),
+            'correlations': analyzer.correlation_analysis(),
+            'lifestyle_impact': analyzer.lifestyle_impact_analysis()
+        })
+    return results
+
+def group_sort_key(by, levels):
+    """그룹 키(by 순서의 값 튜플) 정렬 함수: levels에 있는 범주형 컬럼은 수준 순서, 나머지는 값 순서"""
+    def sort_key(key):
+        return tuple(levels[col].index(value) if col in levels else value for col, value in zip(by, key))
+    return sort_key
+
+def _balanced_batches(indices, batch_count):
+    """그룹 위치 배열들을 행 수가 비슷하도록 batch_count개로 분배"""
+    batches = [[] for _ in range(batch_count)]
+    sizes = [0] * batch_count
+    for positions in sorted(indices.values(), key=len, reverse=True):
+        target = sizes.index(min(sizes))
+        batches[target].append(positions)
+        sizes[target] += len(positions)
+    return [np.concatenate(batch) for batch in batches if batch]
+
 class DiabetesAnalyzer:
     """당뇨 관련 데이터 분석 클래스"""
     
-    def __init__(self, df):
+    def __init__(self, df, regression_backend=None, bootstrap=None, executor=None):
+        """bootstrap: 부트스트랩 반복 수 (None이면 BOOTSTRAP_REPLICATES, 0이면 신뢰구간 생략)
+        executor: 부트스트랩 재표본을 나눠 계산할 실행기 (None이면 현재 프로세스에서 순차 계산)
+        """
         self.df = df
+        self.regression_backend = regression_backend or REGRESSION_BACKEND
+        self.bootstrap = BOOTSTRAP_REPLICATES if bootstrap is None else bootstrap
+        self.executor = executor
+
+    def bootstrap_info(self):
+        """결과에 함께 기록하는 부트스트랩 설정"""
+        return {
+            'replicates': self.bootstrap,
+            'confidence': BOOTSTRAP_CONFIDENCE,
+            'seed': BOOTSTRAP_SEED,
+            'method': 'percentile'
+        }
+
+    def _resample(self, df):
+        """df 행의 재표본별 평균과 중심화 교차곱"""
+        return bootstrap_moments(
+            df.to_numpy(dtype=np.float64), self.bootstrap, BOOTSTRAP_SEED, self.executor
+        )
         
     def get_summary_stats(self):
         """기본 통계량 계산"""
@@ -18,48 +173,88 @@ class DiabetesAnalyzer:
             'total_students': len(self.df),
         }
         
-        # 혈당수준 분포 추가
+        # 혈당수준 분포 추가 (범주 코드 기준 한 번에 집계)
         if '혈당수준' in self.df.columns:
+            normal, prediabetes, diabetes = category_counts(
+                self.df['혈당수준'], ['정상', '전당뇨', '당뇨의심']
+            )
             summary['diabetes_risk'] = {
-                'normal': (self.df['혈당수준'] == '정상').sum(),
-                'prediabetes': (self.df['혈당수준'] == '전당뇨').sum(),
-                'diabetes': (self.df['혈당수준'] == '당뇨의심').sum()
+                'normal': normal,
+                'prediabetes': prediabetes,
+                'diabetes': diabetes
             }
         
         # 혈당치 통계량 추가
         if '혈당치_mgdL' in self.df.columns:
-            summary['blood_glucose'] = {
-                'mean': self.df['혈당치_mgdL'].mean(),
-                'median': self.df['혈당치_mgdL'].median(),
-                'std': self.df['혈당치_mgdL'].std(),
-                'min': self.df['혈당치_mgdL'].min(),
-                'max': self.df['혈당치_mgdL'].max()
-            }
+            summary['blood_glucose'] = describe(self.df['혈당치_mgdL'])
         
-        # BMI 분포 추가
+        # BMI 분포 추가 (경계값 기준 구간 한 번에 집계)
         if 'BMI' in self.df.columns:
+            underweight, normal, overweight, obese = bucket_counts(self.df['BMI'], BMI_EDGES)
             summary['bmi'] = {
-                'mean': self.df['BMI'].mean(),
-                'underweight': (self.df['BMI'] < 18.5).sum(),
-                'normal': ((self.df['BMI'] >= 18.5) & (self.df['BMI'] < 23)).sum(),
-                'overweight': ((self.df['BMI'] >= 23) & (self.df['BMI'] < 25)).sum(),
-                'obese': (self.df['BMI'] >= 25).sum()
+                'mean': mean(self.df['BMI']),
+                'underweight': underweight,
+                'normal': normal,
+                'overweight': overweight,
+                'obese': obese
             }
             
         return summary
     
+    def sample_summary_stats(self, population):
+        """self.df가 population행 중 단순 무작위 표본일 때의 기본 통계량 추정 (점진 모드 임시 결과)
+
+        get_summary_stats()와 같은 형식이며 행 수는 population 기준으로 환산한다.
+        confidence_intervals에 비율(환산한 행 수)과 평균의 정규근사 신뢰구간(유한모집단 수정 포함)을 추가한다.
+        """
+        summary = self.get_summary_stats()
+        n = len(self.df)
+        population = max(population, n)
+        z = stats.norm.ppf((1 + BOOTSTRAP_CONFIDENCE) / 2)
+        fpc = np.sqrt((population - n) / (population - 1)) if population > 1 else 0.0
+
+        def count_interval(count):
+            p = count / n
+            half = z * np.sqrt(p * (1 - p) / n) * fpc
+            return {'lower': round(max(p - half, 0) * population), 'upper': round(min(p + half, 1) * population)}
+
+        def mean_interval(col):
+            values = self.df[col].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) < 2:
+                return {'lower': np.nan, 'upper': np.nan}
+            half = z * values.std(ddof=1) / np.sqrt(len(values)) * fpc
+            return {'lower': values.mean() - half, 'upper': values.mean() + half}
+
+        intervals = {}
+        summary['total_students'] = population
+        if 'diabetes_risk' in summary:
+            counts = summary['diabetes_risk']
+            intervals['diabetes_risk'] = {key: count_interval(count) for key, count in counts.items()}
+            summary['diabetes_risk'] = {key: round(count / n * population) for key, count in counts.items()}
+        if 'blood_glucose' in summary:
+            intervals['blood_glucose'] = {'mean': mean_interval('혈당치_mgdL')}
+        if 'bmi' in summary:
+            bmi = summary['bmi']
+            buckets = [key for key in bmi if key != 'mean']
+            intervals['bmi'] = {'mean': mean_interval('BMI')}
+            intervals['bmi'].update({key: count_interval(bmi[key]) for key in buckets})
+            bmi.update({key: round(bmi[key] / n * population) for key in buckets})
+
+        summary['confidence_intervals'] = intervals
+        summary['sample'] = {
+            'rows': n,
+            'estimated_total_rows': population,
+            'confidence': BOOTSTRAP_CONFIDENCE,
+            'method': 'normal'
+        }
+        return summary
+
     def correlation_analysis(self):
         """상관관계 분석"""
         # 주요 변수 상관관계 계산
         # 실제 존재하는 컬럼만 사용
-        potential_cols = [
-            '혈당치_mgdL', 'BMI', '허리둘레_cm', 
-            '라면', '음료수', '패스트푸드',
-            '주3회이상운동', '하루30분이상운동',
-            'TV시청2시간이상', '게임2시간이상'
-        ]
-        
-        numeric_cols = [col for col in potential_cols if col in self.df.columns]
+        numeric_cols = [col for col in CORRELATION_COLUMNS if col in self.df.columns]
         
         # 충분한 수치형 변수가 있을 경우에만 상관관계 분석
         if len(numeric_cols) > 1 and '혈당치_mgdL' in numeric_cols:
@@ -70,10 +265,13 @@ class DiabetesAnalyzer:
             # 혈당치와의 상관관계만 추출
             glucose_corr = corr_matrix['혈당치_mgdL'].sort_values(ascending=False)
             
-            return {
+            results = {
                 'correlation_matrix': corr_matrix.to_dict(),
                 'glucose_correlation': glucose_corr.to_dict()
             }
+            if self.bootstrap > 0 and len(corr_df) > 1:
+                results.update(self.correlation_ci(corr_df, glucose_corr.index))
+            return results
         else:
             # 충분한 변수가 없는 경우 빈 결과 반환
             return {
@@ -85,84 +283,149 @@ class DiabetesAnalyzer:
         """생활습관이 혈당치에 미치는 영향 분석"""
         # 분석에 필요한 모든 변수가 있는지 확인
         if '혈당치_mgdL' not in self.df.columns:
-            return {
-                'model_summary': {
-                    'r_squared': 0,
-                    'adj_r_squared': 0,
-                    'f_pvalue': 1
-                },
-                'coefficients': {'error': '혈당치 변수가 없습니다'}
-            }
+            return empty_regression_result('혈당치 변수가 없습니다')
         
         # 회귀 분석 가능한 변수 선택
-        potential_vars = [
-            'BMI', '라면', '음료수', '패스트푸드',
-            '주3회이상운동', '하루30분이상운동',
-            'TV시청2시간이상', '게임2시간이상'
-        ]
-        
         # 실제 데이터에 존재하는 변수만 사용
-        X_vars = [var for var in potential_vars if var in self.df.columns]
+        X_vars = [var for var in REGRESSION_COLUMNS if var in self.df.columns]
         
         # 충분한 변수가 없는 경우
         if len(X_vars) < 1:
-            return {
-                'model_summary': {
-                    'r_squared': 0,
-                    'adj_r_squared': 0,
-                    'f_pvalue': 1
-                },
-                'coefficients': {'error': '회귀분석에 필요한 독립변수가 없습니다'}
-            }
+            return empty_regression_result('회귀분석에 필요한 독립변수가 없습니다')
         
         try:
             # 결측치가 있는 행 제거
             analysis_df = self.df[X_vars + ['혈당치_mgdL']].dropna()
             
             if len(analysis_df) < 10:  # 샘플 수가 너무 적은 경우
-                return {
-                    'model_summary': {
-                        'r_squared': 0,
-                        'adj_r_squared': 0,
-                        'f_pvalue': 1
-                    },
-                    'coefficients': {'error': '분석에 필요한 데이터가 충분하지 않습니다'}
-                }
+                return empty_regression_result('분석에 필요한 데이터가 충분하지 않습니다')
             
             # 회귀 모델 적합
-            X = sm.add_constant(analysis_df[X_vars])
-            y = analysis_df['혈당치_mgdL']
-            
-            model = sm.OLS(y, X).fit()
+            model = fit_regression(analysis_df[X_vars], analysis_df['혈당치_mgdL'], self.regression_backend)
             
             # 결과 정리
-            results = {
-                'model_summary': {
-                    'r_squared': model.rsquared,
-                    'adj_r_squared': model.rsquared_adj,
-                    'f_pvalue': model.f_pvalue
-                },
-                'coefficients': {}
-            }
-            
-            # 계수 정보 정리
-            for variable, coef, pval in zip(X.columns, model.params, model.pvalues):
-                results['coefficients'][variable] = {
-                    'coefficient': coef,
-                    'p_value': pval,
-                    'significant': pval < 0.05
-                }
-            
+            results = regression_result(model)
+            if self.bootstrap > 0:
+                self.add_coefficient_ci(results, analysis_df, X_vars)
             return results
             
         except Exception as e:
             # 오류 발생 시 기본 결과 반환
             print(f"회귀분석 오류: {str(e)}")
-            return {
-                'model_summary': {
-                    'r_squared': 0,
-                    'adj_r_squared': 0,
-                    'f_pvalue': 1
-                },
-                'coefficients': {'error': f'분석 중 오류 발생: {str(e)}'}
-            }
\ No newline at end of file
+            return empty_regression_result(f'분석 중 오류 발생: {str(e)}')
+
+    def weighted_analysis(self):
+        """최종가중치를 반영한 모집단 추정치 (가중 평균·분위수·상관계수·WLS)
+
+        스트리밍 분석과 같은 누적기를 데이터 전체에 한 번 적용한다.
+        혈당치 결측치는 전처리에서 이미 중앙값으로 대체되어 있다.
+        """
+        # streaming_analyzer가 이 모듈을 import하므로 호출 시점에 import
+        from app.analysis.streaming_analyzer import WeightedAggregates
+        if WEIGHT_COLUMN not in self.df.columns:
+            return {'message': f'가중치 컬럼({WEIGHT_COLUMN})이 없습니다'}
+        aggregates = WeightedAggregates(self.df.columns)
+        aggregates.update(self.df)
+        return aggregates.result(np.nan)
+
+    def quantile_sketches(self):
+        """혈당치·BMI·허리둘레의 병합 가능한 KLL 분위수 스케치
+
+        결과와 함께 저장해 두면 여러 작업(학교, 지역, 연도)의 스케치를 합쳐
+        CSV를 다시 읽지 않고 임의의 분위수와 히스토그램을 구할 수 있다.
+        """
+        sketches = {}
+        for key, col in SKETCH_MEASURES.items():
+            if col in self.df.columns:
+                sketches[key] = QuantileSketch()
+                sketches[key].update(self.df[col].to_numpy(dtype=np.float64))
+        return sketch_result(sketches)
+
+    def cube_analysis(self):
+        """학년×성별×혈당수준×BMI구간×주3회이상운동 조합별 행 수와 측정값 합계 큐브
+
+        /cube 엔드포인트가 원본 행 없이 필터/그룹 질의에 답할 수 있도록 결과와 함께 저장한다.
+        """
+        return Cube.from_frame(self.df).to_dict()
+
+    def correlation_ci(self, corr_df, order):
+        """혈당치와의 상관계수 부트스트랩 신뢰구간 (glucose_correlation과 같은 순서)"""
+        _, comoment = self._resample(corr_df)
+        columns = list(corr_df.columns)
+        lower, upper = percentile_interval(
+            correlation_estimates(comoment, columns.index('혈당치_mgdL')), BOOTSTRAP_CONFIDENCE
+        )
+        ci = {}
+        for col in order:
+            i = columns.index(col)
+            ci[col] = {'lower': round(float(lower[i]), 3), 'upper': round(float(upper[i]), 3)}
+        return {'glucose_correlation_ci': ci, 'bootstrap': self.bootstrap_info()}
+
+    def add_coefficient_ci(self, results, analysis_df, X_vars):
+        """회귀계수마다 부트스트랩 신뢰구간(ci_lower, ci_upper)을 추가"""
+        mean_, comoment = self._resample(analysis_df)
+        features = list(range(len(X_vars)))
+        lower, upper = percentile_interval(
+            ols_estimates(mean_, comoment, features, len(X_vars)), BOOTSTRAP_CONFIDENCE
+        )
+        for i, name in enumerate(['const'] + X_vars):
+            if name in results['coefficients']:
+                results['coefficients'][name]['ci_lower'] = lower[i]
+                results['coefficients'][name]['ci_upper'] = upper[i]
+        results['bootstrap'] = self.bootstrap_info()
+
+    def stratified_analysis(self, by, executor=None, max_workers=None):
+        """by 컬럼(예: 학년, 성별) 조합별 요약 통계, 상관관계, 회귀분석
+
+        한 번의 groupby로 그룹별 행 위치를 구한 뒤 그룹마다 같은 분석을 수행하므로
+        CSV를 그룹별로 나눠 업로드한 것과 같은 결과를 얻는다.
+        executor(concurrent.futures 실행기, 기본은 생성자의 executor)가 주어지고 그룹 수와 행 수가
+        충분히 많으면(STRATIFIED_PARALLEL_MIN_GROUPS, STRATIFIED_PARALLEL_MIN_ROWS) 그룹을 행 수 기준으로
+        max_workers개(기본 STRATIFIED_WORKERS)로 나눠 executor에서 분석한다.
+        그렇지 않으면 그룹을 순서대로 분석하고 executor는 그룹별 부트스트랩 계산에 사용한다.
+        """
+        by = list(by)
+        missing = [col for col in by if col not in self.df.columns]
+        if not by or missing:
+            raise ValueError(f"층화 변수가 데이터에 없습니다: {', '.join(missing) or '(없음)'}")
+
+        workers = max_workers or STRATIFIED_WORKERS
+        executor = executor or self.executor
+        # groupby().indices의 순서는 범주형 컬럼 조합에서 수준 순서와 다를 수 있으므로 직접 정렬
+        levels = {
+            col: list(self.df[col].cat.categories)
+            for col in by if isinstance(self.df[col].dtype, pd.CategoricalDtype)
+        }
+        sort_key = group_sort_key(by, levels)
+        indices = self.df.groupby(by, observed=True, sort=True).indices
+        indices = dict(sorted(
+            indices.items(), key=lambda item: sort_key(item[0] if isinstance(item[0], tuple) else (item[0],))
+        ))
+        parallel = (
+            executor is not None
+            and workers > 1
+            and len(indices) >= STRATIFIED_PARALLEL_MIN_GROUPS
+            and len(self.df) >= STRATIFIED_PARALLEL_MIN_ROWS
+        )
+        if not parallel:
+            groups = analyze_groups(
+                self.df, by, self.regression_backend, indices, self.bootstrap, executor
+            )
+        else:
+            batches = _balanced_batches(indices, min(workers, len(indices)))
+            # 그룹 단위로 이미 병렬 처리하므로 부트스트랩은 각 프로세스 안에서 순차 계산
+            futures = [
+                executor.submit(
+                    analyze_groups, self.df.take(positions), by, self.regression_backend,
+                    None, self.bootstrap
+                )
+                for positions in batches
+            ]
+            groups = [group for future in futures for group in future.result()]
+            order = {key if isinstance(key, tuple) else (key,): i for i, key in enumerate(indices)}
+            groups.sort(key=lambda group: order[tuple(group['key'][col] for col in by)])
+
+        return {
+            'by': by,
+            'groups': groups
+        }
\ No newline at end of file
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# BMI 분류 경계 (저체중 < 18.5 <= 정상 < 23 <= 과체중 < 25 <= 비만)
+BMI_EDGES = np.array([18.5, 23.0, 25.0])
+
+# 이 크기 이상의 배열은 표본으로 후보 구간을 좁힌 뒤 중앙값을 선택
+_SELECT_MIN = 100_000
+_SELECT_SAMPLE = 10_000
+
+def describe(series):
+    """평균/중앙값/표준편차/최솟값/최댓값을 한 번 변환한 연속 배열로 계산
+
+    pandas의 Series.mean/median/std/min/max(skipna=True)와 같은 연산 순서를 사용하므로
+    결과가 비트 단위로 동일하다. 결측치 마스크는 한 번만 계산하고,
+    중앙값은 전체 정렬 대신 선택 알고리즘으로 구한다.
+    float32 컬럼은 float64로 변환해 계산한다 (pandas는 float32로 누적).
+    """
+    values = _as_contiguous(series)
+    is_float = values.dtype.kind == 'f'
+    mask = np.isnan(values) if is_float else None
+    has_nan = mask is not None and mask.any()
+
+    if has_nan:
+        valid = values[~mask]
+        filled = np.where(mask, values.dtype.type(0), values)
+    else:
+        valid = values
+        filled = values
+    count = len(valid)
+
+    if count == 0:
+        return {'mean': np.nan, 'median': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+
+    if is_float:
+        the_mean = filled.sum(dtype=values.dtype) / values.dtype.type(count)
+        floats = filled
+    else:
+        the_mean = filled.sum(dtype=np.float64) / np.float64(count)
+        floats = filled.astype(np.float64)
+
+    # 분산: pandas nanvar와 같은 방식 (결측 위치는 0으로 처리 후 제곱합)
+    avg = floats.sum(dtype=np.float64) / count
+    sqr = np.subtract(avg, floats)
+    np.square(sqr, out=sqr)
+    if has_nan:
+        sqr[mask] = 0
+    std = np.sqrt(sqr.sum(dtype=np.float64) / (count - 1)) if count > 1 else np.nan
+    del sqr
+
+    return {
+        'mean': the_mean,
+        'median': _median(valid.astype(np.float64, copy=False)),
+        'std': std,
+        'min': valid.min(),
+        'max': valid.max()
+    }
+
+def mean(series):
+    """pandas Series.mean()과 같은 결과의 평균 (float32는 float64로 누적)"""
+    values = _as_contiguous(series)
+    if values.dtype.kind != 'f':
+        return values.sum(dtype=np.float64) / np.float64(len(values)) if len(values) else np.nan
+    mask = np.isnan(values)
+    count = len(values) - np.count_nonzero(mask)
+    if count == 0:
+        return np.nan
+    if count < len(values):
+        values = np.where(mask, values.dtype.type(0), values)
+    return values.sum(dtype=values.dtype) / values.dtype.type(count)
+
+def _as_contiguous(series):
+    """연속 배열로 변환 (64비트 미만 실수는 누적 오차를 줄이기 위해 float64로)"""
+    values = series.to_numpy()
+    if values.dtype.kind == 'f' and values.dtype.itemsize < 8:
+        return values.astype(np.float64)
+    return np.ascontiguousarray(values)
+
+def _median(values):
+    """선택 알고리즘 기반 중앙값 (np.median과 같은 결과)"""
+    n = len(values)
+    k = n // 2
+    if n % 2:
+        return _select(values, [k])[0]
+    lower, upper = _select(values, [k - 1, k])
+    return np.mean(np.array([lower, upper]))
+
+def _select(values, ks):
+    """정렬했을 때 위치 ks에 오는 값들 (결측치 없는 float64 배열)
+
+    Floyd-Rivest 방식: 등간격 표본을 정렬해 목표 순위를 감싸는 두 경계값을 고르고,
+    경계 사이 원소만 추려 np.partition으로 선택한다. 원본 배열은 비교 연산으로
+    몇 번만 훑으므로 전체 배열을 부분 정렬하는 것보다 빠르다.
+    목표 순위가 경계 밖에 있으면 전체 배열에서 선택하므로 결과는 항상 정확하다.
+    """
+    n = len(values)
+    if n < _SELECT_MIN:
+        return np.partition(values, ks)[ks]
+
+    sample = np.sort(values[::n // _SELECT_SAMPLE])
+    m = len(sample)
+    margin = int(3 * np.sqrt(m))
+    lo = sample[max(0, min(ks) * m // n - margin)]
+    hi = sample[min(m - 1, max(ks) * m // n + margin)]
+
+    below = np.count_nonzero(values < lo)
+    candidates = values[(values >= lo) & (values <= hi)]
+    if below > min(ks) or below + len(candidates) <= max(ks):
+        return np.partition(values, ks)[ks]
+    return np.partition(candidates, [k - below for k in ks])[[k - below for k in ks]]
+
+def category_counts(series, labels):
+    """범주별 개수 (labels 순서로 반환)
+
+    범주형이면 문자열 비교 대신 int8 범주 코드 배열을 직접 센다.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = list(series.cat.categories)
+        codes = series.cat.codes.to_numpy()
+        return [np.int64(np.count_nonzero(codes == categories.index(label))) if label in categories
+                else np.int64(0) for label in labels]
+    values = series.to_numpy()
+    return [(values == label).sum() for label in labels]
+
+def bucket_counts(series, edges=BMI_EDGES):
+    """경계값 기준 구간별 개수
+
+    구간은 [-inf, e0), [e0, e1), ..., [e_last, inf]이며 결측치는 제외한다.
+    각 경계 이상인 값의 개수만 세고 차분으로 구간 개수를 얻으므로
+    구간마다 두 번씩 비교하는 마스킹이 필요 없다.
+    """
+    values = series.to_numpy(dtype=np.float64)
+    valid = len(values) - np.count_nonzero(np.isnan(values))
+    at_least = [valid] + [np.count_nonzero(values >= edge) for edge in edges] + [0]
+    return np.array([at_least[i] - at_least[i + 1] for i in range(len(edges) + 1)], dtype=np.int64)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from scipy import special
+
+class OLSResult:
+    """OLS 결과 (statsmodels RegressionResults와 같은 속성 이름)
+
+    lifestyle_impact_analysis가 사용하는 값(rsquared, rsquared_adj, f_pvalue,
+    params, pvalues)과 표준오차, t값, F 통계량만 계산한다.
+    계수 관련 값은 배열로 보관하고 Series는 처음 접근할 때 만든다.
+    """
+
+    def __init__(self, names, params, bse, df_model, df_resid, nobs, ssr, centered_tss):
+        self.names = list(names)
+        self.nobs = nobs
+        self.df_model = df_model
+        self.df_resid = df_resid
+        self.ssr = ssr
+        self.centered_tss = centered_tss
+        self._params = np.asarray(params, dtype=np.float64)
+        self._bse = np.asarray(bse, dtype=np.float64)
+        self._index = None
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._tvalues = self._params / self._bse
+            self._pvalues = 2 * special.stdtr(df_resid, -np.abs(self._tvalues))
+            self.rsquared = 1 - ssr / centered_tss
+            self.rsquared_adj = 1 - (nobs - 1) / df_resid * (1 - self.rsquared)
+            self.fvalue = ((centered_tss - ssr) / df_model) / (ssr / df_resid)
+        self.f_pvalue = special.fdtrc(df_model, df_resid, self.fvalue)
+
+    def _series(self, values):
+        if self._index is None:
+            self._index = pd.Index(self.names)
+        return pd.Series(values, index=self._index)
+
+    @property
+    def params(self):
+        return self._series(self._params)
+
+    @property
+    def bse(self):
+        return self._series(self._bse)
+
+    @property
+    def tvalues(self):
+        return self._series(self._tvalues)
+
+    @property
+    def pvalues(self):
+        return self._series(self._pvalues)
+
+
+def fit_ols(X, y, names=None):
+    """상수항을 포함한 OLS를 NumPy만으로 적합
+
+    [1, X, y]를 QR 분해하면 R의 마지막 열이 Q'y, 마지막 대각 원소의 제곱이 잔차제곱합이므로
+    Q를 만들지 않고 R b = Q'y만 풀면 된다. (X'X)^-1 = R^-1 R^-T로 표준오차를 구한다.
+    계수가 정확히 식별되지 않는(rank 부족) 경우에는 statsmodels와 같이 의사역행렬을 사용한다.
+
+    Args:
+        X: (n, k) 독립변수 배열 또는 DataFrame (상수항 제외)
+        y: (n,) 종속변수
+        names: 독립변수 이름 (DataFrame이면 컬럼명 사용)
+    """
+    if names is None:
+        names = list(X.columns) if hasattr(X, 'columns') else [f'x{i + 1}' for i in range(np.shape(X)[1])]
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, k = X.shape
+    p = k + 1
+
+    augmented = np.empty((n, p + 1))
+    augmented[:, 0] = 1.0
+    augmented[:, 1:p] = X
+    augmented[:, p] = y
+
+    r_full = np.linalg.qr(augmented, mode='r')
+    r = r_full[:p, :p]
+    diag = np.abs(np.diag(r))
+    rank = int(np.sum(diag > diag.max() * max(n, p) * np.finfo(np.float64).eps))
+
+    if rank == p:
+        r_inv = np.linalg.inv(r)
+        params = r_inv @ r_full[:p, p]
+        cov_unscaled = r_inv @ r_inv.T
+        ssr = r_full[p, p] ** 2
+    else:
+        design = augmented[:, :p]
+        pinv = np.linalg.pinv(design)
+        params = pinv @ y
+        cov_unscaled = pinv @ pinv.T
+        resid = y - design @ params
+        ssr = resid @ resid
+
+    centered = y - y.mean()
+    df_resid = n - rank
+
+    return OLSResult(
+        names=['const'] + list(names),
+        params=params,
+        bse=np.sqrt(np.diag(cov_unscaled) * (ssr / df_resid)),
+        df_model=rank - 1,
+        df_resid=df_resid,
+        nobs=n,
+        ssr=ssr,
+        centered_tss=centered @ centered,
+    )
@@ -0,0 +1,562 @@
+import copy
+import logging
+import pandas as pd
+import numpy as np
+from app.analysis.accumulators import MomentAccumulator, ValueCounter, WeightedHistogram, QuantileSketch
+from app.analysis.sufficient_stats import SufficientStats
+from app.analysis.cube import Cube
+from app.analysis.kernels import BMI_EDGES
+from app.preprocessing.health_data_processor import GLUCOSE_BINS, GLUCOSE_LABELS, WEIGHT_COLUMN, DEFAULT_CHUNKSIZE
+from app.analysis.diabetes_analyzer import (
+    CORRELATION_COLUMNS, REGRESSION_COLUMNS, SKETCH_MEASURES,
+    empty_regression_result, regression_result, sketch_result, group_sort_key
+)
+
+logger = logging.getLogger(__name__)
+
+GLUCOSE = '혈당치_mgdL'
+GLUCOSE_LEVEL = '혈당수준'
+RISK_LEVELS = {'normal': '정상', 'prediabetes': '전당뇨', 'diabetes': '당뇨의심'}
+BMI_LEVELS = ['underweight', 'normal', 'overweight', 'obese']
+
+# 가중 평균/분위수를 계산하는 측정값 (결과 키: 컬럼)
+WEIGHTED_MEASURES = {'blood_glucose': GLUCOSE, 'bmi': 'BMI', 'waist': '허리둘레_cm'}
+WEIGHTED_QUANTILES = {'q1': 0.25, 'median': 0.5, 'q3': 0.75}
+
+class GlucoseImputedStats:
+    """혈당치 결측 행을 나중에 중앙값으로 채워 합칠 수 있는 충분통계량
+
+    혈당치가 있는 complete case와, 혈당치만 결측인 행(나머지 변수는 모두 존재)을
+    따로 누적한다. 중앙값이 확정되면 filled()로 fillna(median) 후 dropna()한
+    데이터와 같은 통계량을 만든다.
+    weight(가중치 컬럼)가 주어지면 같은 배열로 가중 통계량도 함께 누적한다
+    (unweighted=False이면 가중 통계량만 누적).
+    """
+
+    def __init__(self, columns, weight=None, unweighted=True):
+        self.columns = list(columns)
+        self.others = [col for col in self.columns if col != GLUCOSE]
+        self.glucose_index = self.columns.index(GLUCOSE)
+        self.other_index = [i for i, col in enumerate(self.columns) if col != GLUCOSE]
+        self.weight = weight
+        self.unweighted = unweighted
+        self.complete = SufficientStats(self.columns)
+        self.missing = SufficientStats(self.others)
+        self.weighted_complete = SufficientStats(self.columns)
+        self.weighted_missing = SufficientStats(self.others)
+
+    def update(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        glucose_missing = np.isnan(values[:, self.glucose_index])
+        missing = values[glucose_missing][:, self.other_index] if glucose_missing.any() else None
+        if self.unweighted:
+            self.complete.update(values)
+            if missing is not None:
+                self.missing.update(missing)
+        if self.weight is not None:
+            weights = chunk[self.weight].to_numpy(dtype=np.float64)
+            self.weighted_complete.update(values, weights)
+            if missing is not None:
+                self.weighted_missing.update(missing, weights[glucose_missing])
+
+    def filled(self, median, weighted=False):
+        complete, missing = (
+            (self.weighted_complete, self.weighted_missing) if weighted else (self.complete, self.missing)
+        )
+        if missing.n == 0 or np.isnan(median):
+            return complete
+        return complete + missing.with_constant(GLUCOSE, median, order=self.columns)
+
+    def merge(self, other):
+        """같은 컬럼 구성의 다른 누적기를 병합"""
+        self.complete.merge(other.complete)
+        self.missing.merge(other.missing)
+        self.weighted_complete.merge(other.weighted_complete)
+        self.weighted_missing.merge(other.weighted_missing)
+        return self
+
+
+def imputed_stats(columns, weight=None, unweighted=True):
+    """상관관계/회귀분석용 GlucoseImputedStats 쌍 (해당 분석을 할 수 없으면 None)"""
+    numeric_cols = [col for col in CORRELATION_COLUMNS if col in columns]
+    corr_stats = None
+    if len(numeric_cols) > 1 and GLUCOSE in numeric_cols:
+        corr_stats = GlucoseImputedStats(numeric_cols, weight, unweighted)
+    X_vars = [var for var in REGRESSION_COLUMNS if var in columns]
+    regression_stats = None
+    if GLUCOSE in columns and X_vars:
+        regression_stats = GlucoseImputedStats(X_vars + [GLUCOSE], weight, unweighted)
+    return corr_stats, regression_stats
+
+
+class WeightedAggregates:
+    """최종가중치를 반영한 모집단 추정치 누적기
+
+    가중 평균은 가중합, 가중 분위수는 0.1 단위 격자의 가중치 합계(WeightedHistogram),
+    가중 상관계수와 WLS는 가중 교차곱 행렬로 누적하므로 청크 단위로 가중치 없는 통계량과 함께 한 번에 계산된다.
+    가중치가 없거나 0 이하인 행은 제외한다. 혈당치 결측은 가중치 없는 분석과 같이
+    (가중치 없는) 중앙값으로 대체한 것으로 반영한다.
+    """
+
+    def __init__(self, columns, stats=None):
+        """stats: 가중 통계량도 함께 누적하는 (상관관계, 회귀분석) GlucoseImputedStats 쌍
+
+        주어지면 가중치 없는 통계량과 같은 배열로 호출한 쪽에서 갱신하고,
+        없으면 가중 통계량만 누적하는 쌍을 만들어 update()에서 갱신한다.
+        """
+        columns = list(columns)
+        self.owns_stats = stats is None
+        if stats is None:
+            stats = imputed_stats(columns, WEIGHT_COLUMN, unweighted=False)
+        self.corr_stats, self.regression_stats = stats
+        self.rows = 0
+        self.population = 0.0
+        # 측정값별 [컬럼, 가중합, 가중치 합, 가중 히스토그램]
+        self.measures = {
+            key: [col, 0.0, 0.0, WeightedHistogram()]
+            for key, col in WEIGHTED_MEASURES.items() if col in columns
+        }
+        self.glucose_missing_weight = 0.0
+        self.risk = dict.fromkeys(RISK_LEVELS.values(), 0.0)
+        self.bmi_levels = np.zeros(len(BMI_LEVELS))
+
+    def update(self, chunk):
+        weights = chunk[WEIGHT_COLUMN].to_numpy(dtype=np.float64)
+        valid = weights > 0
+        self.rows += int(valid.sum())
+        self.population += weights[valid].sum()
+
+        for measure in self.measures.values():
+            values = chunk[measure[0]].to_numpy(dtype=np.float64)
+            known = valid & ~np.isnan(values)
+            measure[1] += weights[known] @ values[known]
+            measure[2] += weights[known].sum()
+            measure[3].update(values, weights)
+
+        if GLUCOSE in chunk.columns:
+            missing = valid & chunk[GLUCOSE].isna().to_numpy()
+            self.glucose_missing_weight += weights[missing].sum()
+            levels = chunk['혈당수준']
+            codes = levels.cat.codes.to_numpy()
+            known = valid & (codes >= 0)
+            sums = np.bincount(codes[known], weights=weights[known], minlength=len(levels.cat.categories))
+            for label, total in zip(levels.cat.categories, sums):
+                if label in self.risk:
+                    self.risk[label] += total
+
+        if 'BMI' in chunk.columns:
+            bmi = chunk['BMI'].to_numpy(dtype=np.float64)
+            known = valid & ~np.isnan(bmi)
+            self.bmi_levels += np.bincount(
+                np.searchsorted(BMI_EDGES, bmi[known], side='right'),
+                weights=weights[known], minlength=len(BMI_LEVELS)
+            )
+
+        if self.owns_stats:
+            for stats_ in (self.corr_stats, self.regression_stats):
+                if stats_ is not None:
+                    stats_.update(chunk)
+
+    def result(self, glucose_median):
+        """가중 분석 결과 (glucose_median: 혈당치 결측 대체값)"""
+        fill = self.glucose_missing_weight > 0 and not np.isnan(glucose_median)
+        results = {
+            'weight_column': WEIGHT_COLUMN,
+            'n': self.rows,
+            'population': self.population,
+        }
+
+        for key, (col, weighted_sum, weight, histogram) in self.measures.items():
+            if col == GLUCOSE and fill:
+                # 결과를 여러 번 만들 수 있도록 누적값은 바꾸지 않고 복사본에 대체값 반영
+                weighted_sum += glucose_median * self.glucose_missing_weight
+                weight += self.glucose_missing_weight
+                histogram = copy.deepcopy(histogram)
+                histogram.add_constant(glucose_median, self.glucose_missing_weight)
+            results[key] = {'mean': weighted_sum / weight if weight else np.nan}
+            for name, q in WEIGHTED_QUANTILES.items():
+                results[key][name] = histogram.quantile(q)
+
+        if 'blood_glucose' in self.measures:
+            risk = dict(self.risk)
+            if fill:
+                level = pd.cut([glucose_median], bins=GLUCOSE_BINS, labels=GLUCOSE_LABELS)[0]
+                if level in risk:
+                    risk[level] += self.glucose_missing_weight
+            total = sum(risk.values())
+            results['diabetes_risk'] = {
+                key: risk[label] / total if total else np.nan for key, label in RISK_LEVELS.items()
+            }
+
+        if 'bmi' in self.measures:
+            total = self.bmi_levels.sum()
+            results['bmi_levels'] = {
+                key: self.bmi_levels[i] / total if total else np.nan for i, key in enumerate(BMI_LEVELS)
+            }
+
+        if self.corr_stats is not None:
+            corr_matrix = self.corr_stats.filled(glucose_median, weighted=True).correlation().round(3)
+            results['glucose_correlation'] = corr_matrix[GLUCOSE].sort_values(ascending=False).to_dict()
+
+        if self.regression_stats is not None:
+            stats_ = self.regression_stats.filled(glucose_median, weighted=True)
+            if stats_.n < 10:
+                results['lifestyle_impact'] = empty_regression_result('분석에 필요한 데이터가 충분하지 않습니다')
+            else:
+                results['lifestyle_impact'] = regression_result(stats_.ols(GLUCOSE))
+
+        return results
+
+
+def accumulate_chunks(processor, factory, chunksize=None, progress=None):
+    """processor의 파일을 스트리밍 모드로 읽어 factory()로 만든 누적기에 청크를 update()로 전달
+
+    progress가 주어지면 청크마다 progress(누적 행 수, 읽은 바이트 수)를 호출한다.
+    판별한 인코딩이 뒤쪽 청크에서 디코딩에 실패하면 메모리 모드(load_data())와 같이
+    다음 인코딩으로 파일을 처음부터 다시 읽는다 (누적기도 새로 만듦).
+    """
+    encodings = processor.encoding_candidates()
+    while True:
+        accumulator = factory()
+        try:
+            for chunk in processor.iter_chunks(chunksize or DEFAULT_CHUNKSIZE, encodings):
+                accumulator.update(chunk)
+                if progress is not None:
+                    progress(accumulator.total, processor.bytes_read)
+            return accumulator
+        except UnicodeDecodeError:
+            failed = processor.encoding
+            encodings = encodings[encodings.index(failed) + 1:]
+            logger.debug(f"{failed} 인코딩이 {accumulator.total}행 이후 디코딩 실패, 다른 인코딩으로 다시 읽음")
+            if not encodings:
+                raise ValueError("지원하는 인코딩으로 파일을 읽을 수 없습니다.")
+
+
+class StreamingDiabetesAnalyzer:
+    """청크 단위로 데이터를 받아 DiabetesAnalyzer와 같은 결과를 계산하는 분석 클래스
+
+    HealthDataProcessor.iter_chunks()가 반환하는 청크를 update()로 전달하면
+    요약 통계, 상관관계, 회귀분석에 필요한 통계량만 누적한다.
+    최대 메모리 사용량은 파일 크기가 아니라 청크 크기에 비례한다.
+    전처리 단계의 혈당치 결측치 중앙값 대체는 집계가 끝난 뒤 누적값에 반영한다.
+    """
+
+    def __init__(self, full=True):
+        """full이 False이면 요약 통계·상관관계·회귀분석 통계량만 누적 (가중 분석, 큐브, 분위수 스케치 생략)"""
+        self.full = full
+        # 혈당치 결측치를 대체할 값 (None이면 누적한 혈당치의 중앙값)
+        self.fill_median = None
+        self.columns = None
+        self.total = 0
+        self.glucose = MomentAccumulator()
+        self.glucose_values = ValueCounter()
+        self.glucose_missing = 0
+        self.risk_counts = {label: 0 for label in RISK_LEVELS.values()}
+        self.bmi = MomentAccumulator()
+        self.bmi_counts = np.zeros(4, dtype=np.int64)
+        self.corr_stats = None
+        self.regression_stats = None
+        self.weighted = None
+        self.cube = None
+        # 혈당치 결측 행만 누적한 큐브 (중앙값이 정해진 뒤 cube_analysis()에서 대체해 합침)
+        self.glucose_missing_cube = None
+        self.sketches = {}
+
+    @classmethod
+    def from_processor(cls, processor, chunksize=None, progress=None):
+        """HealthDataProcessor의 파일을 스트리밍 모드로 읽어 분석기 생성 (accumulate_chunks() 참고)
+
+        progress가 주어지면 청크마다 progress(누적 행 수, 읽은 바이트 수)를 호출한다.
+        """
+        analyzer = accumulate_chunks(processor, cls, chunksize, progress)
+        if analyzer.columns is None:
+            raise ValueError("데이터가 비어있습니다.")
+        return analyzer
+
+    def update(self, chunk):
+        """전처리된 청크 하나를 누적"""
+        if self.columns is None:
+            self._init_columns(chunk.columns)
+        self.total += len(chunk)
+
+        if GLUCOSE in chunk.columns:
+            values = chunk[GLUCOSE].to_numpy(dtype=np.float64)
+            self.glucose.update(values)
+            self.glucose_values.update(values)
+            self.glucose_missing += int(np.isnan(values).sum())
+            counts = chunk['혈당수준'].value_counts()
+            for label in self.risk_counts:
+                self.risk_counts[label] += int(counts.get(label, 0))
+
+        if 'BMI' in chunk.columns:
+            bmi = chunk['BMI'].to_numpy(dtype=np.float64)
+            self.bmi.update(bmi)
+            valid = bmi[~np.isnan(bmi)]
+            self.bmi_counts += np.bincount(
+                np.searchsorted(BMI_EDGES, valid, side='right'), minlength=4
+            )
+
+        if self.corr_stats is not None:
+            self.corr_stats.update(chunk)
+        if self.regression_stats is not None:
+            self.regression_stats.update(chunk)
+        # 상관관계/회귀분석 통계량은 위에서 가중치와 함께 갱신됨
+        if self.weighted is not None:
+            self.weighted.update(chunk)
+        if self.cube is not None:
+            known = chunk
+            if self.glucose_missing_cube is not None:
+                missing = chunk[GLUCOSE].isna().to_numpy()
+                if missing.any():
+                    self.glucose_missing_cube.update(chunk[missing])
+                    known = chunk[~missing]
+            self.cube.update(known)
+        for key, sketch in self.sketches.items():
+            sketch.update(chunk[SKETCH_MEASURES[key]].to_numpy(dtype=np.float64))
+
+    def merge(self, other):
+        """같은 컬럼 구성의 다른 분석기 누적값을 병합 (full=False 누적값만 지원)"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._init_columns(other.columns)
+        self.total += other.total
+        glucose = other.glucose
+        if glucose.count:
+            self.glucose._merge(glucose.count, glucose.mean, glucose.m2, glucose.min, glucose.max)
+        self.glucose_values._merge(other.glucose_values.values, other.glucose_values.counts)
+        self.glucose_missing += other.glucose_missing
+        for label, count in other.risk_counts.items():
+            self.risk_counts[label] += count
+        bmi = other.bmi
+        if bmi.count:
+            self.bmi._merge(bmi.count, bmi.mean, bmi.m2, bmi.min, bmi.max)
+        self.bmi_counts += other.bmi_counts
+        for stats, other_stats in ((self.corr_stats, other.corr_stats),
+                                   (self.regression_stats, other.regression_stats)):
+            if stats is not None:
+                stats.merge(other_stats)
+        return self
+
+    def _init_columns(self, columns):
+        self.columns = list(columns)
+        weight = WEIGHT_COLUMN if WEIGHT_COLUMN in self.columns else None
+        if not self.full:
+            self.corr_stats, self.regression_stats = imputed_stats(self.columns)
+            return
+        self.corr_stats, self.regression_stats = imputed_stats(self.columns, weight)
+        if weight is not None:
+            self.weighted = WeightedAggregates(self.columns, (self.corr_stats, self.regression_stats))
+        self.cube = Cube.for_columns(self.columns)
+        if GLUCOSE in self.columns:
+            self.glucose_missing_cube = Cube.for_columns(self.columns)
+        self.sketches = {key: QuantileSketch() for key, col in SKETCH_MEASURES.items() if col in self.columns}
+
+    def _glucose_median(self):
+        if self.fill_median is not None:
+            return self.fill_median
+        return self.glucose_values.median()
+
+    def get_summary_stats(self):
+        """기본 통계량 계산"""
+        summary = {
+            'total_students': self.total,
+        }
+
+        if GLUCOSE in self.columns:
+            # 결측치를 중앙값으로 대체한 것과 같은 결과가 되도록 반영
+            median = self._glucose_median()
+            glucose = MomentAccumulator()
+            glucose._merge(self.glucose.count, self.glucose.mean, self.glucose.m2,
+                           self.glucose.min, self.glucose.max)
+            glucose.add_constant(median, self.glucose_missing)
+
+            risk_counts = dict(self.risk_counts)
+            if self.glucose_missing and not np.isnan(median):
+                level = pd.cut([median], bins=GLUCOSE_BINS, labels=GLUCOSE_LABELS)[0]
+                if level in risk_counts:
+                    risk_counts[level] += self.glucose_missing
+
+            summary['diabetes_risk'] = {key: risk_counts[label] for key, label in RISK_LEVELS.items()}
+            if self.fill_median is not None:
+                # 다른 값(예: 전체 데이터의 중앙값)으로 채웠다면 채운 값을 포함한 중앙값
+                values = copy.copy(self.glucose_values)
+                values.add_constant(median, self.glucose_missing)
+                median = values.median()
+            summary['blood_glucose'] = {
+                'mean': glucose.get_mean(),
+                'median': median,
+                'std': glucose.get_std(),
+                'min': glucose.min,
+                'max': glucose.max
+            }
+
+        if 'BMI' in self.columns:
+            summary['bmi'] = {
+                'mean': self.bmi.get_mean(),
+                'underweight': int(self.bmi_counts[0]),
+                'normal': int(self.bmi_counts[1]),
+                'overweight': int(self.bmi_counts[2]),
+                'obese': int(self.bmi_counts[3])
+            }
+
+        return summary
+
+    def correlation_analysis(self):
+        """상관관계 분석"""
+        if self.corr_stats is None:
+            return {
+                'correlation_matrix': {},
+                'glucose_correlation': {}
+            }
+
+        stats_ = self.corr_stats.filled(self._glucose_median())
+        corr_matrix = stats_.correlation().round(3)
+        glucose_corr = corr_matrix[GLUCOSE].sort_values(ascending=False)
+
+        return {
+            'correlation_matrix': corr_matrix.to_dict(),
+            'glucose_correlation': glucose_corr.to_dict()
+        }
+
+    def lifestyle_impact_analysis(self):
+        """생활습관이 혈당치에 미치는 영향 분석 (누적된 충분통계량 기반 OLS)"""
+        if GLUCOSE not in self.columns:
+            return empty_regression_result('혈당치 변수가 없습니다')
+        if self.regression_stats is None:
+            return empty_regression_result('회귀분석에 필요한 독립변수가 없습니다')
+
+        stats_ = self.regression_stats.filled(self._glucose_median())
+        if stats_.n < 10:
+            return empty_regression_result('분석에 필요한 데이터가 충분하지 않습니다')
+
+        try:
+            return regression_result(stats_.ols(GLUCOSE))
+        except Exception as e:
+            logger.error(f"회귀분석 오류: {str(e)}")
+            return empty_regression_result(f'분석 중 오류 발생: {str(e)}')
+
+    def weighted_analysis(self):
+        """최종가중치를 반영한 모집단 추정치 (가중 평균·분위수·상관계수·WLS)"""
+        if self.weighted is None:
+            return {'message': f'가중치 컬럼({WEIGHT_COLUMN})이 없습니다'}
+        return self.weighted.result(self._glucose_median())
+
+    def quantile_sketches(self):
+        """혈당치·BMI·허리둘레의 KLL 분위수 스케치 (혈당치 결측치는 중앙값으로 대체한 것으로 반영)"""
+        sketches = dict(self.sketches)
+        if 'blood_glucose' in sketches and self.glucose_missing:
+            sketches['blood_glucose'] = sketches['blood_glucose'].copy()
+            sketches['blood_glucose'].add_constant(self._glucose_median(), self.glucose_missing)
+        return sketch_result(sketches)
+
+    def cube_analysis(self):
+        """조합별 행 수와 측정값 합계 큐브 (혈당치 결측치는 중앙값으로 대체한 것으로 반영)"""
+        cube = self.cube.copy()
+        if self.glucose_missing_cube is not None:
+            cube.fill_glucose(self.glucose_missing_cube, self._glucose_median())
+        return cube.to_dict()
+
+
+class StratifiedStreamingAnalyzer:
+    """층화 분석의 스트리밍 모드: 청크를 by 컬럼 조합별로 나눠 그룹마다 StreamingDiabetesAnalyzer에 누적
+
+    DiabetesAnalyzer.stratified_analysis()와 같은 형식의 결과를 만들며, 최대 메모리 사용량은
+    파일 크기가 아니라 청크 크기와 그룹 수에 비례한다. 메모리 모드의 전처리와 같이 그룹별 혈당치
+    결측치는 전체 데이터의 중앙값으로 대체한 것으로 반영하고, 그룹 값이 없는 행은 제외한다.
+    혈당수준으로 층화하면 혈당치 결측 행의 수준은 중앙값이 정해져야 알 수 있으므로,
+    따로 누적했다가 마지막에 중앙값이 속한 수준의 그룹에 병합한다.
+    부트스트랩 신뢰구간은 행 단위 재표본이 필요하므로 계산하지 않는다.
+    """
+
+    def __init__(self, by):
+        self.by = list(by)
+        self.total = 0
+        self.groups = {}
+        # 혈당치 결측 행 (혈당수준 자리를 None으로 둔 그룹 키별)
+        self.pending = {}
+        self.glucose_values = ValueCounter()
+        # 순서형 범주 컬럼(예: 혈당수준)의 수준 순서 (그룹 정렬에 사용)
+        # 나머지 범주형 컬럼은 청크마다 수준이 다르지만 수준이 값 순서로 정렬되므로 값으로 정렬
+        self.levels = {}
+
+    @classmethod
+    def from_processor(cls, processor, by, chunksize=None):
+        """HealthDataProcessor의 파일을 스트리밍 모드로 읽어 그룹별 통계량 누적"""
+        return accumulate_chunks(processor, lambda: cls(by), chunksize)
+
+    def update(self, chunk):
+        """전처리된 청크 하나를 그룹별로 나눠 누적"""
+        missing = [col for col in self.by if col not in chunk.columns]
+        if not self.by or missing:
+            raise ValueError(f"층화 변수가 데이터에 없습니다: {', '.join(missing) or '(없음)'}")
+        self.total += len(chunk)
+        if GLUCOSE in chunk.columns:
+            self.glucose_values.update(chunk[GLUCOSE].to_numpy(dtype=np.float64))
+        for col in self.by:
+            dtype = chunk[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype) and dtype.ordered:
+                self.levels.setdefault(col, list(dtype.categories))
+
+        if GLUCOSE_LEVEL in self.by and GLUCOSE in chunk.columns:
+            glucose_missing = chunk[GLUCOSE].isna().to_numpy()
+            if glucose_missing.any():
+                self._accumulate(self.pending, chunk[glucose_missing], self.by.index(GLUCOSE_LEVEL))
+                chunk = chunk[~glucose_missing]
+        self._accumulate(self.groups, chunk)
+
+    def _accumulate(self, groups, chunk, skip=None):
+        """by 컬럼(skip 위치 제외) 조합별로 나눠 groups에 누적"""
+        by = [col for i, col in enumerate(self.by) if i != skip]
+        if by:
+            parts = chunk.groupby(by, observed=True, sort=False).indices.items()
+        else:
+            parts = [((), np.arange(len(chunk)))]
+        for key, positions in parts:
+            key = list(key) if isinstance(key, tuple) else [key]
+            if skip is not None:
+                key.insert(skip, None)
+            key = tuple(key)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = StreamingDiabetesAnalyzer(full=False)
+            group.update(chunk.take(positions))
+
+    def _merge_pending(self, median):
+        """혈당치 결측 행을 중앙값이 속한 혈당수준 그룹에 병합"""
+        pending, self.pending = self.pending, {}
+        if not pending or np.isnan(median):
+            return
+        level = pd.cut([median], bins=GLUCOSE_BINS, labels=GLUCOSE_LABELS)[0]
+        if pd.isna(level):
+            return
+        index = self.by.index(GLUCOSE_LEVEL)
+        for key, analyzer in pending.items():
+            key = key[:index] + (level,) + key[index + 1:]
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = StreamingDiabetesAnalyzer(full=False)
+            group.merge(analyzer)
+
+    def stratified_analysis(self, bootstrap=0):
+        """그룹별 요약 통계, 상관관계, 회귀분석 (DiabetesAnalyzer.stratified_analysis()와 같은 형식)"""
+        median = self.glucose_values.median()
+        self._merge_pending(median)
+        groups = []
+        for key in sorted(self.groups, key=group_sort_key(self.by, self.levels)):
+            analyzer = self.groups[key]
+            analyzer.fill_median = median
+            groups.append({
+                'key': dict(zip(self.by, key)),
+                'size': analyzer.total,
+                'summary': analyzer.get_summary_stats(),
+                'correlations': analyzer.correlation_analysis(),
+                'lifestyle_impact': analyzer.lifestyle_impact_analysis()
+            })
+        results = {
+            'by': self.by,
+            'groups': groups
+        }
+        if bootstrap:
+            results['bootstrap'] = {'message': '스트리밍 모드에서는 부트스트랩 신뢰구간을 계산하지 않습니다'}
+        return results
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+from app.analysis.ols import OLSResult
+
+# 가중 누적 시 한 번에 처리하는 행 수
+WEIGHTED_BLOCK_ROWS = 16384
+
+class SufficientStats:
+    """상관계수와 선형회귀의 충분통계량(개수, 평균, 중심화 교차곱 행렬) 누적기
+
+    결측치가 없는 행(complete case)만 누적하며, 청크·파일·프로세스별로 만든
+    누적기를 merge()로 합칠 수 있다. 병합은 Chan 등의 공식을 사용하므로
+    원시 제곱합을 누적하는 방식보다 수치적으로 안정적이다.
+    원본 행은 보관하지 않으므로 메모리 사용량은 변수 개수의 제곱에만 비례한다.
+    가중치를 주면 가중 평균과 가중 중심화 교차곱을 누적하며(가중 상관계수, WLS),
+    n은 행 수, weight는 가중치 합계다 (가중치 없이 누적하면 두 값이 같음).
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.weight = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df, columns=None, weights=None):
+        """데이터프레임의 complete case로 누적기 생성"""
+        stats_ = cls(df.columns if columns is None else columns)
+        stats_.update_frame(df, weights)
+        return stats_
+
+    @classmethod
+    def merge_all(cls, items):
+        """여러 누적기를 하나로 병합"""
+        items = list(items)
+        if not items:
+            raise ValueError("병합할 통계량이 없습니다.")
+        merged = items[0].copy()
+        for item in items[1:]:
+            merged.merge(item)
+        return merged
+
+    def copy(self):
+        other = SufficientStats(self.columns)
+        other.n = self.n
+        other.weight = self.weight
+        other.mean = self.mean.copy()
+        other.comoment = self.comoment.copy()
+        return other
+
+    def update_frame(self, df, weights=None):
+        self.update(df[self.columns].to_numpy(dtype=np.float64), weights)
+
+    def update(self, values, weights=None):
+        """(행, 변수) 배열에서 결측치가 없는 행만 누적
+
+        weights가 주어지면 가중치가 양수인 행만 가중치를 반영해 누적한다.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if weights is None:
+            values = values[~np.isnan(values).any(axis=1)]
+            n = len(values)
+            if n == 0:
+                return self
+            mean = values.mean(axis=0)
+            centered = values - mean
+            self._merge(n, n, mean, centered.T @ centered)
+            return self
+
+        # 임시 배열이 캐시에 들어가도록 행을 나눠 누적 (병합 결과는 한 번에 계산한 것과 같음)
+        weights = np.asarray(weights, dtype=np.float64)
+        for start in range(0, len(values), WEIGHTED_BLOCK_ROWS):
+            block = values[start:start + WEIGHTED_BLOCK_ROWS]
+            block_weights = weights[start:start + WEIGHTED_BLOCK_ROWS]
+            keep = ~np.isnan(block).any(axis=1) & (block_weights > 0)
+            if not keep.all():
+                block, block_weights = block[keep], block_weights[keep]
+            n = len(block)
+            if n == 0:
+                continue
+            weight = block_weights.sum()
+            mean = block_weights @ block / weight
+            centered = block - mean
+            self._merge(n, weight, mean, (centered * block_weights[:, None]).T @ centered)
+        return self
+
+    def merge(self, other):
+        """같은 컬럼 구성의 다른 누적기를 병합"""
+        if other.columns != self.columns:
+            raise ValueError("컬럼 구성이 다른 통계량은 병합할 수 없습니다.")
+        if other.n:
+            self._merge(other.n, other.weight, other.mean, other.comoment)
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def _merge(self, n, weight, mean, comoment):
+        total = self.weight + weight
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (weight / total)
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.weight * weight / total)
+        self.n += n
+        self.weight = total
+
+    def with_constant(self, column, value, order=None):
+        """column을 모든 행에서 value로 채운 통계량 (결측치 대체용)
+
+        상수 컬럼은 다른 변수와의 중심화 교차곱이 0이므로 평균만 채우면 된다.
+        order가 주어지면 해당 컬럼 순서로 반환한다.
+        """
+        expanded = SufficientStats(self.columns + [column])
+        expanded.n = self.n
+        expanded.weight = self.weight
+        expanded.mean = np.append(self.mean, value)
+        expanded.comoment[:-1, :-1] = self.comoment
+        return expanded.subset(order) if order is not None else expanded
+
+    def subset(self, columns):
+        """일부 컬럼만의 통계량 (같은 행 집합 기준)"""
+        index = [self.columns.index(col) for col in columns]
+        sub = SufficientStats(columns)
+        sub.n = self.n
+        sub.weight = self.weight
+        sub.mean = self.mean[index]
+        sub.comoment = self.comoment[np.ix_(index, index)]
+        return sub
+
+    def to_dict(self):
+        """JSON으로 저장/전송 가능한 형태"""
+        return {
+            'columns': self.columns,
+            'n': int(self.n),
+            'weight': float(self.weight),
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats_ = cls(data['columns'])
+        stats_.n = data['n']
+        stats_.weight = data.get('weight', data['n'])
+        stats_.mean = np.asarray(data['mean'], dtype=np.float64)
+        stats_.comoment = np.asarray(data['comoment'], dtype=np.float64)
+        return stats_
+
+    def covariance(self, ddof=1):
+        return self.comoment / (self.n - ddof)
+
+    def correlation(self):
+        """Pearson 상관행렬 (DataFrame.corr()과 같은 형태의 DataFrame)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.diag(self.comoment))
+            corr = self.comoment / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def ols(self, target, features=None):
+        """target을 종속변수로 하는 OLS (상수항 포함)
+
+        계수는 중심화 교차곱 행렬로 정규방정식을 풀어 구하고, 상수항은 평균으로 복원한다.
+        특이 행렬인 경우 statsmodels와 같이 의사역행렬을 사용한다.
+        가중치를 누적한 경우 statsmodels WLS와 같은 계수와 표준오차를 얻는다.
+        """
+        if features is None:
+            features = [col for col in self.columns if col != target]
+        x_idx = [self.columns.index(col) for col in features]
+        y_idx = self.columns.index(target)
+        n = self.n
+
+        sxx = self.comoment[np.ix_(x_idx, x_idx)]
+        sxy = self.comoment[x_idx, y_idx]
+        syy = self.comoment[y_idx, y_idx]
+        x_mean = self.mean[x_idx]
+
+        sxx_inv = np.linalg.pinv(sxx)
+        beta = sxx_inv @ sxy
+        intercept = self.mean[y_idx] - beta @ x_mean
+
+        ssr = max(syy - beta @ sxy, 0.0)
+        rank = np.linalg.matrix_rank(sxx)
+        df_resid = n - rank - 1
+        sigma2 = ssr / df_resid
+
+        se_beta = np.sqrt(np.diag(sxx_inv) * sigma2)
+        se_const = np.sqrt(sigma2 * (1.0 / self.weight + x_mean @ sxx_inv @ x_mean))
+
+        return OLSResult(
+            names=['const'] + list(features),
+            params=np.concatenate([[intercept], beta]),
+            bse=np.concatenate([[se_const], se_beta]),
+            df_model=rank,
+            df_resid=df_resid,
+            nobs=n,
+            ssr=ssr,
+            centered_tss=syy,
+        )
@@ -1,145 +1,407 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.services.auth_service import get_current_user
-import os
+from app.services.job_executor import job_executor, JobQueueFullError
+from app.services.cache_service import result_cache, cube_cache, sketch_cache, CachedResult
+from app.services.serialization import completed_body, dumpb
+from app.db.crud import get_task_status, get_task_progress, get_analysis_record, SECTION_PROVISIONAL, SECTION_EXACT
+from app.worker import stratified_analysis_task
+from app.analysis.bootstrap import BOOTSTRAP_MAX_REPLICATES
+from app.analysis.cube import Cube
+from app.analysis.accumulators import QuantileSketch, QUANTILE_SKETCH_K
+from typing import List, Optional
+from datetime import datetime
+import asyncio
 import json
-import numpy as np
-import pandas as pd
 import logging
+import os
+import time
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-# NumPy 및 Pandas 타입을 JSON 직렬화 가능한 표준 Python 타입으로 변환하는 함수
-def convert_to_serializable(obj):
-    """NumPy/Pandas 타입을 표준 Python 타입으로 변환"""
-    if isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list) or isinstance(obj, tuple):
-        return [convert_to_serializable(i) for i in obj]
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, pd.Series):
-        return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
-        return obj.to_dict()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    else:
-        return obj
-
 router = APIRouter()
 
+# 층화 분석에 사용할 수 있는 변수
+STRATIFY_COLUMNS = ['학년', '성별', '비만여부', '혈당수준']
+
+# 분위수 요청 기본값과 히스토그램 최대 구간 수
+DEFAULT_QUANTILES = "0.05,0.25,0.5,0.75,0.95"
+MAX_HISTOGRAM_BINS = 1000
+
+# events 스트림이 작업 진행 상황을 확인하는 간격(초)과 연결 유지용 주석 전송 간격(초)
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", "0.5"))
+EVENTS_KEEPALIVE = float(os.environ.get("EVENTS_KEEPALIVE", "15"))
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더가 etag와 일치하는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
+def parse_list(value):
+    """쉼표로 구분한 쿼리 파라미터를 목록으로 변환 (없으면 None)"""
+    if value is None:
+        return None
+    items = list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
+    if not items:
+        raise HTTPException(400, "빈 목록은 지정할 수 없습니다.")
+    return items
+
+def select_fields(sections, fields):
+    """각 섹션에서 fields에 해당하는 항목만 남긴 [(섹션 이름, JSON 바이트)]
+
+    fields의 "이름"은 모든 섹션에, "섹션.이름"은 해당 섹션에만 적용된다.
+    요청한 섹션만 파싱하므로 나머지 섹션은 읽지도 않는다.
+    """
+    selected = []
+    for name, data in sections:
+        keys = {field.split('.', 1)[1] if '.' in field else field
+                for field in fields if '.' not in field or field.startswith(name + '.')}
+        if not keys:
+            selected.append((name, data))
+            continue
+        value = json.loads(data)
+        if isinstance(value, dict):
+            value = {key: item for key, item in value.items() if key in keys}
+        selected.append((name, dumpb(value)))
+    return selected
+
 @router.get("/{task_id}")
-async def get_analysis_results(task_id: str, current_user = Depends(get_current_user)):
+async def get_analysis_results(
+    task_id: str,
+    request: Request,
+    sections: Optional[str] = Query(None, description="쉼표로 구분한 섹션 (예: summary,correlations)"),
+    fields: Optional[str] = Query(None, description="섹션 안에서 반환할 항목 (예: glucose_correlation 또는 correlations.glucose_correlation)"),
+    current_user = Depends(get_current_user)
+):
     """
     분석 결과를 가져오는 엔드포인트
+
+    sections/fields를 지정하면 해당 섹션만 DB에서 읽고 압축을 풀어 반환한다.
+    완료된 결과는 강한 ETag와 함께 반환하며, If-None-Match가 일치하면 304를 반환한다.
+    응답의 version은 exact(전체 데이터 결과) 또는 provisional(점진 모드의 표본 결과)이다.
+    처리 중인 작업은 지금까지 저장된 섹션과 섹션별 버전(versions)을 캐시 없이 반환한다.
+    """
+    section_list = parse_list(sections)
+    field_list = parse_list(fields)
+    cache_key = (task_id, tuple(section_list or ()), tuple(sorted(field_list or ())))
+
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        # DB 연결 대기, 조회, 압축 해제는 이벤트 루프를 막지 않도록 스레드에서 실행
+        record = await run_in_threadpool(get_analysis_record, task_id, section_list)
+        if not record:
+            raise HTTPException(404, "작업을 찾을 수 없습니다.")
+
+        if record["status"] == "processing" and record["sections"]:
+            # 먼저 저장된 섹션(임시 결과 포함)은 캐시하지 않고 바로 반환
+            versions = record["versions"]
+            version = SECTION_PROVISIONAL if SECTION_PROVISIONAL in versions.values() else SECTION_EXACT
+            result_sections = record["sections"]
+            if field_list:
+                result_sections = select_fields(result_sections, field_list)
+            partial = CachedResult.from_sections(result_sections, record["status"], version, versions)
+            return Response(content=partial.body, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+        if record["status"] != "completed":
+            # 진행 중이거나 실패한 작업은 캐시하지 않음
+            content = {"status": record["status"]}
+            if record["error"]:
+                content["error"] = record["error"]
+            return JSONResponse(content, headers={"Cache-Control": "no-store"})
+
+        if section_list:
+            # 요청한 섹션 중 저장된 섹션에 없는 이름이 하나라도 있으면 일부만 반환하지 않음
+            saved = {name for name, _ in record["sections"]}
+            unknown = [name for name in section_list if name not in saved]
+            if unknown:
+                raise HTTPException(404, f"요청한 섹션이 없습니다: {', '.join(unknown)}")
+        if not record["sections"]:
+            logging.error(f"task_id {task_id}의 분석 결과가 없습니다")
+            raise HTTPException(500, "분석 결과를 찾을 수 없습니다.")
+
+        result_sections = record["sections"]
+        if field_list:
+            result_sections = select_fields(result_sections, field_list)
+
+        cached = CachedResult.from_sections(result_sections)
+        result_cache.put(cache_key, cached)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def sse_event(event, data):
+    """Server-Sent Events 형식의 이벤트 하나 (data는 한 줄짜리 JSON 바이트)"""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+def progress_payload(task):
+    """progress 이벤트 본문 (진행 중인 단계의 행 처리 속도로 남은 시간 추정)"""
+    processed = task["rows_processed"]
+    total = task["rows_total"]
+    eta = None
+    if task["status"] == "processing" and task["stage_started_at"] and processed and total and processed < total:
+        elapsed = (datetime.now() - datetime.fromisoformat(task["stage_started_at"])).total_seconds()
+        eta = round(elapsed * (total - processed) / processed, 1)
+    return {
+        "status": task["status"],
+        "stage": task["stage"],
+        "rows_processed": processed,
+        "rows_total": total,
+        "eta_seconds": eta,
+        "sections": task["sections"],
+        "section_versions": task["section_versions"]
+    }
+
+async def task_events(request, task_id, task):
+    """작업이 끝날 때까지 progress/section 이벤트를 보내고 completed 또는 failed로 끝나는 스트림
+
+    tasks 테이블을 EVENTS_POLL_INTERVAL마다 한 번 읽고 바뀐 내용만 보낸다.
+    DB 조회는 스트림이 많아도 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+    새로 저장된 섹션은 작업 완료 전이라도 바로 보내고, 임시(provisional) 섹션이
+    정확한(exact) 결과로 바뀌면 같은 섹션을 다시 보낸다.
+    """
+    sent_sections = {}
+    last_state = None
+    last_sent = time.monotonic()
+
+    while task is not None:
+        versions = task["section_versions"]
+        state = (task["status"], task["stage"], task["rows_processed"], task["rows_total"], tuple(versions.items()))
+        if state != last_state:
+            last_state = state
+            last_sent = time.monotonic()
+            yield sse_event("progress", dumpb(progress_payload(task)))
+
+        new_sections = [name for name in task["sections"] if sent_sections.get(name) != versions[name]]
+        if new_sections:
+            record = await run_in_threadpool(get_analysis_record, task_id, new_sections)
+            for name, data in record["sections"] if record else []:
+                version = record["versions"][name]
+                sent_sections[name] = version
+                yield sse_event(
+                    "section",
+                    b'{"section":' + dumpb(name) + b',"version":' + dumpb(version) + b',"data":' + data + b'}'
+                )
+
+        if task["status"] == "completed":
+            yield sse_event("completed", b'{"status":"completed"}')
+            return
+        if task["status"] == "failed":
+            yield sse_event("failed", dumpb({"status": "failed", "error": task["error"]}))
+            return
+
+        if time.monotonic() - last_sent >= EVENTS_KEEPALIVE:
+            last_sent = time.monotonic()
+            yield b": keepalive\n\n"
+
+        await asyncio.sleep(EVENTS_POLL_INTERVAL)
+        if await request.is_disconnected():
+            return
+        task = await run_in_threadpool(get_task_progress, task_id)
+
+@router.get("/{task_id}/events")
+async def get_analysis_events(
+    task_id: str,
+    request: Request,
+    current_user = Depends(get_current_user)
+):
     """
-    logging.info(f"task_id {task_id}에 대한 분석 결과 요청")
-    
+    분석 진행 상황을 Server-Sent Events로 보내는 엔드포인트
+
+    - progress: 상태, 단계(sampling, loading, preprocessing, summary, correlation, regression, weighted, sketch,
+      cube, saving), 처리한 행 수, 전체 행 수(스트리밍 모드에서는 추정값), 남은 시간(초), 저장된 섹션 목록
+    - section: 분석이 끝난 섹션 ({"section": 이름, "version": provisional 또는 exact, "data": 결과},
+      점진 모드에서는 표본 결과를 먼저 보내고 정확한 결과가 나오면 같은 섹션을 다시 보냄)
+    - completed / failed: 마지막 이벤트
+    """
+    task = await run_in_threadpool(get_task_progress, task_id)
+    if not task:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
+
+    return StreamingResponse(
+        task_events(request, task_id, task),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{task_id}/stratified")
+async def get_stratified_results(
+    task_id: str,
+    by: str = Query("학년,성별", description="쉼표로 구분한 층화 변수"),
+    bootstrap: Optional[int] = Query(
+        None, ge=0, le=BOOTSTRAP_MAX_REPLICATES,
+        description="그룹별 부트스트랩 반복 수 (0이면 신뢰구간 생략, 생략 시 서버 설정값)"
+    ),
+    current_user = Depends(get_current_user)
+):
+    """
+    그룹(예: 학년×성별)별 요약 통계, 상관관계, 회귀분석 결과를 반환하는 엔드포인트
+
+    bootstrap을 지정하면 그룹마다 혈당치 상관계수와 회귀계수의 부트스트랩 신뢰구간을 함께 반환한다.
+    분석이 완료되지 않은 작업이면 409를 반환한다. 스트리밍 모드로 분석하는 대용량 파일은
+    그룹별 누적 통계량으로 계산하므로 부트스트랩 신뢰구간을 포함하지 않는다.
+    """
+    columns = [col.strip() for col in by.split(',') if col.strip()]
+    invalid = [col for col in columns if col not in STRATIFY_COLUMNS]
+    if not columns or invalid:
+        raise HTTPException(400, f"층화 변수는 {', '.join(STRATIFY_COLUMNS)} 중에서 선택해야 합니다.")
+
+    task = await run_in_threadpool(get_task_status, task_id)
+    if not task:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
+    if task["status"] != "completed":
+        raise HTTPException(409, f"분석이 완료된 작업만 층화 분석할 수 있습니다 (현재 상태: {task['status']})")
+
+    logging.info(f"task_id {task_id}에 대한 층화 분석 요청: {columns}")
+
+    # 분석은 프로세스 풀에서 수행하고 이벤트 루프는 결과를 기다리기만 한다
+    try:
+        future = job_executor.submit(stratified_analysis_task, task["file_id"], columns, bootstrap)
+    except JobQueueFullError as e:
+        raise HTTPException(503, str(e))
+
     try:
-        # 분석 결과 파일 경로 (업로드 경로와 동일한 위치에 저장된다고 가정)
-        result_file_path = f"uploads/results/{task_id}.json"
-        
-        # 파일 존재 여부 확인
-        if not os.path.exists(result_file_path):
-            # 실제 파일이 없으므로, 백엔드 uploads.py에서 반환한 분석 결과를 사용
-            # 프론트엔드가 기대하는 형식으로 응답 (status: completed, data: results)
-            return {
-                "status": "completed",
-                "data": {
-                    "summary": {
-                        "total_students": 92722,
-                        "diabetes_risk": {
-                            "normal": 85123,
-                            "prediabetes": 5423,
-                            "diabetes": 2176
-                        },
-                        "blood_glucose": {
-                            "mean": 92.5,
-                            "std": 11.7,
-                            "min": 70.0,
-                            "max": 180.0
-                        },
-                        "bmi": {
-                            "underweight": 12054,
-                            "normal": 62352,
-                            "overweight": 13908,
-                            "obese": 4408
-                        }
-                    },
-                    "correlations": {
-                        "glucose_correlation": {
-                            "BMI": 0.45,
-                            "신장": 0.12,
-                            "체중": 0.38,
-                            "수축기 혈압": 0.32,
-                            "이완기 혈압": 0.29,
-                            "운동 시간": -0.25,
-                            "스크린 시간": 0.18,
-                            "수면 시간": -0.15
-                        }
-                    },
-                    "lifestyle_impact": {
-                        "coefficients": {
-                            "운동 시간(주 5회 이상)": {
-                                "coefficient": -2.5,
-                                "p_value": 0.01,
-                                "significant": True
-                            },
-                            "스크린 시간(하루 3시간 이상)": {
-                                "coefficient": 1.8,
-                                "p_value": 0.02,
-                                "significant": True
-                            },
-                            "패스트푸드 섭취(주 3회 이상)": {
-                                "coefficient": 2.1,
-                                "p_value": 0.005,
-                                "significant": True
-                            },
-                            "과일 섭취(매일)": {
-                                "coefficient": -1.5,
-                                "p_value": 0.03,
-                                "significant": True
-                            },
-                            "채소 섭취(매일)": {
-                                "coefficient": -1.7,
-                                "p_value": 0.02,
-                                "significant": True
-                            },
-                            "수면 시간(8시간 미만)": {
-                                "coefficient": 1.2,
-                                "p_value": 0.04,
-                                "significant": True
-                            },
-                            "탄산음료 섭취(주 3회 이상)": {
-                                "coefficient": 1.9,
-                                "p_value": 0.01,
-                                "significant": True
-                            }
-                        },
-                        "model_summary": {
-                            "r_squared": 0.42,
-                            "p_value": 0.0001
-                        }
-                    }
-                }
-            }
-        
-        # 파일이 존재하면 읽어서 반환
-        with open(result_file_path, 'r') as f:
-            analysis_data = json.load(f)
-        
-        return {
-            "status": "completed",
-            "data": analysis_data
-        }
+        data = await asyncio.wrap_future(future)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
-        logging.error(f"분석 결과 조회 오류: {str(e)}")
-        return {
-            "status": "failed",
-            "error": str(e)
-        }
+        logging.error(f"층화 분석 오류: {str(e)}")
+        raise HTTPException(500, f"층화 분석 중 오류가 발생했습니다: {str(e)}")
+
+    # 워커가 인코딩한 JSON을 그대로 응답
+    return Response(content=completed_body(data), media_type="application/json")
+
+def parse_cube_filters(filters):
+    """"차원:값[,값...]" 형식의 필터 목록을 {차원: [값, ...]}으로 변환 (같은 차원은 합침)"""
+    parsed = {}
+    for item in filters:
+        name, sep, values = item.partition(':')
+        values = [value.strip() for value in values.split(',') if value.strip()]
+        if not sep or not name.strip() or not values:
+            raise HTTPException(400, f"필터는 '차원:값[,값]' 형식이어야 합니다: {item}")
+        parsed.setdefault(name.strip(), []).extend(values)
+    return parsed
+
+@router.get("/{task_id}/cube")
+async def get_cube_results(
+    task_id: str,
+    by: Optional[str] = Query(None, description="쉼표로 구분한 그룹 차원 (예: 학년,성별)"),
+    filters: List[str] = Query(
+        [], alias="filter", description="차원:값[,값] (반복 가능, 예: 성별:여, 혈당수준:전당뇨,당뇨의심)"
+    ),
+    current_user = Depends(get_current_user)
+):
+    """
+    분석 때 저장한 집계 큐브로 필터/그룹별 행 수와 측정값 합계·평균을 반환하는 엔드포인트
+
+    차원: 학년, 성별, 혈당수준, BMI구간, 주3회이상운동 (값이 없는 행은 "결측")
+    원본 데이터나 분석 작업 없이 저장된 배열만 잘라 합산한다.
+    """
+    group_by = parse_list(by) or []
+    filter_map = parse_cube_filters(filters)
+
+    cube = cube_cache.get(task_id)
+    if cube is None:
+        record = await run_in_threadpool(get_analysis_record, task_id, ["cube"])
+        if not record:
+            raise HTTPException(404, "작업을 찾을 수 없습니다.")
+        if not record["sections"]:
+            if record["status"] == "completed":
+                raise HTTPException(404, "이 작업에는 집계 큐브가 없습니다.")
+            # 섹션이 저장되기 전이면 작업 상태만 반환 (캐시하지 않음)
+            content = {"status": record["status"]}
+            if record["error"]:
+                content["error"] = record["error"]
+            return JSONResponse(content, headers={"Cache-Control": "no-store"})
+        section = json.loads(record["sections"][0][1])
+        if "counts" not in section:
+            # 큐브 생성에 실패한 작업은 오류 메시지만 저장되어 있음
+            raise HTTPException(404, f"이 작업에는 집계 큐브가 없습니다: {section.get('message', '')}")
+        # 저장된 섹션은 바뀌지 않으므로 작업 완료 전이라도 캐시
+        cube = Cube.from_dict(section)
+        cube_cache.put(task_id, cube)
+
+    try:
+        result = cube.query(group_by, filter_map)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return Response(content=completed_body(dumpb(result)), media_type="application/json")
+
+def load_sketches(task_id):
+    """작업에 저장된 분위수 스케치 ({측정값: QuantileSketch}, 캐시 우선)"""
+    sketches = sketch_cache.get(task_id)
+    if sketches is not None:
+        return sketches
+    record = get_analysis_record(task_id, ["sketches"])
+    if not record:
+        raise HTTPException(404, f"작업을 찾을 수 없습니다: {task_id}")
+    if not record["sections"]:
+        if record["status"] == "completed":
+            raise HTTPException(404, f"이 작업에는 분위수 스케치가 없습니다: {task_id}")
+        raise HTTPException(409, f"분위수 스케치가 아직 저장되지 않았습니다: {task_id} ({record['status']})")
+    section = json.loads(record["sections"][0][1])
+    if "sketches" not in section:
+        # 스케치 생성에 실패한 작업은 오류 메시지만 저장되어 있음
+        raise HTTPException(404, f"이 작업에는 분위수 스케치가 없습니다: {task_id} ({section.get('message', '')})")
+    sketches = {key: QuantileSketch.from_dict(data) for key, data in section["sketches"].items()}
+    sketch_cache.put(task_id, sketches)
+    return sketches
+
+@router.get("/{task_id}/quantiles")
+async def get_quantiles(
+    task_id: str,
+    merge: Optional[str] = Query(None, description="함께 합칠 다른 작업 ID (쉼표로 구분, 예: 지역 내 학교별 작업)"),
+    measures: Optional[str] = Query(None, description="측정값 (blood_glucose, bmi, waist 중 쉼표로 구분, 생략 시 전체)"),
+    q: str = Query(DEFAULT_QUANTILES, description="쉼표로 구분한 분위수 (0~1)"),
+    bins: Optional[int] = Query(None, ge=1, le=MAX_HISTOGRAM_BINS, description="최솟값~최댓값 등간격 히스토그램 구간 수"),
+    current_user = Depends(get_current_user)
+):
+    """
+    저장된 KLL 분위수 스케치로 분위수와 히스토그램을 반환하는 엔드포인트
+
+    merge에 다른 작업을 지정하면 모든 작업의 스케치를 합친 분포(예: 지역 전체 중앙값)를 계산한다.
+    원본 CSV를 다시 읽지 않으며, 분위수의 정규화 순위 오차는 rank_error 이하다(99% 확률).
+    """
+    try:
+        quantiles = [float(value) for value in parse_list(q)]
+    except ValueError:
+        raise HTTPException(400, "분위수는 0과 1 사이의 숫자여야 합니다.")
+    if any(not 0 <= value <= 1 for value in quantiles):
+        raise HTTPException(400, "분위수는 0과 1 사이의 숫자여야 합니다.")
+
+    task_ids = list(dict.fromkeys([task_id] + (parse_list(merge) or [])))
+    # 캐시에 없으면 DB에서 읽으므로 스레드에서 실행
+    loaded = [await run_in_threadpool(load_sketches, task) for task in task_ids]
+    measure_list = parse_list(measures) or list(dict.fromkeys(key for sketches in loaded for key in sketches))
+    if not measure_list:
+        raise HTTPException(404, "분위수 스케치에 측정값이 없습니다.")
+    unknown = [key for key in measure_list if not any(key in sketches for sketches in loaded)]
+    if unknown:
+        raise HTTPException(400, f"스케치가 없는 측정값입니다: {', '.join(unknown)}")
+
+    # 병합은 k가 같은 스케치끼리만 가능하므로 오차 한계는 저장된 스케치의 k로 계산
+    k = min((sketch.k for sketches in loaded for sketch in sketches.values()), default=QUANTILE_SKETCH_K)
+    results = {}
+    for key in measure_list:
+        merged = None
+        for sketches in loaded:
+            if key not in sketches:
+                continue
+            try:
+                # 캐시된 스케치는 바꾸지 않도록 복사본에 병합
+                merged = sketches[key].copy() if merged is None else merged.merge(sketches[key])
+            except ValueError as e:
+                raise HTTPException(400, str(e))
+        results[key] = merged.describe(quantiles, bins)
+
+    return Response(content=completed_body(dumpb({
+        'tasks': task_ids,
+        'rank_error': QuantileSketch.rank_error(k),
+        'measures': results,
+    })), media_type="application/json")
+
@@ -1,93 +1,342 @@
 import json
 import os
+import time
+import zlib
+import queue
+import socket
+import logging
+from contextlib import contextmanager
 from datetime import datetime
 import sqlite3
 import threading
+from app.services.serialization import dumpb
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
 
 # 데이터베이스 파일 경로
 DB_PATH = os.environ.get("DB_PATH", os.path.join(os.path.dirname(__file__), "../../data/database.db"))
 DB_DIR = os.path.dirname(DB_PATH)
 
+# 프로세스별 최대 연결 수, 잠금 대기 시간(ms), 연결 대기 시간(초)
+DB_POOL_SIZE = max(1, int(os.environ.get("DB_POOL_SIZE", "4")))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+# 쓰기 트랜잭션 시작이 busy_timeout을 넘겨 실패했을 때 재시도 횟수
+DB_WRITE_RETRIES = 3
+
+# 분석 결과 섹션 저장 형식 (UTF-8 JSON을 zlib으로 압축)
+SECTION_ENCODING = "json+zlib"
+SECTION_COMPRESS_LEVEL = 6
+
+# 섹션 결과 버전: 표본으로 먼저 계산한 임시 결과(provisional)와 전체 데이터 결과(exact)
+# 임시 섹션은 같은 이름의 정확한 섹션이 저장되면 덮어써진다
+SECTION_PROVISIONAL = "provisional"
+SECTION_EXACT = "exact"
+
+# 스키마 버전 (PRAGMA user_version, 1: 이전 형식 결과를 섹션으로 옮김)
+# 버전이 낮은 DB에서만 데이터 변환을 실행하므로 이후 연결에서는 테이블을 다시 훑지 않는다
+SCHEMA_VERSION = 1
+
+# 진행 중(pending/processing)인 작업이 이 시간(초) 동안 갱신되지 않으면
+# 작업을 제출한 프로세스가 살아 있는지와 관계없이 중단된 것으로 간주
+TASK_STALE_SECONDS = float(os.environ.get("TASK_STALE_SECONDS", str(6 * 3600)))
+
+# 작업 진행 상황 컬럼 (분석 단계, 처리한 행 수, 전체 행 수(추정), 단계 시작 시각)
+TASK_PROGRESS_COLUMNS = [
+    ("stage", "TEXT"),
+    ("rows_processed", "INTEGER"),
+    ("rows_total", "INTEGER"),
+    ("stage_started_at", "TEXT"),
+]
+
 # 디렉토리가 없으면 생성
 os.makedirs(DB_DIR, exist_ok=True)
 
-# 스레드 로컬 데이터베이스 연결
-_local = threading.local()
+# 연결마다 적용하는 설정
+# WAL: 읽기와 쓰기가 서로를 막지 않음 / synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 안전
+PRAGMAS = [
+    f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+]
+
+
+class ConnectionPool:
+    """프로세스별 SQLite 연결 풀
+
+    최대 max_size개의 연결을 만들어 재사용하며, 모두 사용 중이면 timeout초까지 기다린다.
+    연결은 autocommit 모드로 열고 쓰기는 transaction()에서 BEGIN IMMEDIATE로 묶는다.
+    fork된 프로세스에서는 부모의 연결을 쓰지 않도록 새 풀을 만든다.
+    """
+
+    def __init__(self, path=DB_PATH, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._reset()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
 
-def get_db_connection():
-    """스레드에 안전한 데이터베이스 연결 가져오기"""
-    if not hasattr(_local, 'conn'):
-        _local.conn = sqlite3.connect(DB_PATH)
-        _local.conn.row_factory = sqlite3.Row
-    return _local.conn
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                conn = self._connect()
+                if not self._initialized:
+                    with self._lock:
+                        if not self._initialized:
+                            _create_schema(conn)
+                            self._initialized = True
+                return conn
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"데이터베이스 연결 대기 시간 초과 ({self.timeout}초)")
+
+    def release(self, conn):
+        if self._pid != os.getpid():
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        """사용 중이지 않은 연결 닫기"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+# 프로세스별 공용 연결 풀
+pool = ConnectionPool()
+
+@contextmanager
+def connection():
+    """읽기용 연결"""
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+@contextmanager
+def transaction():
+    """쓰기 트랜잭션 (블록 안의 쓰기를 한 번에 커밋, 예외 발생 시 롤백)
+
+    BEGIN IMMEDIATE로 시작 시점에 쓰기 잠금을 잡으므로 읽기 후 쓰기로 잠금을 올리다
+    교착되는 경우가 없고, 잠금 대기는 busy_timeout 안에서 처리된다.
+    """
+    conn = pool.acquire()
+    try:
+        started = time.perf_counter()
+        for attempt in range(DB_WRITE_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                metrics.DB_LOCK_TIMEOUTS.inc()
+                if attempt == DB_WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+        metrics.DB_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        pool.release(conn)
 
 def close_db_connection():
     """데이터베이스 연결 닫기"""
-    if hasattr(_local, 'conn'):
-        _local.conn.close()
-        del _local.conn
+    pool.close_all()
 
-def initialize_db():
-    """데이터베이스 초기화 및 테이블 생성"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # 파일 테이블 생성
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS files (
-        id TEXT PRIMARY KEY,
-        filename TEXT NOT NULL,
-        path TEXT NOT NULL,
-        user_id INTEGER NOT NULL,
-        created_at TEXT NOT NULL,
-        file_size INTEGER NOT NULL
-    )
-    ''')
-    
-    # 작업 테이블 생성
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS tasks (
-        id TEXT PRIMARY KEY,
-        file_id TEXT NOT NULL,
-        status TEXT NOT NULL,
-        created_at TEXT NOT NULL,
-        updated_at TEXT NOT NULL,
-        error TEXT,
-        FOREIGN KEY (file_id) REFERENCES files (id)
-    )
-    ''')
-    
-    # 분석 결과 테이블 생성
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS analysis_results (
-        id TEXT PRIMARY KEY,
-        file_id TEXT NOT NULL,
-        task_id TEXT NOT NULL,
-        results TEXT NOT NULL,
-        created_at TEXT NOT NULL,
-        FOREIGN KEY (file_id) REFERENCES files (id),
-        FOREIGN KEY (task_id) REFERENCES tasks (id)
-    )
-    ''')
-    
-    conn.commit()
+def _create_schema(conn):
+    """테이블 및 인덱스 생성 (프로세스에서 처음 연결할 때 한 번 실행)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # 파일 테이블 생성
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS files (
+            id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            path TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            content_hash TEXT
+        )
+        ''')
 
-# 데이터베이스 초기화
-initialize_db()
+        # 기존 데이터베이스에 content_hash 컬럼 추가
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(files)").fetchall()]
+        if "content_hash" not in columns:
+            conn.execute("ALTER TABLE files ADD COLUMN content_hash TEXT")
 
-def create_file_record(file_data):
-    """파일 정보 저장"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+        # 작업 테이블 생성
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            file_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            error TEXT,
+            stage TEXT,
+            rows_processed INTEGER,
+            rows_total INTEGER,
+            stage_started_at TEXT,
+            owner TEXT,
+            FOREIGN KEY (file_id) REFERENCES files (id)
+        )
+        ''')
+
+        # 기존 데이터베이스에 진행 상황 컬럼과 작업 소유 프로세스 컬럼 추가
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(tasks)").fetchall()]
+        for column, column_type in TASK_PROGRESS_COLUMNS + [("owner", "TEXT")]:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {column_type}")
+
+        # 분석 결과 테이블 생성
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_results (
+            id TEXT PRIMARY KEY,
+            file_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            results TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (file_id) REFERENCES files (id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id)
+        )
+        ''')
+
+        # 분석 결과 섹션 테이블 생성 (summary, correlations, lifestyle_impact 등을 따로 압축 저장)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_sections (
+            task_id TEXT NOT NULL,
+            section TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            encoding TEXT NOT NULL,
+            data BLOB NOT NULL,
+            version TEXT NOT NULL DEFAULT 'exact',
+            PRIMARY KEY (task_id, section),
+            FOREIGN KEY (task_id) REFERENCES tasks (id)
+        ) WITHOUT ROWID
+        ''')
+
+        # 기존 데이터베이스에 섹션 버전 컬럼 추가 (이전 결과는 모두 정확한 결과)
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(analysis_sections)").fetchall()]
+        if "version" not in columns:
+            conn.execute(f"ALTER TABLE analysis_sections ADD COLUMN version TEXT NOT NULL DEFAULT '{SECTION_EXACT}'")
+        migrated = 0
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            migrated = _migrate_results_to_sections(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # 조회/조인에 사용하는 컬럼 인덱스
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files (content_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_user_id ON files (user_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_file_id ON tasks (file_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_results_task_id ON analysis_results (task_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_results_file_id ON analysis_results (file_id)")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    # 비워진 공간은 연결할 때마다 VACUUM하지 않고 관리 명령으로 반환 (app.db.maintenance)
+    if migrated:
+        logger.info(f"이전 형식 결과 {migrated}건을 섹션 형식으로 옮겼습니다. "
+                    f"python -m app.db.maintenance로 비워진 공간을 반환할 수 있습니다")
+
+def _migrate_results_to_sections(conn):
+    """analysis_results.results에 통째로 저장된 이전 형식 결과를 섹션별로 옮김
+
+    옮긴 행의 results는 빈 문자열로 바꾼다. 옮긴 행 수를 반환한다.
+    """
+    rows = conn.execute(
+        "SELECT task_id, results FROM analysis_results WHERE results != ''"
+    ).fetchall()
+    for row in rows:
+        results = json.loads(row["results"])
+        if not isinstance(results, dict):
+            results = {"results": results}
+        _insert_sections(conn, row["task_id"], results)
+    if rows:
+        conn.execute("UPDATE analysis_results SET results = '' WHERE results != ''")
+    return len(rows)
+
+def encode_section(value):
+    """섹션 값을 저장 형식(압축된 UTF-8 JSON)으로 변환
+
+    NumPy/Pandas 값과 NaN은 app.services.serialization이 인코딩 중에 처리한다.
+    """
+    return zlib.compress(dumpb(value), SECTION_COMPRESS_LEVEL)
+
+def decode_section(data, encoding=SECTION_ENCODING):
+    """저장된 섹션을 JSON 바이트로 복원 (파싱하지 않음)"""
+    if encoding != SECTION_ENCODING:
+        raise ValueError(f"지원하지 않는 섹션 형식: {encoding}")
+    return zlib.decompress(data)
+
+def initialize_db():
+    """데이터베이스 초기화 및 테이블 생성 (첫 연결 시 자동으로 실행됨)"""
+    with connection():
+        pass
+
+def _insert_file_and_task(conn, file_data):
     # created_at을 문자열로 변환
     if isinstance(file_data["created_at"], datetime):
         file_data["created_at"] = file_data["created_at"].isoformat()
-    
-    cursor.execute(
+
+    conn.execute(
         '''
-        INSERT INTO files (id, filename, path, user_id, created_at, file_size)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO files (id, filename, path, user_id, created_at, file_size, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         ''',
         (
             file_data["id"],
@@ -95,49 +344,142 @@ def create_file_record(file_data):
             file_data["path"],
             file_data["user_id"],
             file_data["created_at"],
-            file_data["file_size"]
+            file_data["file_size"],
+            file_data.get("content_hash")
         )
     )
-    
+
     # 작업 레코드 생성
     task_id = file_data.get("task_id", "task_" + file_data["id"])
     now = datetime.now().isoformat()
-    
-    cursor.execute(
+
+    conn.execute(
         '''
-        INSERT INTO tasks (id, file_id, status, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO tasks (id, file_id, status, created_at, updated_at, owner)
+        VALUES (?, ?, ?, ?, ?, ?)
         ''',
-        (task_id, file_data["id"], "pending", now, now)
+        (task_id, file_data["id"], "pending", now, now, process_owner())
     )
-    
-    conn.commit()
+
+def create_file_record(file_data):
+    """파일 정보와 작업(pending) 레코드를 한 트랜잭션으로 저장"""
+    with transaction() as conn:
+        _insert_file_and_task(conn, file_data)
     return file_data["id"]
 
+def create_file_record_if_new(file_data):
+    """같은 내용(content_hash)의 재사용 가능한 작업이 없을 때만 파일/작업 레코드 저장
+
+    중복 확인과 저장을 한 쓰기 트랜잭션에서 수행하므로 같은 파일이 동시에 업로드되어도
+    레코드는 하나만 만들어진다.
+
+    Returns:
+        이미 있으면 find_file_by_hash()와 같은 형식의 dict, 새로 저장했으면 None
+    """
+    with transaction() as conn:
+        if file_data.get("content_hash"):
+            existing = _find_file_by_hash(conn, file_data["content_hash"])
+            if existing:
+                return existing
+        _insert_file_and_task(conn, file_data)
+    return None
+
 def get_file_info(file_id):
     """파일 정보 가져오기"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT * FROM files WHERE id = ?",
-        (file_id,)
-    )
-    
-    row = cursor.fetchone()
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM files WHERE id = ?",
+            (file_id,)
+        ).fetchone()
+
     if row:
         return dict(row)
     return None
 
-def update_task_status(task_id, status, error=None):
-    """작업 상태 업데이트"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+def _find_file_by_hash(conn, content_hash):
+    rows = conn.execute(
+        '''
+        SELECT f.id AS file_id, t.id AS task_id, t.status AS status, t.updated_at AS updated_at, t.owner AS owner
+        FROM files f JOIN tasks t ON t.file_id = f.id
+        WHERE f.content_hash = ? AND t.status IN ('completed', 'processing', 'pending')
+        ORDER BY t.status = 'completed' DESC, t.created_at DESC
+        ''',
+        (content_hash,)
+    ).fetchall()
+
+    # 진행 중인 작업은 실행할 프로세스가 살아 있고 최근에 갱신된 경우에만 재사용
+    for row in rows:
+        if not _task_is_stale(row):
+            return {"file_id": row["file_id"], "task_id": row["task_id"], "status": row["status"]}
+    return None
+
+def find_file_by_hash(content_hash):
+    """같은 내용의 파일과 재사용 가능한 작업(완료 또는 실행 중인 작업) 찾기
+
+    작업을 제출한 프로세스가 종료되었거나 TASK_STALE_SECONDS 동안 갱신되지 않은
+    pending/processing 작업은 재사용하지 않는다.
+    """
+    with connection() as conn:
+        return _find_file_by_hash(conn, content_hash)
+
+def process_owner(pid=None):
+    """작업을 제출한 웹 프로세스 식별자 (호스트 이름:PID, pid가 없으면 현재 프로세스)"""
+    return f"{socket.gethostname()}:{pid or os.getpid()}"
+
+def _owner_alive(owner):
+    """작업 소유 프로세스가 살아 있는지 (다른 호스트의 프로세스면 알 수 없으므로 None)"""
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except (ValueError, OverflowError):
+        return False
+    return True
+
+def _task_is_stale(task):
+    """pending/processing 작업이 더 이상 실행되지 않는지
+
+    작업을 제출한 프로세스가 종료되었거나(소유자 정보가 없는 이전 작업 포함)
+    TASK_STALE_SECONDS 동안 갱신되지 않았으면 중단된 것으로 본다.
+    """
+    if task["status"] not in ('pending', 'processing'):
+        return False
+    if _owner_alive(task["owner"]) is False:
+        return True
+    updated_at = datetime.fromisoformat(task["updated_at"])
+    return (datetime.now() - updated_at).total_seconds() > TASK_STALE_SECONDS
+
+def fail_stale_tasks(error, owner=None):
+    """중단된 pending/processing 작업을 failed로 변경하고 변경한 작업 수 반환
+
+    owner가 주어지면 해당 프로세스가 제출한 작업을 모두 중단된 것으로 처리한다
+    (예: gunicorn 워커가 종료된 경우). 대기열에 있던 작업은 프로세스와 함께 사라지므로
+    시작 시 호출하면 영원히 pending으로 남는 작업이 없다.
+    """
+    with transaction() as conn:
+        rows = conn.execute(
+            "SELECT id, status, updated_at, owner FROM tasks WHERE status IN ('pending', 'processing')"
+        ).fetchall()
+        stale = [
+            row["id"] for row in rows
+            if (row["owner"] == owner if owner is not None else _task_is_stale(row))
+        ]
+        for task_id in stale:
+            _update_task_status(conn, task_id, 'failed', error)
+    return len(stale)
+
+def _update_task_status(conn, task_id, status, error=None):
     now = datetime.now().isoformat()
-    
+
     if error:
-        cursor.execute(
+        conn.execute(
             '''
             UPDATE tasks
             SET status = ?, updated_at = ?, error = ?
@@ -146,7 +488,7 @@ def update_task_status(task_id, status, error=None):
             (status, now, error, task_id)
         )
     else:
-        cursor.execute(
+        conn.execute(
             '''
             UPDATE tasks
             SET status = ?, updated_at = ?
@@ -154,68 +496,172 @@ def update_task_status(task_id, status, error=None):
             ''',
             (status, now, task_id)
         )
-    
-    conn.commit()
+
+def update_task_status(task_id, status, error=None):
+    """작업 상태 업데이트"""
+    with transaction() as conn:
+        _update_task_status(conn, task_id, status, error)
     return True
 
-def save_analysis_results(file_id, task_id, results):
-    """분석 결과 저장"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+def update_task_progress(task_id, stage, rows_processed=None, rows_total=None):
+    """작업 진행 상황 업데이트 (단계가 바뀌면 단계 시작 시각도 갱신)"""
     now = datetime.now().isoformat()
-    results_json = json.dumps(results)
-    
-    cursor.execute(
+    with transaction() as conn:
+        conn.execute(
+            '''
+            UPDATE tasks
+            SET stage_started_at = CASE WHEN stage IS ? THEN stage_started_at ELSE ? END,
+                stage = ?, rows_processed = ?, rows_total = ?, updated_at = ?
+            WHERE id = ?
+            ''',
+            (stage, now, stage, rows_processed, rows_total, now, task_id)
+        )
+    return True
+
+def _insert_sections(conn, task_id, results, start=0, version=SECTION_EXACT):
+    conn.executemany(
+        '''
+        INSERT OR REPLACE INTO analysis_sections (task_id, section, position, encoding, data, version)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''',
+        [
+            (task_id, section, position, SECTION_ENCODING, encode_section(value), version)
+            for position, (section, value) in enumerate(results.items(), start)
+        ]
+    )
+
+def save_section(task_id, section, position, value, version=SECTION_EXACT):
+    """분석이 끝난 섹션 하나를 먼저 저장 (작업 완료 전에도 events 스트림으로 전달됨)
+
+    version이 SECTION_PROVISIONAL이면 표본으로 계산한 임시 결과이며,
+    나중에 같은 섹션을 정확한 결과로 저장하면 덮어쓴다.
+    """
+    with transaction() as conn:
+        _insert_sections(conn, task_id, {section: value}, position, version)
+    return True
+
+def save_sections(task_id, results, start=0, version=SECTION_EXACT):
+    """여러 섹션을 한 트랜잭션으로 저장 (start: 첫 섹션의 저장 위치)"""
+    with transaction() as conn:
+        _insert_sections(conn, task_id, results, start, version)
+    return True
+
+def _insert_analysis_results(conn, file_id, task_id, results):
+    now = datetime.now().isoformat()
+
+    # 결과 본문은 analysis_sections에 섹션별로 저장하고 여기에는 메타데이터만 기록
+    conn.execute(
         '''
         INSERT INTO analysis_results (id, file_id, task_id, results, created_at)
         VALUES (?, ?, ?, ?, ?)
         ''',
-        (file_id + "_" + task_id, file_id, task_id, results_json, now)
+        (file_id + "_" + task_id, file_id, task_id, "", now)
     )
-    
-    conn.commit()
+    if results:
+        _insert_sections(conn, task_id, results)
+
+def save_analysis_results(file_id, task_id, results):
+    """분석 결과 저장"""
+    with transaction() as conn:
+        _insert_analysis_results(conn, file_id, task_id, results)
+    return True
+
+def complete_task(file_id, task_id, results=None):
+    """분석 결과 저장과 작업 완료 처리를 한 트랜잭션으로 수행
+
+    결과 없이 completed 상태만 보이는 중간 상태가 생기지 않는다.
+    섹션을 save_section()으로 이미 저장했다면 results 없이 호출한다.
+    """
+    with transaction() as conn:
+        _insert_analysis_results(conn, file_id, task_id, results)
+        _update_task_status(conn, task_id, 'completed')
     return True
 
 def get_task_status(task_id):
     """작업 상태 가져오기"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT * FROM tasks WHERE id = ?",
-        (task_id,)
-    )
-    
-    row = cursor.fetchone()
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM tasks WHERE id = ?",
+            (task_id,)
+        ).fetchone()
+
     if row:
         return dict(row)
     return None
 
-def get_analysis_results(task_id):
-    """분석 결과 가져오기"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # 먼저 작업 상태 확인
-    task = get_task_status(task_id)
-    if not task or task["status"] != "completed":
-        return {"status": task["status"] if task else "not_found"}
-    
-    # 분석 결과 가져오기
-    cursor.execute(
-        "SELECT * FROM analysis_results WHERE task_id = ?",
-        (task_id,)
-    )
-    
-    row = cursor.fetchone()
-    if row:
-        result_dict = dict(row)
+def get_task_progress(task_id):
+    """작업 상태/진행 상황과 지금까지 저장된 섹션 이름 목록 (작업이 없으면 None)
+
+    section_versions에는 섹션 이름별 버전(provisional 또는 exact)을 담는다.
+    """
+    with connection() as conn:
+        rows = conn.execute(
+            '''
+            SELECT t.*, s.section AS section, s.version AS version
+            FROM tasks t LEFT JOIN analysis_sections s ON s.task_id = t.id
+            WHERE t.id = ?
+            ORDER BY s.position
+            ''',
+            (task_id,)
+        ).fetchall()
+
+    if not rows:
+        return None
+    progress = dict(rows[0])
+    progress["sections"] = [row["section"] for row in rows if row["section"] is not None]
+    progress["section_versions"] = {row["section"]: row["version"] for row in rows if row["section"] is not None}
+    del progress["section"], progress["version"]
+    return progress
+
+def get_analysis_record(task_id, sections=None):
+    """작업 상태와 저장된 결과 섹션(JSON 바이트)을 한 번의 조회로 가져오기
+
+    sections가 주어지면 해당 섹션만 읽고 압축을 푼다.
+
+    Returns:
+        {"status", "error", "sections": [(섹션 이름, JSON 바이트), ...],
+         "versions": {섹션 이름: provisional 또는 exact}} (작업이 없으면 None)
+    """
+    query = '''
+        SELECT t.status AS status, t.error AS error, s.section AS section, s.encoding AS encoding, s.data AS data,
+               s.version AS version
+        FROM tasks t LEFT JOIN analysis_sections s ON s.task_id = t.id{section_filter}
+        WHERE t.id = ?
+        ORDER BY s.position
+    '''
+    params = []
+    section_filter = ""
+    if sections is not None:
+        section_filter = f" AND s.section IN ({', '.join('?' * len(sections))})"
+        params.extend(sections)
+    params.append(task_id)
+
+    with connection() as conn:
+        rows = conn.execute(query.format(section_filter=section_filter), params).fetchall()
+
+    if not rows:
+        return None
+    return {
+        "status": rows[0]["status"],
+        "error": rows[0]["error"],
+        "sections": [
+            (row["section"], decode_section(row["data"], row["encoding"]))
+            for row in rows if row["section"] is not None
+        ],
+        "versions": {row["section"]: row["version"] for row in rows if row["section"] is not None}
+    }
+
+def get_analysis_results(task_id, sections=None):
+    """분석 결과 가져오기 (sections가 주어지면 해당 섹션만)"""
+    record = get_analysis_record(task_id, sections)
+    if not record or record["status"] != "completed":
+        return {"status": record["status"] if record else "not_found"}
+
+    if record["sections"]:
         # JSON 문자열을 파이썬 객체로 변환
-        result_dict["results"] = json.loads(result_dict["results"])
         return {
             "status": "completed",
-            "data": result_dict["results"]
+            "data": {section: json.loads(data) for section, data in record["sections"]}
         }
-    
-    return {"status": "error", "message": "결과를 찾을 수 없습니다"}
\ No newline at end of file
+
+    return {"status": "error", "message": "결과를 찾을 수 없습니다"}
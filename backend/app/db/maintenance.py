@@ -0,0 +1,48 @@
+"""SQLite 데이터베이스 관리 명령 (서버를 멈춘 상태에서 실행)
+
+스키마 생성과 이전 형식 결과의 섹션 변환은 첫 DB 연결 시 자동으로 실행되지만,
+VACUUM은 파일 전체를 다시 쓰면서 쓰기 잠금을 오래 잡으므로 워커 프로세스가 연결할 때마다
+실행하지 않고 이 명령으로 따로 실행한다.
+
+사용법 (backend 디렉토리에서):
+    python -m app.db.maintenance            # 스키마 변환 후 VACUUM
+    python -m app.db.maintenance --no-vacuum
+"""
+import argparse
+import os
+import sqlite3
+from app.db import crud
+
+
+def file_size(path):
+    """DB 파일과 WAL 파일 크기 합계 (bytes)"""
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def vacuum(path=crud.DB_PATH):
+    """비워진 페이지를 반환하도록 path의 DB 파일을 다시 쓰고 WAL 파일을 비움"""
+    # 연결 풀은 crud.DB_PATH에만 연결하므로 path로 직접 연결
+    conn = sqlite3.connect(path, timeout=crud.DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-vacuum', action='store_true', help='스키마 생성/변환만 실행')
+    args = parser.parse_args()
+
+    before = file_size(crud.DB_PATH) if os.path.exists(crud.DB_PATH) else 0
+    crud.initialize_db()
+    crud.close_db_connection()
+    if not args.no_vacuum:
+        vacuum()
+    print(f"DB: {os.path.abspath(crud.DB_PATH)}")
+    print(f"size: {before} -> {file_size(crud.DB_PATH)} bytes")
+
+
+if __name__ == '__main__':
+    main()
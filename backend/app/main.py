@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
@@ -32,6 +32,11 @@ from app.services.auth_service import (
 )
 # 엔드포인트 라우터 임포트
 from app.api.endpoints import uploads, analysis
+from app.services.job_executor import job_executor
+from app.services import metrics
+from app.db.crud import fail_stale_tasks
+from app.services.file_service import MAX_FILE_SIZE
+from app import worker
 
 # FastAPI 애플리케이션 생성
 app = FastAPI(
@@ -71,10 +76,37 @@ app.add_middleware(
     expose_headers=["*"]  # 추가 헤더 노출
 )
 
+# 요청 처리 시간 기록
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
 # 라우터 등록
 app.include_router(uploads.router, prefix="/api", tags=["파일 업로드"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["분석"])
 
+# 시작 시 이전 실행(또는 종료된 워커)이 남긴 pending/processing 작업을 실패로 처리
+# (대기열에 있던 작업은 프로세스와 함께 사라지므로 다시 실행되지 않음)
+@app.on_event("startup")
+def recover_stale_tasks():
+    count = fail_stale_tasks("서버가 재시작되어 분석 작업이 중단되었습니다. 파일을 다시 업로드해주세요.")
+    if count:
+        logger.warning(f"중단된 분석 작업 {count}개를 실패로 처리했습니다")
+
+# 파일 크기 기준 분석 모드가 업로드 최대 크기 안에서 동작하는지 확인
+@app.on_event("startup")
+def check_analysis_thresholds():
+    thresholds = [
+        ("PROGRESSIVE_MIN_BYTES", worker.PROGRESSIVE_MIN_BYTES),
+        ("STREAMING_MIN_BYTES", worker.STREAMING_MIN_BYTES),
+    ]
+    for name, value in thresholds:
+        if value > MAX_FILE_SIZE:
+            logger.warning(f"{name}({value})가 MAX_FILE_SIZE({MAX_FILE_SIZE})보다 커서 해당 분석 모드가 실행되지 않습니다")
+
+# 종료 시 분석 프로세스 풀 정리
+@app.on_event("shutdown")
+def shutdown_job_executor():
+    job_executor.shutdown(wait=False)
+
 # 인증 관련 엔드포인트
 @app.post("/api/token")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
@@ -108,6 +140,13 @@ async def health_check():
     """서버 상태 확인"""
     return {"status": "healthy"}
 
+# Prometheus 지표 엔드포인트 (모든 gunicorn 워커와 분석 프로세스의 값을 합산)
+@app.get("/api/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus 수집용 지표"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 # 간단한 루트 경로
 @app.get("/")
 async def root():
@@ -0,0 +1,77 @@
+import codecs
+import time
+
+# 인코딩 판별에 사용하는 기본 샘플 크기 (bytes)
+SAMPLE_SIZE = 64 * 1024
+
+# 앞부분 ASCII 구간을 건너뛰며 읽는 최대 크기 (bytes)
+# 이 안에 ASCII가 아닌 바이트가 없으면 utf-8로 판단하므로 판별에 읽는 양은 최대 ASCII_SCAN_LIMIT + SAMPLE_SIZE
+# (더 뒤에서 디코딩에 실패하면 파싱 단계에서 다음 인코딩으로 다시 읽음)
+ASCII_SCAN_LIMIT = 4 * 1024 * 1024
+
+# 검증 후보 인코딩 (우선순위 순서)
+# euc-kr은 cp949의 부분집합이므로 cp949 검증으로 함께 확인된다.
+CANDIDATES = ['utf-8', 'cp949', 'cp1252']
+
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+def detect_encoding(file_path, sample_size=SAMPLE_SIZE, scan_limit=ASCII_SCAN_LIMIT):
+    """파일 일부 바이트만 읽어 인코딩을 판별
+
+    1. BOM이 있으면 해당 인코딩을 사용한다.
+    2. ASCII가 아닌 바이트가 처음 나타나는 위치부터 sample_size 만큼을
+       후보 인코딩의 증분 디코더로 검증한다. (ASCII 구간은 파싱 없이 건너뜀)
+       처음 scan_limit 바이트가 모두 ASCII이면 더 읽지 않고 utf-8로 판단한다.
+    3. 한글이 포함된 UTF-8이 유효하면 utf-8, 그렇지 않으면 cp949, cp1252 순서로 선택한다.
+
+    Returns:
+        (인코딩 이름 또는 None, 판별 소요 시간(초))
+    """
+    started = time.perf_counter()
+    encoding = _detect(file_path, sample_size, scan_limit)
+    return encoding, time.perf_counter() - started
+
+def _detect(file_path, sample_size, scan_limit):
+    decoders = {name: codecs.getincrementaldecoder(name)() for name in CANDIDATES}
+    validated = 0
+    skipped = 0
+    seen_non_ascii = False
+
+    with open(file_path, 'rb') as f:
+        head = f.read(sample_size)
+        for bom, name in _BOMS:
+            if head.startswith(bom):
+                return name
+
+        block = head
+        while block:
+            if not seen_non_ascii and block.isascii():
+                # ASCII 구간은 모든 후보에서 동일하게 디코딩되므로 검증 생략
+                skipped += len(block)
+                if skipped >= scan_limit:
+                    break
+                block = f.read(sample_size)
+                continue
+            seen_non_ascii = True
+            final = len(block) < sample_size
+            for name in list(decoders):
+                try:
+                    decoders[name].decode(block, final)
+                except UnicodeDecodeError:
+                    del decoders[name]
+            validated += len(block)
+            if not decoders or validated >= sample_size or final:
+                break
+            block = f.read(sample_size)
+
+    if not seen_non_ascii:
+        # ASCII 파일은 어떤 후보로 읽어도 결과가 같다
+        return 'utf-8'
+    for name in CANDIDATES:
+        if name in decoders:
+            return name
+    return None
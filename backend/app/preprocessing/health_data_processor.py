@@ -1,22 +1,165 @@
+import io
+import os
+import logging
 import pandas as pd
 import numpy as np
+from app.preprocessing.encoding import detect_encoding
+
+logger = logging.getLogger(__name__)
+
+# 전처리 로직 버전 (전처리 결과가 달라지는 변경 시 올려서 파싱 캐시를 무효화)
+PROCESSOR_VERSION = 3
+
+# 시도할 인코딩 목록 (순서대로)
+ENCODINGS = ['cp949', 'euc-kr', 'utf-8', 'cp1252']
+
+# 혈당 수준 분류 기준 (mg/dL)
+GLUCOSE_BINS = [0, 100, 125, float('inf')]
+GLUCOSE_LABELS = ['정상', '전당뇨', '당뇨의심']
+
+# 스트리밍 모드 청크 크기 (행)
+DEFAULT_CHUNKSIZE = 100_000
+
+# 표본 추출 시 임의 위치에서 한 번에 읽는 바이트 수 (행이 더 길면 이어서 읽음)
+SAMPLE_READ_BYTES = 512
+
+# 분석에 사용하는 컬럼 (파싱 시 이 컬럼만 읽음, 실제 데이터에 따라 조정)
+RISK_FACTOR_COLUMNS = [
+    '학년', '성별', '키_cm', '몸무게_kg', 'BMI', '비만여부',
+    '허리둘레_cm', '혈당치_mgdL', '혈당수준'
+]
+LIFESTYLE_COLUMNS = [
+    '라면', '음료수', '패스트푸드', '우유유제품', '과일',
+    '주3회이상운동', '하루30분이상운동',
+    'TV시청2시간이상', '게임2시간이상'
+]
+# 조사 최종 가중치 (모집단 추정용, 합계 정밀도를 위해 float64로 읽음)
+WEIGHT_COLUMN = '최종가중치'
+
+# 조사 컬럼 dtype 계획 (파싱 시점에 작은 타입으로 읽어 메모리 절감)
+# 측정값은 float32 (소수 첫째 자리 측정값의 상대 오차 약 6e-8), 가중치는 합계 정밀도를 위해 float64 유지
+MEASUREMENT_COLUMNS = ['키_cm', '몸무게_kg', '허리둘레_cm', '혈당치_mgdL']
+# 학년, 1-5 척도, 0/1 여부: float32로 읽은 뒤 결측치가 없고 정수이면 int8로 축소
+ORDINAL_COLUMNS = [
+    '학년', '라면', '음료수', '패스트푸드', '우유유제품', '과일',
+    '주3회이상운동', '하루30분이상운동', 'TV시청2시간이상', '게임2시간이상'
+]
+# 반복되는 문자열 값
+CATEGORY_COLUMNS = ['성별', '비만여부']
 
 class HealthDataProcessor:
     """학생 건강검사 데이터 전처리 클래스"""
     
+    # 컬럼명 정리 (인코딩 문제 해결)
+    # 실제 구현에서는 매핑 테이블 사용
+    COLUMN_MAPPING = {
+        'ÇÐ³âµµ': '학년도',
+        'ÃÖÁ¾°¡ÁßÄ¡': '최종가중치',
+        # ... 나머지 컬럼 매핑
+        'Ç÷´ù½ÄÀü_mgdL': '혈당치_mgdL'
+    }
+    
+    @classmethod
+    def dtype_plan(cls):
+        """read_csv에 전달할 컬럼별 dtype (깨진 컬럼명 포함, 파일에 없는 컬럼은 무시됨)"""
+        plan = {col: 'float32' for col in MEASUREMENT_COLUMNS + ORDINAL_COLUMNS}
+        plan.update({col: 'category' for col in CATEGORY_COLUMNS})
+        for old, new in cls.COLUMN_MAPPING.items():
+            if new in plan:
+                plan[old] = plan[new]
+        return plan
+
+    @classmethod
+    def required_columns(cls):
+        """파싱할 컬럼 이름 집합 (깨진 컬럼명 포함)"""
+        required = set(RISK_FACTOR_COLUMNS + LIFESTYLE_COLUMNS + [WEIGHT_COLUMN])
+        required.update(old for old, new in cls.COLUMN_MAPPING.items() if new in required)
+        return required
+
+    def column_filter(self):
+        """read_csv usecols용 함수: 필요한 컬럼만 선택하고 건너뛴 컬럼은 self.skipped_columns에 기록"""
+        required = self.required_columns()
+        skipped = self.skipped_columns = []
+        seen = set()
+
+        def use(name):
+            if name in required:
+                return True
+            if name not in seen:
+                seen.add(name)
+                skipped.append(name)
+            return False
+        return use
+
+    def report_skipped_columns(self):
+        """건너뛴 컬럼 목록 출력 (진단용)"""
+        if self.skipped_columns:
+            names = self.skipped_columns[:10]
+            more = f" 외 {len(self.skipped_columns) - len(names)}개" if len(self.skipped_columns) > len(names) else ""
+            logger.debug(f"분석에 사용하지 않는 컬럼 {len(self.skipped_columns)}개 건너뜀: {names}{more}")
+
+    def _read_csv(self, encoding, **kwargs):
+        """필요한 컬럼만 파싱 (필요한 컬럼이 하나도 없는 파일은 전체 컬럼 파싱)"""
+        df = pd.read_csv(self.file_path, encoding=encoding, usecols=self.column_filter(), **kwargs)
+        if len(df.columns) == 0:
+            logger.debug("분석에 필요한 컬럼이 없어 전체 컬럼 파싱")
+            self.skipped_columns = []
+            df = pd.read_csv(self.file_path, encoding=encoding, **kwargs)
+        return df
+
+    @classmethod
+    def compact_dtypes(cls, df):
+        """dtype 계획을 파싱된 데이터프레임에 적용 (이미 적용된 컬럼은 그대로)
+
+        숫자로 파싱되지 않은 컬럼(예: 무응답 문자열 포함)은 변환하지 않는다.
+        """
+        int8 = np.iinfo(np.int8)
+        for col, dtype in cls.dtype_plan().items():
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if dtype == 'category':
+                if series.dtype == object:
+                    df[col] = series.astype('category')
+                continue
+            if series.dtype.kind not in 'fiu':
+                continue
+            if series.dtype != np.float32:
+                series = df[col] = series.astype(np.float32)
+            if cls.COLUMN_MAPPING.get(col, col) in ORDINAL_COLUMNS:
+                values = series.to_numpy()
+                if (len(values) and not np.isnan(values).any()
+                        and int8.min <= values.min() and values.max() <= int8.max
+                        and (values == np.round(values)).all()):
+                    df[col] = values.astype(np.int8)
+        return df
+
     def __init__(self, file_path):
         self.file_path = file_path
+        # 판별된 인코딩과 판별 소요 시간(초)
+        self.encoding = None
+        self.encoding_detect_seconds = None
+        # 파싱하지 않은 컬럼 이름 (파일 순서)
+        self.skipped_columns = []
+        # load_sample()이 파일 크기와 표본 행 길이로 추정한 전체 행 수
+        self.estimated_rows = None
         
     def load_data(self):
         """데이터 로드 및 기본 전처리"""
         try:
-            # 다양한 인코딩 시도
-            encodings = ['cp949', 'euc-kr', 'utf-8', 'cp1252']
-            
-            for encoding in encodings:
+            # 판별된 인코딩으로 한 번만 파싱 (실패 시에만 나머지 인코딩 시도)
+            for encoding in self.encoding_candidates():
                 try:
-                    print(f"[DEBUG] {encoding} 인코딩으로 시도")
-                    self.df = pd.read_csv(self.file_path, encoding=encoding)
+                    try:
+                        df = self._read_csv(encoding, dtype=self.dtype_plan())
+                    except UnicodeDecodeError:
+                        raise
+                    except ValueError as e:
+                        # 계획한 컬럼에 숫자가 아닌 값이 있으면 기본 타입으로 다시 파싱
+                        logger.debug(f"dtype 계획 적용 실패, 기본 타입으로 파싱: {str(e)}")
+                        df = self._read_csv(encoding)
+                    self.df = self.compact_dtypes(df)
+                    self.encoding = encoding
                     print(f"[DEBUG] {encoding} 인코딩으로 성공")
                     break
                 except UnicodeDecodeError:
@@ -38,11 +181,107 @@ class HealthDataProcessor:
                 
             print(f"[DEBUG] 데이터 로드 성공: {len(self.df)} 행, {len(self.df.columns)} 열")
             print(f"[DEBUG] 컬럼: {self.df.columns[:5].tolist()}...")
+            self.report_skipped_columns()
             return True
         except Exception as e:
             print(f"데이터 로드 오류: {str(e)}")
             return False
     
+    def load_sample(self, rows, seed=0):
+        """파일 전체를 읽지 않고 약 rows개 행의 무작위 표본을 self.df로 로드 (점진 모드 임시 결과용)
+
+        데이터 구간의 임의 바이트 위치 rows개를 골라 각 위치 다음에 시작하는 행을 읽는다.
+        줄바꿈(0x0A)은 cp949/utf-8 다바이트 문자 안에 나타나지 않으므로 어느 위치에서든
+        다음 행의 시작을 찾을 수 있다. 행이 뽑힐 확률은 바로 앞 행의 길이에 비례하므로
+        행 길이가 비슷한 조사 파일에서는 균등 표본에 가깝다. 같은 행은 한 번만 사용하며,
+        따옴표 안에 줄바꿈이 있는 CSV는 지원하지 않는다.
+        전체 행 수는 데이터 구간 크기를 표본 행의 평균 길이로 나눠 self.estimated_rows에 기록한다.
+        """
+        try:
+            size = os.path.getsize(self.file_path)
+            with open(self.file_path, 'rb', buffering=0) as handle:
+                header = handle.readline()
+                data_start = len(header)
+                if not header or data_start >= size:
+                    logger.debug("표본을 추출할 데이터 행이 없음")
+                    return False
+                # 헤더 끝 줄바꿈 위치를 고르면 첫 데이터 행이 뽑힘
+                offsets = np.sort(np.random.default_rng(seed).integers(data_start - 1, size - 1, rows))
+                fd = handle.fileno()
+                lines = {}
+                for offset in offsets.tolist():
+                    start, line = self._line_after(fd, offset, size)
+                    if line.strip():
+                        lines[start] = line
+            if not lines:
+                logger.debug("표본을 추출할 데이터 행이 없음")
+                return False
+
+            # 행 길이는 줄바꿈 문자 포함
+            lengths = np.array([len(line) + 1 for line in lines.values()])
+            self.estimated_rows = max(len(lines), round((size - data_start) / lengths.mean()))
+            body = header.rstrip(b'\r\n') + b'\n' + b'\n'.join(line.rstrip(b'\r\n') for line in lines.values())
+
+            for encoding in self.encoding_candidates():
+                try:
+                    try:
+                        df = pd.read_csv(io.BytesIO(body), encoding=encoding, usecols=self.column_filter(),
+                                         dtype=self.dtype_plan())
+                    except UnicodeDecodeError:
+                        raise
+                    except ValueError as e:
+                        logger.debug(f"dtype 계획 적용 실패, 기본 타입으로 파싱: {str(e)}")
+                        df = pd.read_csv(io.BytesIO(body), encoding=encoding, usecols=self.column_filter())
+                    if len(df.columns) == 0:
+                        self.skipped_columns = []
+                        df = pd.read_csv(io.BytesIO(body), encoding=encoding)
+                    self.df = self.compact_dtypes(df)
+                    self.encoding = encoding
+                    break
+                except UnicodeDecodeError:
+                    logger.debug(f"{encoding} 인코딩으로 표본 파싱 실패")
+                    continue
+
+            if not hasattr(self, 'df') or self.df.empty:
+                logger.debug("표본 로드 실패")
+                return False
+            logger.debug(f"표본 로드 성공: {len(self.df)} 행 (전체 약 {self.estimated_rows} 행 추정)")
+            return True
+        except Exception as e:
+            logger.error(f"표본 로드 오류: {str(e)}")
+            return False
+
+    @staticmethod
+    def _line_after(fd, offset, size):
+        """offset 바이트 다음 줄바꿈 뒤에서 시작하는 행 (시작 위치, 행 바이트, 마지막 행이면 빈 바이트)"""
+        buffer = b''
+        position = offset
+        start = None
+        while position < size:
+            block = os.pread(fd, SAMPLE_READ_BYTES, position)
+            if not block:
+                break
+            buffer += block
+            position += len(block)
+            if start is None:
+                newline = buffer.find(b'\n')
+                if newline < 0:
+                    continue
+                start = offset + newline + 1
+                buffer = buffer[newline + 1:]
+            end = buffer.find(b'\n')
+            if end >= 0:
+                return start, buffer[:end]
+        return start, buffer if start is not None else b''
+
+    def encoding_candidates(self):
+        """파싱에 사용할 인코딩 순서 (판별된 인코딩 우선, 나머지는 예비)"""
+        if self.encoding is None:
+            self.encoding, self.encoding_detect_seconds = detect_encoding(self.file_path)
+            logger.debug(f"인코딩 판별: {self.encoding} ({self.encoding_detect_seconds * 1000:.1f}ms)")
+        detected = [self.encoding] if self.encoding else []
+        return detected + [encoding for encoding in ENCODINGS if encoding not in detected]
+
     def preprocess(self):
         """데이터 전처리 수행"""
         if not hasattr(self, 'df'):
@@ -50,22 +289,7 @@ class HealthDataProcessor:
                 return False
         
         # 1. 컬럼명 정리 (인코딩 문제 해결)
-        # 실제 구현에서는 매핑 테이블 사용
-        column_mapping = {
-            'ÇÐ³âµµ': '학년도',
-            'ÃÖÁ¾°¡ÁßÄ¡': '최종가중치',
-            # ... 나머지 컬럼 매핑
-            'Ç÷´ù½ÄÀü_mgdL': '혈당치_mgdL'
-        }
-
-        # 컬럼명이 이미 한글로 정리되어 있다면 매핑 건너뛰기
-        if '학년도' in self.df.columns:
-            pass
-        else:
-            # 가능한 컬럼만 매핑
-            for old_col, new_col in column_mapping.items():
-                if old_col in self.df.columns:
-                    self.df = self.df.rename(columns={old_col: new_col})
+        self.df = self.rename_columns(self.df)
         
         # 2. 결측치 처리
         # 주요 분석 컬럼의 결측치 처리
@@ -73,42 +297,97 @@ class HealthDataProcessor:
             self.df['혈당치_mgdL'].fillna(self.df['혈당치_mgdL'].median(), inplace=True)
         
         # 3. 파생변수 생성
-        # BMI 계산
-        if '몸무게_kg' in self.df.columns and '키_cm' in self.df.columns:
-            self.df['BMI'] = self.df['몸무게_kg'] / ((self.df['키_cm']/100) ** 2)
+        self.df = self.add_derived_columns(self.df)
+        
+        return True
+
+    @classmethod
+    def rename_columns(cls, df):
+        """깨진 컬럼명을 한글 컬럼명으로 변환"""
+        # 컬럼명이 이미 한글로 정리되어 있다면 매핑 건너뛰기
+        if '학년도' in df.columns:
+            return df
+        # 가능한 컬럼만 매핑
+        mapping = {old: new for old, new in cls.COLUMN_MAPPING.items() if old in df.columns}
+        if mapping:
+            df = df.rename(columns=mapping)
+        return df
+
+    @staticmethod
+    def add_derived_columns(df):
+        """파생변수 생성 (BMI, 혈당 수준)"""
+        # BMI 계산 (float32 측정값도 float64로 계산해 분류 경계 근처 값이 바뀌지 않도록 함)
+        if '몸무게_kg' in df.columns and '키_cm' in df.columns:
+            df['BMI'] = df['몸무게_kg'].astype(np.float64) / ((df['키_cm'].astype(np.float64)/100) ** 2)
         
         # 혈당 수준 분류
-        if '혈당치_mgdL' in self.df.columns:
-            self.df['혈당수준'] = pd.cut(
-                self.df['혈당치_mgdL'],
-                bins=[0, 100, 125, float('inf')],
-                labels=['정상', '전당뇨', '당뇨의심']
+        if '혈당치_mgdL' in df.columns:
+            df['혈당수준'] = pd.cut(
+                df['혈당치_mgdL'],
+                bins=GLUCOSE_BINS,
+                labels=GLUCOSE_LABELS
             )
         
-        return True
+        return df
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNKSIZE, encodings=None):
+        """스트리밍 모드: 파일을 고정 크기 청크로 읽어 청크별 전처리 결과를 반환
+
+        dtype 축소, 컬럼 매핑, BMI 계산, 혈당 수준 분류를 청크 단위로 수행한다.
+        혈당치 결측치는 전체 중앙값이 필요하므로 채우지 않으며,
+        StreamingDiabetesAnalyzer가 집계 마지막 단계에서 반영한다.
+        청크를 반환할 때마다 지금까지 읽은 바이트 수를 self.bytes_read에 기록한다
+        (파서의 읽기 버퍼만큼 앞설 수 있음).
+
+        encodings: 시도할 인코딩 순서 (None이면 encoding_candidates())
+        첫 청크에서 디코딩에 실패하면 다음 인코딩을 시도하지만, 이후 청크에서 실패하면
+        이미 반환한 청크를 되돌릴 수 없으므로 UnicodeDecodeError를 그대로 전달한다.
+        이때 self.encoding은 실패한 인코딩이며, 호출자가 나머지 인코딩으로 처음부터 다시 읽는다.
+        """
+        self.bytes_read = 0
+        with open(self.file_path, 'rb') as handle:
+            reader = None
+            for encoding in (self.encoding_candidates() if encodings is None else encodings):
+                try:
+                    handle.seek(0)
+                    reader = pd.read_csv(handle, encoding=encoding, chunksize=chunksize, usecols=self.column_filter())
+                    first_chunk = next(reader)
+                    if len(first_chunk.columns) == 0:
+                        logger.debug("분석에 필요한 컬럼이 없어 전체 컬럼 파싱")
+                        self.skipped_columns = []
+                        handle.seek(0)
+                        reader = pd.read_csv(handle, encoding=encoding, chunksize=chunksize)
+                        first_chunk = next(reader)
+                    self.encoding = encoding
+                    logger.debug(f"{encoding} 인코딩으로 스트리밍 시작")
+                    self.report_skipped_columns()
+                    break
+                except StopIteration:
+                    return
+                except UnicodeDecodeError:
+                    logger.debug(f"{encoding} 인코딩으로 스트리밍 실패")
+                    reader = None
+                    continue
+            
+            if reader is None:
+                raise ValueError("지원하는 인코딩으로 파일을 읽을 수 없습니다.")
+            
+            self.bytes_read = handle.tell()
+            yield self.add_derived_columns(self.rename_columns(self.compact_dtypes(first_chunk)))
+            for chunk in reader:
+                self.bytes_read = handle.tell()
+                yield self.add_derived_columns(self.rename_columns(self.compact_dtypes(chunk)))
 
     def get_diabetes_risk_factors(self):
         """당뇨 위험 요인 분석을 위한 데이터셋 준비"""
-        # 관련 변수 선택
-        # 실제 데이터에 따라 컬럼을 조정해야 함
+        # 관련 변수 선택 (RISK_FACTOR_COLUMNS + 생활습관 변수 LIFESTYLE_COLUMNS + 가중치)
         try:
-            risk_factors_cols = [
-                '학년', '성별', '키_cm', '몸무게_kg', 'BMI', '비만여부', 
-                '허리둘레_cm', '혈당치_mgdL', '혈당수준'
-            ]
-            
-            # 생활습관 변수들 추가 (실제 데이터에 따라 조정)
-            lifestyle_cols = [
-                '라면', '음료수', '패스트푸드', '우유유제품', '과일',
-                '주3회이상운동', '하루30분이상운동',
-                'TV시청2시간이상', '게임2시간이상'
-            ]
-            
             # 실제 존재하는 컬럼만 필터링
-            risk_factors_cols = [col for col in risk_factors_cols if col in self.df.columns]
-            lifestyle_cols = [col for col in lifestyle_cols if col in self.df.columns]
+            risk_factors_cols = [col for col in RISK_FACTOR_COLUMNS if col in self.df.columns]
+            lifestyle_cols = [col for col in LIFESTYLE_COLUMNS if col in self.df.columns]
+            weight_cols = [WEIGHT_COLUMN] if WEIGHT_COLUMN in self.df.columns else []
             
-            all_cols = risk_factors_cols + lifestyle_cols
+            all_cols = risk_factors_cols + lifestyle_cols + weight_cols
             risk_factors_df = self.df[all_cols].copy()
             
             return risk_factors_df
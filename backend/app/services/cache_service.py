@@ -0,0 +1,242 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import uuid
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from app.services.serialization import dumpb, results_body
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# 캐시 디렉토리 및 최대 크기 설정
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(os.path.dirname(__file__), "../../uploads"))
+CACHE_DIR = os.environ.get("PARSED_CACHE_DIR", os.path.join(UPLOAD_DIR, "cache"))
+CACHE_MAX_BYTES = int(os.environ.get("PARSED_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+META_FILE = "meta.json"
+
+# 워커 프로세스별 분석 결과 응답 캐시 항목 수
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "256"))
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedFrame:
+    """캐시에서 읽은 전처리 결과"""
+
+    def __init__(self, df, risk_columns):
+        self.df = df
+        self.risk_columns = risk_columns
+
+    def get_diabetes_risk_factors(self):
+        """get_diabetes_risk_factors()와 같은 컬럼 구성의 데이터프레임
+
+        df[목록]은 컬럼을 하나의 블록으로 합치며 복사하므로 컬럼별로 꺼내 메모리 맵을 유지한다.
+        """
+        return pd.DataFrame({col: self.df[col] for col in self.risk_columns}, copy=False)
+
+
+class ParsedFrameCache:
+    """전처리된 데이터프레임을 컬럼별 .npy 파일로 저장하는 캐시
+
+    키는 파일 내용 해시와 전처리기 버전으로 구성되므로 같은 파일을 다시 분석하거나
+    다른 분석을 추가로 수행할 때 CSV를 다시 파싱하지 않는다.
+    수치형 컬럼은 메모리 맵(copy-on-write)으로 읽어 블록을 합치지 않은 데이터프레임으로 만들므로
+    캐시를 읽을 때는 파일을 메모리로 복사하지 않고 분석이 접근하는 페이지만 읽는다.
+    문자열/범주형 컬럼은 코드 배열과 범주 목록으로 저장한다.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제한다.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, content_hash, version):
+        return f"{content_hash}_v{version}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key, columns=None):
+        """캐시 항목 읽기 (없으면 None)"""
+        cached = self._load(key, columns)
+        metrics.CACHE_REQUESTS.labels("parsed", "miss" if cached is None else "hit").inc()
+        return cached
+
+    def _load(self, key, columns):
+        entry_dir = self._path(key)
+        meta_path = os.path.join(entry_dir, META_FILE)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            data = {}
+            for i, col in enumerate(meta["columns"]):
+                if columns is not None and col["name"] not in columns:
+                    continue
+                # 제자리 수정(fillna 등)은 파일이 아니라 해당 페이지의 사본에 반영됨
+                values = np.load(os.path.join(entry_dir, f"{i}.npy"), mmap_mode="c")
+                if col["kind"] == "category":
+                    values = pd.Categorical.from_codes(
+                        np.asarray(values), categories=col["categories"], ordered=col["ordered"]
+                    )
+                    if col.get("object"):
+                        values = np.asarray(values, dtype=object)
+                data[col["name"]] = values
+            # copy=False: 컬럼을 하나의 블록으로 합치며 복사하지 않고 메모리 맵을 그대로 사용
+            df = pd.DataFrame(data, columns=[c for c in meta["columns_order"] if c in data], copy=False)
+            # LRU 순서 갱신
+            os.utime(meta_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"캐시 읽기 실패 ({key}): {str(e)}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        risk_columns = [c for c in meta["risk_columns"] if c in df.columns]
+        return CachedFrame(df, risk_columns)
+
+    def store(self, key, df, risk_columns):
+        """전처리된 데이터프레임 저장 (실패해도 분석은 계속 진행)"""
+        entry_dir = self._path(key)
+        if os.path.exists(os.path.join(entry_dir, META_FILE)):
+            return True
+        tmp_dir = os.path.join(self.cache_dir, f".tmp_{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp_dir)
+            columns = []
+            for i, name in enumerate(df.columns):
+                columns.append(self._write_column(tmp_dir, i, name, df[name]))
+            meta = {
+                "columns": columns,
+                "columns_order": [str(c) for c in df.columns],
+                "risk_columns": [str(c) for c in risk_columns],
+                "rows": len(df),
+            }
+            with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # 다른 프로세스가 먼저 저장한 경우
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception as e:
+            logger.warning(f"캐시 저장 실패 ({key}): {str(e)}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    def _write_column(self, entry_dir, index, name, series):
+        path = os.path.join(entry_dir, f"{index}.npy")
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+            # 문자열 컬럼은 범주 코드로 저장하고 읽을 때 object로 복원
+            categorical = pd.Categorical(series)
+            np.save(path, np.asarray(categorical.codes))
+            return {
+                "name": str(name),
+                "kind": "category",
+                "categories": categorical.categories.tolist(),
+                "ordered": bool(categorical.ordered),
+                "object": series.dtype == object,
+            }
+        np.save(path, np.ascontiguousarray(series.to_numpy()))
+        return {"name": str(name), "kind": "array"}
+
+    def _entries(self):
+        """(마지막 사용 시각, 크기, 경로) 목록"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry_dir, META_FILE)
+            try:
+                used = os.path.getmtime(meta_path)
+                size = sum(e.stat().st_size for e in os.scandir(entry_dir))
+            except OSError:
+                continue
+            entries.append((used, size, entry_dir))
+        return entries
+
+    def evict(self):
+        """전체 크기가 한도를 넘지 않도록 오래된 항목 삭제"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for used, size, entry_dir in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            logger.info(f"캐시 항목 삭제: {os.path.basename(entry_dir)}")
+
+
+class CachedResult:
+    """분석 결과 응답 본문과 ETag"""
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+
+    @classmethod
+    def from_sections(cls, sections, status="completed", version="exact", versions=None):
+        """저장된 섹션 JSON 바이트로 응답 본문 생성 (파싱/재직렬화 없이 이어 붙임)
+
+        Args:
+            sections: [(섹션 이름, JSON 바이트), ...]
+            status, version, versions: 응답 본문에 함께 담을 작업 상태와 결과 버전 (results_body 참고)
+        """
+        data = b"{" + b",".join(dumpb(name) + b":" + section for name, section in sections) + b"}"
+        body = results_body(data, status, version, versions)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return cls(body, etag)
+
+
+class ResultCache:
+    """완료된 분석 결과 응답을 보관하는 LRU 캐시 (키: task_id와 요청한 섹션/항목)
+
+    완료된 결과는 바뀌지 않으므로 한 번 읽은 뒤에는 DB 조회와 JSON 처리 없이 응답한다.
+    name은 캐시 조회 지표의 cache 레이블이다.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, name="result"):
+        self.max_entries = max_entries
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.CACHE_REQUESTS.labels(self.name, "miss" if entry is None else "hit").inc()
+        return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# 공용 캐시 인스턴스
+parsed_cache = ParsedFrameCache()
+result_cache = ResultCache()
+# 작업별 집계 큐브 (저장된 cube 섹션을 파싱한 Cube 객체)
+cube_cache = ResultCache(name="cube")
+# 작업별 분위수 스케치 ({측정값: QuantileSketch}, 병합할 때는 복사해서 사용)
+sketch_cache = ResultCache(name="sketch")
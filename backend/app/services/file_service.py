@@ -1,56 +1,224 @@
 import os
 import uuid
-from fastapi import UploadFile
-import shutil
+import hashlib
+from fastapi import Request
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
-from app.db.crud import create_file_record
+from typing import Optional
+from app.db.crud import create_file_record_if_new
+from app.services import metrics
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    from python_multipart.exceptions import MultipartParseError
+except ImportError:  # python-multipart 0.0.13 미만
+    from multipart.multipart import MultipartParser, parse_options_header
+    from multipart.exceptions import MultipartParseError
 
 # 업로드 디렉토리 설정
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(os.path.dirname(__file__), "../../uploads"))
 
+# 업로드 파일 최대 크기 (기본 1GB)
+# 업로드는 디스크로 바로 스트리밍되고 큰 파일은 스트리밍 모드로 분석하므로
+# app.worker의 PROGRESSIVE_MIN_BYTES, STREAMING_MIN_BYTES보다 커야 함
+MAX_FILE_SIZE = int(os.environ.get("MAX_FILE_SIZE", str(1024 * 1024 * 1024)))
+
+# 요청 본문이 이만큼 모이면 스레드 풀에서 파싱, 해시 계산, 디스크 쓰기를 수행
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
 # 디렉토리가 없으면 생성
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def validate_file(file: UploadFile) -> bool:
-    """CSV 파일인지 확인하고 기본 검증 수행"""
-    
+# 업로드 파싱/해시/쓰기를 동시에 수행하는 스레드 수
+# 동시 업로드마다 스레드를 쓰면 GIL 경합으로 이벤트 루프 응답이 늦어지므로 CPU 수로 제한
+# (디스크 쓰기 대기 중에는 GIL을 놓으므로 처리량은 거의 줄지 않음)
+UPLOAD_WRITERS = max(1, int(os.environ.get("UPLOAD_WRITERS", str(os.cpu_count() or 1))))
+
+# CapacityLimiter는 이벤트 루프 안에서 만들어야 하므로 첫 업로드 때 생성
+_writer_limiter: Optional[anyio.CapacityLimiter] = None
+
+def _get_writer_limiter() -> anyio.CapacityLimiter:
+    global _writer_limiter
+    if _writer_limiter is None:
+        _writer_limiter = anyio.CapacityLimiter(UPLOAD_WRITERS)
+    return _writer_limiter
+
+class FileTooLargeError(ValueError):
+    """업로드 파일이 최대 크기를 넘은 경우 발생하는 예외"""
+
+class InvalidUploadError(ValueError):
+    """업로드 요청에 CSV 파일 파트가 없거나 형식이 잘못된 경우 발생하는 예외"""
+
+def validate_filename(filename: str) -> bool:
+    """CSV 파일인지 확인 (파일 크기는 save_file()이 저장하면서 함께 검사)"""
+
     # 파일 확장자 검증
-    if not file.filename.endswith('.csv'):
+    if not filename.endswith('.csv'):
         return False
-    
-    # 파일 크기 검증 (예: 10MB 이하)
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB
-    
-    chunk = await file.read(chunk_size)
-    while chunk:
-        file_size += len(chunk)
-        if file_size > 10 * 1024 * 1024:  # 10MB
-            return False
-        chunk = await file.read(chunk_size)
-    
-    # 파일 포인터 처음으로 되돌리기
-    await file.seek(0)
-    
+
     return True
 
-async def save_file(file: UploadFile, user_id: int) -> str:
-    """파일을 저장하고 파일 ID 반환"""
-    
+class MultipartFileWriter:
+    """multipart/form-data 본문 조각을 파싱해 field 이름의 첫 파일 파트 내용만 임시 파일(.part)에 씀
+
+    write()와 finish()는 스레드 풀에서 호출하므로 본문 파싱, SHA-256 계산, 디스크 쓰기가
+    모두 이벤트 루프 밖에서 실행된다. 나머지 파트는 버린다.
+    파일 파트 헤더를 읽으면 확장자를 확인하고 path_for(파일명)이 돌려준 경로에 임시 파일을 연다.
+    """
+
+    def __init__(self, boundary, field, path_for):
+        self.field = field
+        self.path_for = path_for
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_end": self.on_end,
+        })
+        self.digest = hashlib.sha256()
+        self.filename = None
+        self.file_path = None
+        self.size = 0
+        self._buffer = None
+        self._pending = []
+        self._headers = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._collecting = False
+        # 본문의 마지막 경계까지 읽었는지 (중간에 끊긴 업로드 판별용)
+        self._ended = False
+
+    # python-multipart 콜백
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if self.filename is None and name == self.field and b"filename" in options:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self._collecting = True
+
+    def on_part_data(self, data, start, end):
+        if self._collecting:
+            self._pending.append(data[start:end])
+            self.size += end - start
+
+    def on_part_end(self):
+        self._collecting = False
+
+    def on_end(self):
+        self._ended = True
+
+    def write(self, chunks):
+        """본문 조각들을 파싱하고 파일 내용을 해시 계산 후 디스크에 씀"""
+        for chunk in chunks:
+            try:
+                self.parser.write(chunk)
+            except MultipartParseError as e:
+                raise InvalidUploadError(f"multipart 본문 형식이 잘못되었습니다: {e}")
+        if self.size > MAX_FILE_SIZE:
+            raise FileTooLargeError(f"파일 크기가 최대 {MAX_FILE_SIZE // (1024 * 1024)}MB를 초과합니다.")
+        if self.filename is not None and self._buffer is None:
+            if not validate_filename(self.filename):
+                raise InvalidUploadError("CSV 파일만 업로드 가능합니다.")
+            self.file_path = self.path_for(self.filename)
+            self._buffer = open(self.file_path + ".part", "wb")
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending = []
+            self.digest.update(data)
+            self._buffer.write(data)
+
+    def finish(self):
+        """본문이 끝났는지 확인하고 임시 파일을 최종 경로로 원자적으로 이름 변경"""
+        self.parser.finalize()
+        if self._buffer is None:
+            raise InvalidUploadError("업로드할 CSV 파일이 없습니다.")
+        if not self._ended:
+            raise InvalidUploadError("업로드 본문이 중간에 끊겼습니다.")
+        self._buffer.close()
+        os.replace(self.file_path + ".part", self.file_path)
+
+    def discard(self):
+        """실패한 업로드의 임시 파일 삭제"""
+        if self._buffer is not None:
+            self._buffer.close()
+            try:
+                os.remove(self.file_path + ".part")
+            except FileNotFoundError:
+                pass
+
+async def save_file(request: Request, user_id: int, task_id: Optional[str] = None, field: str = "file") -> dict:
+    """multipart/form-data 요청 본문의 파일을 저장하고 파일/작업 ID 반환
+
+    UploadFile처럼 본문 전체를 임시 파일에 먼저 받아 두지 않고, 요청 스트림에서 받은 조각을
+    CHUNK_SIZE만큼 모아 스레드 풀(동시 UPLOAD_WRITERS개)의 MultipartFileWriter에 넘기므로 디스크에는 한 번만 쓰고
+    이벤트 루프에서는 파싱이나 파일 I/O를 하지 않는다. 크기 제한 검사와 SHA-256 계산도 같은 스트림에서 수행한다.
+    같은 내용의 파일이 이미 있으면 새 파일을 만들지 않고 기존 파일과 작업을 반환한다.
+
+    Raises:
+        InvalidUploadError: multipart 요청이 아니거나 CSV 파일 파트가 없는 경우
+        FileTooLargeError: 파일이 MAX_FILE_SIZE를 넘는 경우
+
+    Returns:
+        {"file_id", "task_id", "deduplicated"}
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUploadError("multipart/form-data 형식으로 파일을 업로드해야 합니다.")
+
     # 고유 파일명 생성
     file_id = str(uuid.uuid4())
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    original_filename = file.filename
-    file_extension = original_filename.split('.')[-1]
-    
-    # 저장할 파일 경로
-    save_filename = f"{file_id}_{timestamp}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, save_filename)
-    
-    # 파일 저장
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
+
+    def path_for(filename):
+        return os.path.join(UPLOAD_DIR, f"{file_id}_{timestamp}.{filename.split('.')[-1]}")
+
+    writer = MultipartFileWriter(params[b"boundary"], field, path_for)
+
+    # 크기 검사, 해시 계산, 저장을 한 번에 수행
+    try:
+        chunks = []
+        pending = 0
+        async for chunk in request.stream():
+            chunks.append(chunk)
+            pending += len(chunk)
+            if pending >= CHUNK_SIZE:
+                await anyio.to_thread.run_sync(writer.write, chunks, limiter=_get_writer_limiter())
+                chunks = []
+                pending = 0
+        await anyio.to_thread.run_sync(writer.write, chunks, limiter=_get_writer_limiter())
+        await run_in_threadpool(writer.finish)
+    except BaseException as e:
+        if isinstance(e, FileTooLargeError):
+            metrics.UPLOADS.labels("too_large").inc()
+        # 취소된 경우에도 정리되도록 스레드 풀을 거치지 않고 바로 삭제
+        writer.discard()
+        raise
+
+    original_filename = writer.filename
+    file_path = writer.file_path
+    file_size = writer.size
+    content_hash = writer.digest.hexdigest()
+    metrics.UPLOAD_BYTES.inc(file_size)
+
     # DB에 파일 정보 저장
     file_record = {
         "id": file_id,
@@ -58,9 +226,27 @@ async def save_file(file: UploadFile, user_id: int) -> str:
         "path": file_path,
         "user_id": user_id,
         "created_at": datetime.now(),
-        "file_size": os.path.getsize(file_path)
+        "file_size": file_size,
+        "content_hash": content_hash
+    }
+    if task_id:
+        file_record["task_id"] = task_id
+
+    # 같은 내용의 파일이 이미 분석되었거나 분석 중이면 저장하지 않고 재사용
+    # (중복 확인과 저장은 한 트랜잭션이므로 동시 업로드에도 레코드는 하나만 생성됨)
+    existing = await run_in_threadpool(create_file_record_if_new, file_record)
+    if existing:
+        await run_in_threadpool(os.remove, file_path)
+        metrics.UPLOADS.labels("deduplicated").inc()
+        return {
+            "file_id": existing["file_id"],
+            "task_id": existing["task_id"],
+            "deduplicated": True
+        }
+
+    metrics.UPLOADS.labels("new").inc()
+    return {
+        "file_id": file_id,
+        "task_id": file_record.get("task_id", "task_" + file_id),
+        "deduplicated": False
     }
-    
-    create_file_record(file_record)
-    
-    return file_id
\ No newline at end of file
@@ -0,0 +1,158 @@
+import os
+import atexit
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# gunicorn 워커 하나당 사용할 분석 프로세스 수
+# 기본값: CPU 코어 수를 gunicorn 워커 수(WEB_CONCURRENCY)로 나눈 값
+_web_workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "4")))
+ANALYSIS_WORKERS = max(1, int(os.environ.get(
+    "ANALYSIS_WORKERS",
+    str(max(1, (os.cpu_count() or 1) // _web_workers))
+)))
+
+# 실행 대기 + 실행 중인 작업의 최대 개수 (초과 시 업로드 거절)
+ANALYSIS_MAX_PENDING = max(1, int(os.environ.get("ANALYSIS_MAX_PENDING", str(ANALYSIS_WORKERS * 8))))
+
+# 프로세스 시작 방식 (uvicorn 이벤트 루프/스레드를 복제하지 않도록 기본값은 spawn)
+ANALYSIS_START_METHOD = os.environ.get("ANALYSIS_START_METHOD", "spawn")
+
+
+class JobQueueFullError(RuntimeError):
+    """분석 작업 대기열이 가득 찬 경우 발생하는 예외"""
+
+
+class JobExecutor:
+    """분석 작업을 제한된 크기의 프로세스 풀에서 실행하는 실행기
+
+    풀은 첫 작업 제출 시점에 생성되며, 워커 프로세스가 비정상 종료되어
+    풀이 깨진 경우 다음 제출 시 새로 생성한다.
+    """
+
+    def __init__(self, max_workers=ANALYSIS_WORKERS, max_pending=ANALYSIS_MAX_PENDING,
+                 start_method=ANALYSIS_START_METHOD):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self):
+        """대기 중이거나 실행 중인 작업 수"""
+        return self._pending
+
+    def _get_pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            logger.info(f"분석 프로세스 풀 생성: {self.max_workers}개 프로세스 ({self.start_method})")
+        return self._pool
+
+    def submit(self, fn, *args, on_error=None):
+        """작업 제출
+
+        on_error는 작업이 워커 프로세스 밖에서 실패한 경우(프로세스 비정상 종료,
+        실행 전 종료로 인한 취소 등) 부모 프로세스에서 예외를 인자로 호출된다.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError(f"분석 대기 작업이 너무 많습니다 (최대 {self.max_pending}개)")
+            try:
+                future = self._get_pool().submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("분석 프로세스 풀이 손상되어 다시 생성합니다")
+                self._pool = None
+                future = self._get_pool().submit(fn, *args)
+            self._pending += 1
+            metrics.set_job_queue(self._pending, self.max_workers)
+
+        def _done(fut):
+            with self._lock:
+                self._pending -= 1
+                metrics.set_job_queue(self._pending, self.max_workers)
+            # 취소된 future는 exception()이 CancelledError를 던지므로 먼저 확인
+            if fut.cancelled():
+                exc = CancelledError("분석 작업이 실행되기 전에 취소되었습니다")
+            else:
+                exc = fut.exception()
+            if exc is not None:
+                logger.error(f"분석 작업 실행 오류: {exc}")
+                if on_error is not None:
+                    try:
+                        on_error(exc)
+                    except Exception as e:
+                        logger.error(f"작업 오류 처리 중 오류: {e}")
+
+        future.add_done_callback(_done)
+        return future
+
+    def shutdown(self, wait=True):
+        """프로세스 풀 종료"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class AnalysisPool:
+    """분석 하나를 여러 프로세스로 나눠 계산할 때(부트스트랩, 층화 분석) 쓰는 분석 프로세스별 공용 풀
+
+    작업마다 풀을 새로 만들면 프로세스 시작과 모듈 import 비용을 매번 치르고 종료된 프로세스의
+    지표 파일이 계속 쌓이므로, 첫 제출 시점에 한 번 만들어 분석 프로세스가 끝날 때까지 재사용한다.
+    JobExecutor와 같이 풀이 깨졌으면 다음 제출 시 새로 만들고, 풀을 닫을 때는 풀 프로세스의
+    livesum 게이지를 합산에서 제외한다. concurrent.futures 실행기 대신 submit()만 지원한다.
+    """
+
+    def __init__(self, max_workers, start_method=ANALYSIS_START_METHOD):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._pool = None
+        self._pids = set()
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _get_pool(self):
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._pool
+
+    def submit(self, fn, *args):
+        with self._lock:
+            # 풀 프로세스는 submit() 안에서 시작되므로 전후의 자식 프로세스를 비교해 기록
+            before = {process.pid for process in multiprocessing.active_children()}
+            try:
+                future = self._get_pool().submit(fn, *args)
+            except BrokenProcessPool:
+                logger.warning("보조 프로세스 풀이 손상되어 다시 생성합니다")
+                self._close(wait=False)
+                future = self._get_pool().submit(fn, *args)
+            self._pids.update(
+                process.pid for process in multiprocessing.active_children() if process.pid not in before
+            )
+        return future
+
+    def shutdown(self, wait=True):
+        """풀 종료 (다음 제출 시 새로 생성)"""
+        with self._lock:
+            self._close(wait)
+
+    def _close(self, wait):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+        for pid in self._pids:
+            metrics.mark_process_dead(pid)
+        self._pids.clear()
+
+
+# 프로세스(gunicorn 워커)별 공용 실행기
+job_executor = JobExecutor()
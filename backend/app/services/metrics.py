@@ -0,0 +1,126 @@
+import os
+import time
+import atexit
+import shutil
+import tempfile
+
+# Prometheus 지표 모듈
+# gunicorn 워커와 분석 프로세스가 각자 기록한 값을 한 번의 수집(/api/metrics)으로 합치기 위해
+# prometheus_client의 multiprocess 모드를 사용한다. 각 프로세스는 PROMETHEUS_MULTIPROC_DIR에
+# 프로세스별 파일로 값을 기록하고, 수집 시 MultiProcessCollector가 모든 파일을 합산한다.
+# (gunicorn으로 실행할 때는 gunicorn.conf.py가 디렉토리를 준비하고 종료된 워커를 정리한다)
+
+# prometheus_client는 import 시점에 디렉토리 설정을 읽으므로 그 전에 설정해야 한다.
+# 설정이 없으면(uvicorn 단독 실행 등) 이 프로세스와 분석 프로세스가 함께 쓸 임시 디렉토리를 만든다.
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    _created_dir = tempfile.mkdtemp(prefix="prometheus-multiproc-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = _created_dir
+    atexit.register(shutil.rmtree, _created_dir, True)
+
+from prometheus_client import (  # noqa: E402
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+MULTIPROC_DIR = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+
+# 분석 단계 소요 시간 구간 (초)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 작업별 처리 속도 구간 (행/초)
+THROUGHPUT_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+# HTTP 요청 (route는 경로 템플릿, 예: /api/analysis/{task_id})
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (응답 헤더 전송까지)",
+    ["method", "route", "status"]
+)
+
+# 분석 단계 (sampling, loading, preprocessing, summary, correlation, regression, weighted, sketch, cube, saving)
+ANALYSIS_STAGE_SECONDS = Histogram(
+    "analysis_stage_duration_seconds", "분석 단계별 소요 시간", ["stage"], buckets=STAGE_BUCKETS
+)
+ANALYSIS_ROWS = Counter("analysis_rows_processed", "분석한 행 수")
+ANALYSIS_THROUGHPUT = Histogram(
+    "analysis_throughput_rows_per_second", "분석 작업별 처리 속도 (행/초)", buckets=THROUGHPUT_BUCKETS
+)
+ANALYSIS_TASKS = Counter("analysis_tasks", "끝난 분석 작업 수", ["status"])
+
+# 분석 작업 대기열 (gunicorn 워커별 값을 살아 있는 프로세스끼리 합산)
+ANALYSIS_INFLIGHT = Gauge(
+    "analysis_tasks_inflight", "분석 프로세스에서 실행 중인 작업 수", multiprocess_mode="livesum"
+)
+ANALYSIS_QUEUED = Gauge(
+    "analysis_tasks_queued", "실행을 기다리는 분석 작업 수", multiprocess_mode="livesum"
+)
+
+# 업로드
+UPLOAD_BYTES = Counter("upload_bytes", "업로드된 바이트 수")
+UPLOADS = Counter("uploads", "업로드 수", ["result"])
+
+# 캐시 (cache: parsed, result, cube, sketch / result: hit, miss)
+CACHE_REQUESTS = Counter("cache_requests", "캐시 조회 수", ["cache", "result"])
+
+# SQLite 쓰기 잠금
+DB_LOCK_WAIT_SECONDS = Histogram(
+    "db_lock_wait_seconds", "쓰기 트랜잭션 시작(BEGIN IMMEDIATE)까지 기다린 시간",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_LOCK_TIMEOUTS = Counter("db_lock_timeouts", "busy_timeout 안에 쓰기 잠금을 얻지 못한 횟수")
+
+
+class RequestMetricsMiddleware:
+    """HTTP 요청 처리 시간을 경로 템플릿별로 기록하는 ASGI 미들웨어
+
+    응답 헤더가 전송될 때까지의 시간을 기록하므로 스트리밍 응답(events)은 연결 시간까지만 포함된다.
+    어떤 경로와도 맞지 않은 요청은 route="unmatched"로 묶는다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        def observe(status):
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                scope["method"], route.path if route is not None else "unmatched", str(status)
+            ).observe(time.perf_counter() - started)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                observe(500)
+
+
+def set_job_queue(pending, max_workers):
+    """대기 중이거나 실행 중인 작업 수로 실행/대기 작업 수 기록
+
+    프로세스 풀은 먼저 제출된 작업부터 max_workers개를 동시에 실행한다.
+    """
+    ANALYSIS_INFLIGHT.set(min(pending, max_workers))
+    ANALYSIS_QUEUED.set(max(0, pending - max_workers))
+
+
+def render():
+    """모든 프로세스의 지표를 합친 Prometheus 텍스트 형식 본문과 Content-Type"""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """종료된 프로세스의 livesum 게이지 값을 합산에서 제외"""
+    multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
@@ -0,0 +1,109 @@
+import re
+import json
+import math
+import numpy as np
+import pandas as pd
+
+# 분석 결과 JSON 직렬화 모듈
+# NumPy/Pandas 값은 인코딩 중에 변환하므로 결과 dict를 미리 복사해 변환할 필요가 없다.
+# NaN/inf는 JSON 표준에 없으므로 null로 인코딩한다.
+
+def _default(obj):
+    """json 기본 인코더가 모르는 값 변환"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pd.Series):
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    raise TypeError(f"JSON으로 변환할 수 없는 타입: {type(obj).__name__}")
+
+
+def _sanitize(obj):
+    """NaN/inf float를 None으로 바꾼 JSON 기본 타입 사본 (NumPy/Pandas 값은 _default로 변환)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    if isinstance(obj, dict):
+        return {key: _sanitize(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(value) for value in obj]
+    return _sanitize(_default(obj))
+
+
+# C 인코더 (NaN/inf는 NaN, Infinity, -Infinity로 출력된 뒤 null로 치환)
+_encoder = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=True, separators=(',', ':'), default=_default
+)
+# 토큰 치환이 불가능할 때 미리 정리한 값을 인코딩 (NaN/inf가 남아 있으면 오류)
+_strict_encoder = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(',', ':'), default=_default
+)
+
+_NONFINITE = re.compile(r'-?Infinity|NaN')
+
+
+def _nonfinite_to_null(text):
+    """문자열 밖의 NaN/Infinity 토큰을 null로 치환 (문자열에 이스케이프된 따옴표가 있으면 None)
+
+    후보 토큰 앞의 따옴표 개수가 짝수이면 문자열 밖에 있는 토큰이다.
+    """
+    if '\\"' in text:
+        return None
+    parts = []
+    last = 0
+    quotes = 0
+    for match in _NONFINITE.finditer(text):
+        start = match.start()
+        quotes += text.count('"', last, start)
+        parts.append(text[last:start])
+        parts.append('null' if quotes % 2 == 0 else match.group())
+        last = match.end()
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def dumps(obj):
+    """obj를 간결한 JSON 문자열로 인코딩
+
+    C 인코더로 한 번 인코딩하고, NaN/inf가 있을 때만 해당 토큰을 null로 바꾼다.
+    문자열 때문에 토큰을 구분할 수 없으면 NaN/inf를 None으로 바꾼 사본을 다시 인코딩한다.
+    """
+    text = _encoder.encode(obj)
+    if 'NaN' in text or 'Infinity' in text:
+        replaced = _nonfinite_to_null(text)
+        if replaced is None:
+            return _strict_encoder.encode(_sanitize(obj))
+        return replaced
+    return text
+
+
+def dumpb(obj):
+    """obj를 UTF-8 JSON 바이트로 인코딩"""
+    return dumps(obj).encode('utf-8')
+
+
+def completed_body(data):
+    """이미 인코딩된 결과 바이트를 완료 응답 본문({"status":"completed","data":...})으로 감쌈"""
+    return b'{"status":"completed","data":' + data + b'}'
+
+
+def results_body(data, status="completed", version="exact", versions=None):
+    """분석 결과 섹션 응답 본문 ({"status":...,"version":...,"data":...})
+
+    version은 응답에 임시(provisional) 섹션이 하나라도 있으면 provisional이고,
+    versions가 주어지면 섹션별 버전({섹션 이름: 버전})을 함께 담는다.
+    """
+    head = b'{"status":' + dumpb(status) + b',"version":' + dumpb(version)
+    if versions is not None:
+        head += b',"versions":' + dumpb(versions)
+    return head + b',"data":' + data + b'}'
@@ -1,99 +1,255 @@
-# 참고: 이 파일은 더 이상 사용되지 않습니다. 현재는 동기식 처리로 변경되었습니다.
-# 이전에 사용하던 Celery 비동기 처리 방식의 코드입니다.
+# 분석 작업 실행 모듈
+# app.services.job_executor의 프로세스 풀 안에서 실행되므로
+# 이벤트 루프를 막지 않고 pandas/statsmodels 연산을 수행할 수 있다.
 
-# from celery import Celery
-from app.preprocessing.health_data_processor import HealthDataProcessor
-from app.analysis.diabetes_analyzer import DiabetesAnalyzer
-from app.db.crud import update_task_status, save_analysis_results
+from app.preprocessing.health_data_processor import HealthDataProcessor, PROCESSOR_VERSION
+from app.analysis.diabetes_analyzer import DiabetesAnalyzer, STRATIFIED_WORKERS
+from app.analysis.streaming_analyzer import StreamingDiabetesAnalyzer, StratifiedStreamingAnalyzer
+from app.analysis.bootstrap import BOOTSTRAP_SEED, BOOTSTRAP_REPLICATES, BOOTSTRAP_WORKERS
+from app.db.crud import (
+    update_task_status, update_task_progress, save_section, save_sections, complete_task, get_file_info,
+    SECTION_PROVISIONAL
+)
+from app.services.cache_service import parsed_cache, file_sha256
+from app.services.job_executor import AnalysisPool
+from app.services.serialization import dumpb
+from app.services import metrics
 import os
-import json
+import time
+import logging
 
-# celery_app = Celery('diabetes_dashboard')
-# celery_app.conf.broker_url = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
-# celery_app.conf.result_backend = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+logger = logging.getLogger(__name__)
 
-# @celery_app.task(bind=True)
-def process_health_data_task(file_id):
+# 부트스트랩과 층화 분석을 나눠 계산하는 분석 프로세스별 공용 풀 (첫 제출 시 생성)
+analysis_pool = AnalysisPool(max(BOOTSTRAP_WORKERS, STRATIFIED_WORKERS))
+
+# 이 크기 이상의 파일은 스트리밍 모드(청크 단위 집계)로 분석
+STREAMING_MIN_BYTES = int(os.environ.get("STREAMING_MIN_BYTES", str(200 * 1024 * 1024)))
+STREAMING_CHUNKSIZE = int(os.environ.get("STREAMING_CHUNKSIZE", "100000"))
+
+# 점진 모드: 이 크기 이상의 파일은 무작위 표본으로 임시 결과(신뢰구간 포함)를 먼저 저장한 뒤
+# 전체 데이터로 정확한 결과를 계산해 덮어씀 (표본 행 수, 임시 결과의 부트스트랩 반복 수)
+PROGRESSIVE_MIN_BYTES = int(os.environ.get("PROGRESSIVE_MIN_BYTES", str(100 * 1024 * 1024)))
+PROGRESSIVE_SAMPLE_ROWS = int(os.environ.get("PROGRESSIVE_SAMPLE_ROWS", "20000"))
+PROGRESSIVE_BOOTSTRAP = int(os.environ.get("PROGRESSIVE_BOOTSTRAP", "200"))
+
+# 청크 진행 상황을 DB에 기록하는 최소 간격(초)
+PROGRESS_INTERVAL = float(os.environ.get("PROGRESS_INTERVAL", "0.5"))
+
+class ProgressReporter:
+    """작업 진행 상황(단계, 처리한 행 수)을 tasks 테이블에 기록
+
+    단계가 바뀔 때는 바로 기록하고, 같은 단계 안의 청크 진행 상황은
+    PROGRESS_INTERVAL초에 한 번만 기록해 쓰기 트랜잭션 수를 제한한다.
+    """
+
+    def __init__(self, task_id, interval=PROGRESS_INTERVAL):
+        self.task_id = task_id
+        self.interval = interval
+        self.stage_name = None
+        self.rows_processed = None
+        self.rows_total = None
+        self._last_write = 0.0
+
+    def stage(self, stage):
+        self.stage_name = stage
+        self._write()
+
+    def rows(self, rows_processed, rows_total=None):
+        self.rows_processed = rows_processed
+        self.rows_total = rows_total
+        if time.monotonic() - self._last_write >= self.interval:
+            self._write()
+
+    def chunk_progress(self, file_size):
+        """StreamingDiabetesAnalyzer.from_processor()에 전달할 콜백 (읽은 바이트 비율로 전체 행 수 추정)"""
+        def report(rows_processed, bytes_read):
+            rows_total = None
+            if bytes_read:
+                rows_total = max(rows_processed, round(rows_processed * file_size / bytes_read))
+            self.rows(rows_processed, rows_total)
+        return report
+
+    def _write(self):
+        self._last_write = time.monotonic()
+        update_task_progress(self.task_id, self.stage_name, self.rows_processed, self.rows_total)
+
+def process_health_data_task(file_id, task_id):
     """학생 건강검사 데이터 처리 및 분석 작업"""
+    started = time.perf_counter()
     try:
         # 작업 시작 상태 업데이트
-        # Celery task ID가 없으므로 task_id를 직접 전달해야 함
-        # update_task_status(self.request.id, 'processing')
-        
+        update_task_status(task_id, 'processing')
+
         # 파일 정보 가져오기
-        from app.db.crud import get_file_info
         file_info = get_file_info(file_id)
+        if not file_info:
+            raise Exception("파일 정보를 찾을 수 없습니다.")
         file_path = file_info['path']
-        
-        # 1. 데이터 전처리
         processor = HealthDataProcessor(file_path)
-        if not processor.preprocess():
-            raise Exception("데이터 전처리 중 오류가 발생했습니다.")
-        
-        # 2. 당뇨 관련 데이터 추출
-        diabetes_data = processor.get_diabetes_risk_factors()
-        
-        # 3. 분석 수행
-        analyzer = DiabetesAnalyzer(diabetes_data)
-        
-        # 각종 분석 수행
-        summary_stats = analyzer.get_summary_stats()
-        correlation_analysis = analyzer.correlation_analysis()
-        lifestyle_impact = analyzer.lifestyle_impact_analysis()
-        
-        # 4. 분석 결과 통합
-        analysis_results = {
-            'summary': summary_stats,
-            'correlations': correlation_analysis,
-            'lifestyle_impact': lifestyle_impact
-        }
-        
-        # JSON으로 직렬화 가능한지 확인
-        try:
-            json.dumps(analysis_results)
-        except TypeError as e:
-            # numpy나 pandas 타입 등 직렬화 불가능한 객체가 있을 경우 변환
-            analysis_results = convert_to_serializable(analysis_results)
-        
-        # 5. 분석 결과 저장
-        save_analysis_results(file_id, self.request.id, analysis_results)
-        
-        # 6. 작업 상태 업데이트
-        # update_task_status(self.request.id, 'completed')
-        
+        progress = ProgressReporter(task_id)
+
+        if file_info['file_size'] >= PROGRESSIVE_MIN_BYTES:
+            # 0. 대용량 파일: 표본 분석 결과를 임시 섹션으로 먼저 저장
+            progress.stage('sampling')
+            with metrics.ANALYSIS_STAGE_SECONDS.labels('sampling').time():
+                save_provisional_results(processor, task_id)
+
+        if file_info['file_size'] >= STREAMING_MIN_BYTES:
+            # 1-2. 대용량 파일: 청크 단위로 전처리하며 통계량만 누적
+            logger.info(f"스트리밍 모드로 분석: {file_info['file_size']} bytes")
+            progress.stage('loading')
+            with metrics.ANALYSIS_STAGE_SECONDS.labels('loading').time():
+                analyzer = StreamingDiabetesAnalyzer.from_processor(
+                    processor, STREAMING_CHUNKSIZE, progress.chunk_progress(file_info['file_size'])
+                )
+            rows = analyzer.total
+        else:
+            # 1-2. 데이터 전처리 및 당뇨 관련 데이터 추출 (파싱 캐시 우선 사용)
+            diabetes_data = load_diabetes_data(processor, file_info.get('content_hash'), progress)
+            analyzer = DiabetesAnalyzer(diabetes_data, executor=analysis_pool)
+            rows = len(diabetes_data)
+        progress.rows_processed = progress.rows_total = rows
+
+        if processor.encoding_detect_seconds is not None:
+            logger.info(f"인코딩 {processor.encoding} 판별: {processor.encoding_detect_seconds * 1000:.1f}ms")
+
+        # 3. 분석 수행 (개별 분석 실패 시 해당 항목만 오류 메시지로 대체)
+        # 끝난 섹션은 바로 저장하므로 events 스트림이 작업 완료 전에 전달할 수 있다
+        # (진행 단계, 결과 섹션, 분석 함수, 오류 메시지) - 섹션 순서가 저장 위치
+        analyses = [
+            ('summary', 'summary', analyzer.get_summary_stats, '통계량 계산'),
+            ('correlation', 'correlations', analyzer.correlation_analysis, '상관관계 분석'),
+            ('regression', 'lifestyle_impact', analyzer.lifestyle_impact_analysis, '생활습관 영향 분석'),
+            ('weighted', 'weighted', analyzer.weighted_analysis, '가중 분석'),
+            ('sketch', 'sketches', analyzer.quantile_sketches, '분위수 스케치 생성'),
+            ('cube', 'cube', analyzer.cube_analysis, '집계 큐브 생성'),
+        ]
+        save_seconds = 0.0
+        for position, (stage, section, analyze, label) in enumerate(analyses):
+            progress.stage(stage)
+            with metrics.ANALYSIS_STAGE_SECONDS.labels(stage).time():
+                try:
+                    result = analyze()
+                except Exception as e:
+                    logger.error(f"{label} 오류: {str(e)}")
+                    result = {'message': f'{label} 중 오류 발생'}
+            save_started = time.perf_counter()
+            save_section(task_id, section, position, result)
+            save_seconds += time.perf_counter() - save_started
+
+        # 4. 작업 완료 처리 (결과 메타데이터 기록과 상태 변경을 한 트랜잭션으로)
+        progress.stage('saving')
+        save_started = time.perf_counter()
+        complete_task(file_id, task_id)
+        save_seconds += time.perf_counter() - save_started
+
+        # 섹션 저장 시간 합계를 saving 단계로 기록
+        metrics.ANALYSIS_STAGE_SECONDS.labels('saving').observe(save_seconds)
+        metrics.ANALYSIS_ROWS.inc(rows)
+        metrics.ANALYSIS_THROUGHPUT.observe(rows / max(time.perf_counter() - started, 1e-9))
+        metrics.ANALYSIS_TASKS.labels('completed').inc()
+
         return {
             'status': 'success',
             'file_id': file_id,
-            'task_id': 'direct_process'  # Celery 없이 직접 처리된 경우
+            'task_id': task_id
         }
-        
+
     except Exception as e:
         # 오류 발생 시 상태 업데이트
-        # update_task_status(self.request.id, 'failed', str(e))
-        
-        # 예외 다시 발생
-        raise
-
-def convert_to_serializable(obj):
-    """NumPy/Pandas 객체를 JSON 직렬화 가능한 형태로 변환"""
-    import numpy as np
-    import pandas as pd
-    
-    if isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list) or isinstance(obj, tuple):
-        return [convert_to_serializable(i) for i in obj]
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, pd.Series):
-        return obj.tolist()
-    elif isinstance(obj, pd.DataFrame):
-        return obj.to_dict()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    else:
-        return obj
\ No newline at end of file
+        # 실패 상태는 여기서 한 번만 기록하고 다시 던지지 않음 (job_executor의 on_error는
+        # 프로세스 종료처럼 이 블록까지 오지 못한 실패만 처리)
+        logger.error(f"분석 작업 {task_id} 실패: {str(e)}")
+        metrics.ANALYSIS_TASKS.labels('failed').inc()
+        update_task_status(task_id, 'failed', str(e))
+        return {
+            'status': 'failed',
+            'file_id': file_id,
+            'task_id': task_id,
+            'error': str(e)
+        }
+
+def save_provisional_results(processor, task_id):
+    """무작위 표본으로 요약 통계·상관관계·회귀분석 임시 결과를 계산해 저장
+
+    요약 통계는 추정 전체 행 수로 환산하고 비율·평균의 신뢰구간을, 상관계수와 회귀계수는
+    PROGRESSIVE_BOOTSTRAP회 부트스트랩 신뢰구간을 함께 저장한다. 섹션 위치는 정확한 결과와 같다.
+    표본 분석에 실패해도 정확한 분석은 계속 진행한다.
+    """
+    try:
+        sampler = HealthDataProcessor(processor.file_path)
+        if not sampler.load_sample(PROGRESSIVE_SAMPLE_ROWS, seed=BOOTSTRAP_SEED) or not sampler.preprocess():
+            logger.error("표본 추출 실패, 임시 결과 없이 분석")
+            return False
+        # 판별한 인코딩은 전체 분석에서 다시 판별하지 않도록 공유
+        processor.encoding = sampler.encoding
+        analyzer = DiabetesAnalyzer(sampler.get_diabetes_risk_factors(), bootstrap=PROGRESSIVE_BOOTSTRAP)
+        save_sections(task_id, {
+            'summary': analyzer.sample_summary_stats(sampler.estimated_rows),
+            'correlations': analyzer.correlation_analysis(),
+            'lifestyle_impact': analyzer.lifestyle_impact_analysis(),
+        }, version=SECTION_PROVISIONAL)
+        logger.info(f"임시 결과 저장: 표본 {len(sampler.df)}행 (전체 약 {sampler.estimated_rows}행)")
+        return True
+    except Exception as e:
+        logger.error(f"임시 결과 계산 오류: {str(e)}")
+        return False
+
+def stratified_analysis_task(file_id, by, bootstrap=None):
+    """그룹(예: 학년×성별)별 분석 작업
+
+    작업 상태는 바꾸지 않고 JSON으로 인코딩한 결과를 반환한다.
+    STREAMING_MIN_BYTES 이상인 파일은 전체 분석과 같이 스트리밍 모드로 그룹별 통계량만 누적하고
+    (부트스트랩 신뢰구간 없음), 그보다 작은 파일은 파싱 캐시의 전처리 결과로 계산한다.
+    bootstrap은 그룹별 부트스트랩 반복 수 (None이면 BOOTSTRAP_REPLICATES 설정값)
+    """
+    file_info = get_file_info(file_id)
+    if not file_info:
+        raise Exception("파일 정보를 찾을 수 없습니다.")
+    processor = HealthDataProcessor(file_info['path'])
+
+    if file_info['file_size'] >= STREAMING_MIN_BYTES:
+        analyzer = StratifiedStreamingAnalyzer.from_processor(processor, by, STREAMING_CHUNKSIZE)
+        replicates = BOOTSTRAP_REPLICATES if bootstrap is None else bootstrap
+        return dumpb(analyzer.stratified_analysis(replicates))
+
+    diabetes_data = load_diabetes_data(processor, file_info.get('content_hash'))
+    results = DiabetesAnalyzer(diabetes_data, bootstrap=bootstrap).stratified_analysis(by, executor=analysis_pool)
+    return dumpb(results)
+
+def load_diabetes_data(processor, content_hash=None, progress=None):
+    """전처리된 당뇨 관련 데이터셋 반환
+
+    같은 내용의 파일을 이미 전처리했다면 컬럼 캐시에서 읽고,
+    그렇지 않으면 CSV를 파싱/전처리한 뒤 결과를 캐시에 저장한다.
+    progress(ProgressReporter)가 주어지면 loading/preprocessing 단계를 기록한다.
+    """
+    if progress is not None:
+        progress.stage('loading')
+    if content_hash is None:
+        content_hash = file_sha256(processor.file_path)
+    cache_key = parsed_cache.key(content_hash, PROCESSOR_VERSION)
+
+    cached = parsed_cache.load(cache_key)
+    if cached is not None:
+        logger.info(f"파싱 캐시 사용: {cache_key}")
+        processor.df = cached.df
+        return cached.get_diabetes_risk_factors()
+
+    # 1. 데이터 전처리
+    with metrics.ANALYSIS_STAGE_SECONDS.labels('loading').time():
+        loaded = processor.load_data()
+    if not loaded:
+        raise Exception("데이터 전처리 중 오류가 발생했습니다.")
+    if progress is not None:
+        progress.rows_processed = progress.rows_total = len(processor.df)
+        progress.stage('preprocessing')
+    with metrics.ANALYSIS_STAGE_SECONDS.labels('preprocessing').time():
+        if not processor.preprocess():
+            raise Exception("데이터 전처리 중 오류가 발생했습니다.")
+
+        # 2. 당뇨 관련 데이터 추출
+        diabetes_data = processor.get_diabetes_risk_factors()
+    parsed_cache.store(cache_key, processor.df, diabetes_data.columns)
+    return diabetes_data
@@ -0,0 +1,91 @@
+"""lifestyle_impact_analysis 회귀분석 엔진 벤치마크
+
+app.analysis.ols.fit_ols(QR), SufficientStats.ols(정규방정식)의 결과가
+statsmodels OLS와 허용오차(기본 1e-8) 이내로 같은지 확인하고 적합 시간을 비교한다.
+statsmodels import 시간은 새 프로세스에서 따로 측정한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.bench_ols --rows 200 2000 20000 200000
+"""
+import argparse
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from app.analysis.diabetes_analyzer import REGRESSION_COLUMNS
+from app.analysis.ols import fit_ols
+from app.analysis.sufficient_stats import SufficientStats
+
+FIELDS = ['params', 'bse', 'pvalues', 'rsquared', 'rsquared_adj', 'fvalue', 'f_pvalue']
+
+
+def make_frame(rows, seed=0):
+    """설문 응답과 비슷한 0~6 척도/0~1 변수와 혈당치"""
+    rng = np.random.default_rng(seed)
+    features = [col for col in REGRESSION_COLUMNS if col != '혈당치_mgdL']
+    df = pd.DataFrame({
+        col: rng.integers(0, 2 if '운동' in col or '시청' in col or '게임' in col else 7, rows).astype(np.float64)
+        for col in features
+    })
+    df['혈당치_mgdL'] = 90 + df.to_numpy() @ rng.normal(0, 0.5, len(features)) + rng.normal(0, 15, rows)
+    return df, features
+
+
+def max_rel_diff(expected, actual):
+    expected = np.atleast_1d(np.asarray(expected, dtype=np.float64))
+    actual = np.atleast_1d(np.asarray(actual, dtype=np.float64))
+    scale = np.maximum(np.abs(expected), 1e-300)
+    return float(np.max(np.abs(expected - actual) / np.maximum(scale, 1.0)))
+
+
+def compare(expected, actual):
+    return max(max_rel_diff(getattr(expected, f), getattr(actual, f)) for f in FIELDS)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def statsmodels_import_seconds():
+    code = "import time; t = time.perf_counter(); import statsmodels.api; print(time.perf_counter() - t)"
+    return float(subprocess.check_output([sys.executable, '-c', code]).decode().strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[200, 2000, 20000, 200000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--tol', type=float, default=1e-8)
+    args = parser.parse_args()
+
+    print(f"statsmodels import: {statsmodels_import_seconds():.3f}s")
+    import statsmodels.api as sm
+
+    print(f"{'rows':>9} {'statsmodels(ms)':>16} {'qr(ms)':>8} {'gram(ms)':>9} {'qr diff':>9} {'gram diff':>10}")
+    for rows in args.rows:
+        df, features = make_frame(rows)
+        X, y = df[features], df['혈당치_mgdL']
+        columns = features + ['혈당치_mgdL']
+
+        sm_time, expected = best_of(lambda: sm.OLS(y, sm.add_constant(X)).fit(), args.repeat)
+        qr_time, qr_result = best_of(lambda: fit_ols(X, y), args.repeat)
+        gram_time, gram_result = best_of(
+            lambda: SufficientStats.from_frame(df, columns).ols('혈당치_mgdL', features), args.repeat
+        )
+        qr_diff = compare(expected, qr_result)
+        gram_diff = compare(expected, gram_result)
+        print(f"{rows:>9,} {sm_time * 1e3:>16.3f} {qr_time * 1e3:>8.3f} {gram_time * 1e3:>9.3f}"
+              f" {qr_diff:>9.1e} {gram_diff:>10.1e}")
+        if max(qr_diff, gram_diff) > args.tol:
+            raise SystemExit(f"statsmodels와 결과 불일치 (허용오차 {args.tol})")
+
+
+if __name__ == '__main__':
+    main()
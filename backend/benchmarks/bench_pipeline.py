@@ -0,0 +1,253 @@
+"""업로드→분석 파이프라인 단계별 벤치마크
+
+benchmarks.synthetic_data로 만든 cp949 합성 파일(기본 1만/10만/100만/1000만 행)에 대해
+워커와 같은 순서로 각 단계를 실행하고 단계별 시간과 최대 메모리 사용량(peak RSS)을 측정한다.
+
+    detect_encoding → read_csv → preprocess → get_diabetes_risk_factors →
+    get_summary_stats → correlation_analysis → lifestyle_impact_analysis →
+    weighted_analysis → quantile_sketches → cube_analysis → serialize → save_analysis_results
+
+크기마다 새 프로세스에서 실행하므로 peak RSS는 해당 크기만의 값이다.
+--baseline으로 저장된 결과와 비교해 허용 범위를 넘게 느려지거나 메모리가 늘어난 단계가 있으면
+종료 코드 1로 끝난다. 기준값은 측정한 머신에 따라 다르므로 같은 환경에서 --save-baseline으로 다시 기록한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.bench_pipeline --sizes 10k 100k 1m --baseline benchmarks/baseline_pipeline.json
+    python -m benchmarks.bench_pipeline --sizes 10k 100k 1m 10m --save-baseline benchmarks/baseline_pipeline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_data import write_survey_csv
+
+DEFAULT_SIZES = ['10k', '100k', '1m', '10m']
+
+STAGES = [
+    'detect_encoding', 'read_csv', 'preprocess', 'get_diabetes_risk_factors',
+    'get_summary_stats', 'correlation_analysis', 'lifestyle_impact_analysis',
+    'weighted_analysis', 'quantile_sketches', 'cube_analysis', 'serialize', 'save_analysis_results',
+]
+
+
+def parse_size(value):
+    """'10k', '1m', '2500' 형식의 행 수"""
+    units = {'k': 1_000, 'm': 1_000_000}
+    value = value.strip().lower()
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def peak_rss_mb():
+    # Linux의 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_pipeline(path):
+    """한 파일에 대해 단계별 시간(초)과 단계 종료 시점의 peak RSS(MB)를 측정 (자식 프로세스에서 실행)"""
+    os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app.db import crud
+    from app.analysis.diabetes_analyzer import DiabetesAnalyzer
+    from app.preprocessing.health_data_processor import HealthDataProcessor
+    from app.services.serialization import dumpb
+    crud.initialize_db()
+
+    timings = {}
+    rss = {}
+
+    def timed(stage, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[stage] = time.perf_counter() - started
+        rss[stage] = peak_rss_mb()
+        return result
+
+    baseline_rss = peak_rss_mb()
+    processor = HealthDataProcessor(path)
+    timed('detect_encoding', processor.encoding_candidates)
+    if not timed('read_csv', processor.load_data):
+        raise RuntimeError(f"파일을 읽을 수 없습니다: {path}")
+    timed('preprocess', processor.preprocess)
+    data = timed('get_diabetes_risk_factors', processor.get_diabetes_risk_factors)
+
+    analyzer = DiabetesAnalyzer(data)
+    results = {
+        'summary': timed('get_summary_stats', analyzer.get_summary_stats),
+        'correlations': timed('correlation_analysis', analyzer.correlation_analysis),
+        'lifestyle_impact': timed('lifestyle_impact_analysis', analyzer.lifestyle_impact_analysis),
+        'weighted': timed('weighted_analysis', analyzer.weighted_analysis),
+        'sketches': timed('quantile_sketches', analyzer.quantile_sketches),
+        'cube': timed('cube_analysis', analyzer.cube_analysis),
+    }
+    encoded = timed('serialize', lambda: dumpb(results))
+    timed('save_analysis_results', lambda: crud.save_analysis_results('bench', 'bench', results))
+
+    return {
+        'rows': len(data),
+        'file_bytes': os.path.getsize(path),
+        'result_bytes': len(encoded),
+        'timings': timings,
+        'stage_peak_rss_mb': rss,
+        'start_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure(path, repeat, memory_limit_mb=None):
+    """새 프로세스에서 repeat번 실행해 단계별 최소 시간과 최소 peak RSS를 반환
+
+    자식 프로세스가 실패하면(예: 메모리 부족) {'error': 메시지}를 반환한다.
+    """
+    command = [sys.executable, '-m', 'benchmarks.bench_pipeline', '--run-one', path]
+    if memory_limit_mb:
+        command += ['--memory-limit-mb', str(memory_limit_mb)]
+
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            error = lines[-1] if lines else f"종료 코드 {completed.returncode}"
+            # load_data()는 예외를 [DEBUG] 출력으로만 남기므로 원인을 함께 기록
+            causes = [line for line in completed.stdout.splitlines() if '오류' in line]
+            if causes:
+                error += f" ({causes[-1]})"
+            return {'error': error}
+        # 전처리기의 [DEBUG] 출력 뒤 마지막 줄이 결과 JSON
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    result = runs[0]
+    result['timings'] = {stage: min(run['timings'][stage] for run in runs) for stage in STAGES}
+    result['peak_rss_mb'] = min(run['peak_rss_mb'] for run in runs)
+    result['stage_peak_rss_mb'] = {
+        stage: min(run['stage_peak_rss_mb'][stage] for run in runs) for stage in STAGES
+    }
+    return result
+
+
+def environment():
+    import numpy
+    import pandas
+    return {
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, time_tolerance, min_delta, rss_tolerance):
+    """기준값보다 느려지거나 메모리가 늘어난 항목 목록"""
+    regressions = []
+    for size, result in results.items():
+        base = baseline['results'].get(size)
+        if base is None or 'error' in base:
+            continue
+        if 'error' in result:
+            regressions.append(f"{size}: 실행 실패 ({result['error']})")
+            continue
+        for stage in STAGES:
+            now, before = result['timings'][stage], base['timings'].get(stage)
+            if before is None:
+                continue
+            if now > before * (1 + time_tolerance) and now - before > min_delta:
+                regressions.append(f"{size} {stage}: {before * 1e3:.1f}ms -> {now * 1e3:.1f}ms ({now / before:.2f}x)")
+        now, before = result['peak_rss_mb'], base['peak_rss_mb']
+        if now > before * (1 + rss_tolerance):
+            regressions.append(f"{size} peak RSS: {before:.0f}MB -> {now:.0f}MB ({now / before:.2f}x)")
+    return regressions
+
+
+def print_results(results, baseline):
+    sizes = [size for size, result in results.items() if 'error' not in result]
+    print(f"{'stage':>26}" + ''.join(f"{size:>15}" for size in sizes) + "   (ms)")
+    for stage in STAGES + ['total']:
+        cells = []
+        for size in sizes:
+            timings = results[size]['timings']
+            value = sum(timings.values()) if stage == 'total' else timings[stage]
+            cell = f"{value * 1e3:.1f}"
+            base = baseline and baseline['results'].get(size)
+            if base and 'error' not in base:
+                before = sum(base['timings'].values()) if stage == 'total' else base['timings'].get(stage)
+                if before:
+                    cell += f" {value / before:.2f}x"
+            cells.append(f"{cell:>15}")
+        print(f"{stage:>26}" + ''.join(cells))
+    print(f"{'peak RSS (MB)':>26}" + ''.join(f"{results[size]['peak_rss_mb']:>15.0f}" for size in sizes))
+    print(f"{'file (MB)':>26}" + ''.join(f"{results[size]['file_bytes'] / 2**20:>15.1f}" for size in sizes))
+    for size, result in results.items():
+        if 'error' in result:
+            print(f"{size}: 실행 실패 ({result['error']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='행 수 (예: 10k 1m 2500)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='크기별 실행 횟수 (최소값 사용)')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'diabetes-bench'),
+                        help='합성 파일 보관 디렉토리 (이미 있으면 재사용)')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON')
+    parser.add_argument('--save-baseline', help='이번 결과를 기준 결과로 저장할 경로')
+    parser.add_argument('--output', help='이번 결과를 저장할 JSON 경로')
+    parser.add_argument('--time-tolerance', type=float, default=0.25, help='허용하는 단계별 시간 증가 비율')
+    parser.add_argument('--min-delta', type=float, default=0.01, help='이보다 작은 시간 증가(초)는 무시')
+    parser.add_argument('--rss-tolerance', type=float, default=0.15, help='허용하는 peak RSS 증가 비율')
+    parser.add_argument('--memory-limit-mb', type=int,
+                        help='측정 프로세스의 주소 공간 제한 (초과 시 OOM 대신 MemoryError로 해당 크기만 실패)')
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        if args.memory_limit_mb:
+            limit = args.memory_limit_mb * 2**20
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        print(json.dumps(run_pipeline(args.run_one)))
+        return
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != environment():
+            print(f"주의: 기준 결과와 실행 환경이 다릅니다 ({baseline.get('environment')})")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {}
+    for size in args.sizes:
+        rows = parse_size(size)
+        path = os.path.join(args.data_dir, f"survey_{rows}_s{args.seed}.csv")
+        if not os.path.exists(path):
+            started = time.perf_counter()
+            write_survey_csv(path, rows, args.seed)
+            print(f"{size}: 합성 파일 생성 {time.perf_counter() - started:.1f}s ({path})")
+        results[size] = measure(path, args.repeat, args.memory_limit_mb)
+
+    print_results(results, baseline)
+
+    report = {'environment': environment(), 'seed': args.seed, 'results': results}
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.time_tolerance, args.min_delta, args.rss_tolerance)
+        for regression in regressions:
+            print(f"  회귀: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("기준 결과 대비 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
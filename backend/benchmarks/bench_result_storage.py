@@ -0,0 +1,112 @@
+"""분석 결과 저장 형식 벤치마크
+
+이전 형식(결과 전체를 json.dumps 한 문자열 하나)과 섹션별 압축 형식(app.db.crud.encode_section)의
+저장 크기, 조회 시 디코딩 시간, N개 결과를 저장한 테이블 크기를 비교한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.bench_result_storage --rows 100000 --tasks 1000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+# 임시 DB를 사용하도록 app.db.crud를 불러오기 전에 설정
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "sections.db")
+
+from app.db import crud
+from app.analysis.diabetes_analyzer import DiabetesAnalyzer
+from app.preprocessing.health_data_processor import HealthDataProcessor
+from app.services.serialization import dumps
+from benchmarks.bench_ols import make_frame
+
+
+def make_results(rows):
+    df, _ = make_frame(rows)
+    rng = np.random.default_rng(1)
+    df['허리둘레_cm'] = rng.normal(70, 8, rows)
+    HealthDataProcessor.add_derived_columns(df)
+    analyzer = DiabetesAnalyzer(df)
+    # 이전 형식과 비교할 수 있도록 표준 Python 타입으로 변환
+    return json.loads(dumps({
+        'summary': analyzer.get_summary_stats(),
+        'correlations': analyzer.correlation_analysis(),
+        'lifestyle_impact': analyzer.lifestyle_impact_analysis()
+    }))
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def legacy_db_size(results_json, tasks):
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE analysis_results (id TEXT PRIMARY KEY, task_id TEXT, results TEXT)")
+    conn.executemany(
+        "INSERT INTO analysis_results VALUES (?, ?, ?)",
+        [(f"r{i}", f"t{i}", results_json) for i in range(tasks)]
+    )
+    conn.commit()
+    size = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'analysis_results'").fetchone()[0]
+    conn.close()
+    return size
+
+
+def sections_db_size(results, tasks):
+    with crud.transaction() as conn:
+        for i in range(tasks):
+            crud._insert_sections(conn, f"t{i}", results)
+    with crud.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'analysis_sections'").fetchone()[0]
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    results = make_results(args.rows)
+    legacy = json.dumps(results)
+    encoded = {name: crud.encode_section(value) for name, value in results.items()}
+
+    print("저장 크기 (bytes)")
+    print(f"  이전 형식 JSON 문자열: {len(legacy.encode('utf-8')):>8,}")
+    for name, data in encoded.items():
+        plain = len(json.dumps(results[name]).encode('utf-8'))
+        print(f"  {name:<20} {plain:>8,} -> {len(data):>7,}")
+    print(f"  섹션 합계:             {sum(len(d) for d in encoded.values()):>8,}")
+
+    legacy_full = best_of(lambda: json.loads(legacy), args.repeat)
+    sections_full = best_of(
+        lambda: {name: json.loads(crud.decode_section(data)) for name, data in encoded.items()}, args.repeat
+    )
+    summary_only = best_of(lambda: json.loads(crud.decode_section(encoded['summary'])), args.repeat)
+    text_only = best_of(lambda: [crud.decode_section(data) for data in encoded.values()], args.repeat)
+
+    print("디코딩 시간 (us)")
+    print(f"  이전 형식 전체 json.loads:      {legacy_full * 1e6:>8.1f}")
+    print(f"  섹션 전체 압축 해제 + 파싱:     {sections_full * 1e6:>8.1f}")
+    print(f"  summary 섹션만:                 {summary_only * 1e6:>8.1f}")
+    print(f"  전체 압축 해제만 (응답 본문용): {text_only * 1e6:>8.1f}")
+
+    print(f"테이블 크기 ({args.tasks:,}개 결과, bytes)")
+    print(f"  이전 형식 analysis_results: {legacy_db_size(legacy, args.tasks):>10,}")
+    print(f"  analysis_sections:          {sections_db_size(results, args.tasks):>10,}")
+
+
+if __name__ == '__main__':
+    main()
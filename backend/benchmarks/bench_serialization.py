@@ -0,0 +1,116 @@
+"""분석 결과 JSON 직렬화 벤치마크
+
+50×50 상관행렬을 포함한 결과를 기존 방식(convert_to_serializable로 복사본 생성 →
+직렬화 테스트용 json.dumps → 저장용 json.dumps)과 app.services.serialization.dumpb
+한 번으로 인코딩하는 시간을 비교하고, 두 결과가 같은 값을 나타내는지 확인한다.
+NaN이 없는 경우(C 인코더 경로)와 있는 경우(null 변환 경로)를 모두 측정한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.bench_serialization --size 50
+"""
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.serialization import dumpb
+
+
+def convert_to_serializable(obj):
+    """기존 구현 (uploads.py/analysis.py/worker.py에 복사되어 있던 함수)"""
+    if isinstance(obj, dict):
+        return {k: convert_to_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list) or isinstance(obj, tuple):
+        return [convert_to_serializable(i) for i in obj]
+    elif isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, pd.Series):
+        return obj.tolist()
+    elif isinstance(obj, pd.DataFrame):
+        return obj.to_dict()
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
+    else:
+        return obj
+
+
+def legacy_encode(results):
+    converted = convert_to_serializable(results)
+    json.dumps(converted)  # 직렬화 테스트
+    return json.dumps(converted).encode('utf-8')  # 저장
+
+
+def make_results(size, with_nan, seed=0):
+    """correlation_analysis()와 같은 형태의 결과 (size개 변수)"""
+    rng = np.random.default_rng(seed)
+    names = [f"생활습관변수_{i:02d}" for i in range(size)]
+    df = pd.DataFrame(rng.normal(size=(1000, size)), columns=names)
+    if with_nan:
+        df[names[-1]] = 1.0  # 상수 변수는 상관계수가 NaN
+    corr = df.corr().round(3)
+    glucose = corr[names[0]].sort_values(ascending=False)
+    return {
+        'summary': {
+            'total_students': np.int64(1000),
+            'blood_glucose': {'mean': np.float64(95.1), 'std': np.float64(np.nan if with_nan else 12.3)},
+        },
+        'correlations': {
+            'correlation_matrix': corr.to_dict(),
+            'glucose_correlation': glucose.to_dict(),
+        },
+        'lifestyle_impact': {
+            'coefficients': {
+                name: {'coefficient': np.float64(v), 'p_value': np.float64(abs(v) / 10), 'significant': np.bool_(abs(v) > 1)}
+                for name, v in zip(names, rng.normal(size=size))
+            }
+        },
+    }
+
+
+def nan_to_none(obj):
+    if isinstance(obj, dict):
+        return {k: nan_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [nan_to_none(v) for v in obj]
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'payload':>10} {'bytes':>8} {'legacy(ms)':>11} {'dumpb(ms)':>10} {'speedup':>8}  same")
+    for with_nan in (False, True):
+        results = make_results(args.size, with_nan)
+        legacy_time, legacy = best_of(lambda: legacy_encode(results), args.repeat)
+        new_time, encoded = best_of(lambda: dumpb(results), args.repeat)
+        same = json.loads(encoded) == nan_to_none(json.loads(legacy))
+        label = 'with NaN' if with_nan else 'finite'
+        print(f"{label:>10} {len(encoded):>8,} {legacy_time * 1e3:>11.3f} {new_time * 1e3:>10.3f}"
+              f" {legacy_time / new_time:>7.1f}x  {same}")
+        if not same:
+            raise SystemExit("인코딩 결과 불일치")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""DiabetesAnalyzer.get_summary_stats 벤치마크
+
+기존 pandas 구현(혈당수준 3회 비교, BMI 8회 마스킹, 혈당치 통계량 5회 순회)과
+app.analysis.kernels 기반 구현의 결과가 같은지 확인하고 실행 시간을 비교한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.bench_summary_stats --rows 1000000 10000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from app.analysis.diabetes_analyzer import DiabetesAnalyzer
+from app.preprocessing.health_data_processor import GLUCOSE_BINS, GLUCOSE_LABELS
+
+
+def reference_summary_stats(df):
+    """기존 pandas 구현"""
+    summary = {'total_students': len(df)}
+    summary['diabetes_risk'] = {
+        'normal': (df['혈당수준'] == '정상').sum(),
+        'prediabetes': (df['혈당수준'] == '전당뇨').sum(),
+        'diabetes': (df['혈당수준'] == '당뇨의심').sum()
+    }
+    summary['blood_glucose'] = {
+        'mean': df['혈당치_mgdL'].mean(),
+        'median': df['혈당치_mgdL'].median(),
+        'std': df['혈당치_mgdL'].std(),
+        'min': df['혈당치_mgdL'].min(),
+        'max': df['혈당치_mgdL'].max()
+    }
+    summary['bmi'] = {
+        'mean': df['BMI'].mean(),
+        'underweight': (df['BMI'] < 18.5).sum(),
+        'normal': ((df['BMI'] >= 18.5) & (df['BMI'] < 23)).sum(),
+        'overweight': ((df['BMI'] >= 23) & (df['BMI'] < 25)).sum(),
+        'obese': (df['BMI'] >= 25).sum()
+    }
+    return summary
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    height = rng.normal(160, 10, rows)
+    weight = rng.normal(55, 12, rows)
+    bmi = weight / (height / 100) ** 2
+    bmi[rng.random(rows) < 0.01] = np.nan
+    glucose = np.round(rng.normal(95, 15, rows))
+    df = pd.DataFrame({'BMI': bmi, '혈당치_mgdL': glucose})
+    df['혈당수준'] = pd.cut(df['혈당치_mgdL'], bins=GLUCOSE_BINS, labels=GLUCOSE_LABELS)
+    return df
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'pandas(s)':>10} {'kernel(s)':>10} {'speedup':>8}  identical")
+    for rows in args.rows:
+        df = make_frame(rows)
+        analyzer = DiabetesAnalyzer(df)
+        ref_time, expected = best_of(lambda: reference_summary_stats(df), args.repeat)
+        new_time, actual = best_of(analyzer.get_summary_stats, args.repeat)
+        identical = expected == actual
+        print(f"{rows:>12,} {ref_time:>10.3f} {new_time:>10.3f} {ref_time / new_time:>7.1f}x  {identical}")
+        if not identical:
+            raise SystemExit(f"결과 불일치: {expected} != {actual}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""app.db.crud 동시성 스트레스 테스트
+
+gunicorn 워커처럼 여러 프로세스가, 각 프로세스 안에서는 여러 스레드가 같은 SQLite 파일에
+업로드 흐름(파일/작업 레코드 생성 → processing → 결과 저장 및 완료 → 결과 조회 반복)을 실행한다.
+'database is locked' 등 오류 수와 연산별 지연 시간, 전체 처리량을 출력하며
+오류가 하나라도 있으면 종료 코드 1로 끝난다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.stress_db --processes 4 --threads 8 --iterations 50
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+
+def make_results(size):
+    """size개 변수의 상관행렬 크기와 비슷한 분석 결과"""
+    names = [f"변수{i}" for i in range(size)]
+    return {
+        'summary': {'total_students': 1000},
+        'correlations': {'correlation_matrix': {a: {b: 0.123 for b in names} for a in names}},
+    }
+
+
+def run_worker(db_path, threads, iterations, results_size, reads, queue):
+    os.environ["DB_PATH"] = db_path
+    from app.db import crud
+
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    results = make_results(results_size)
+
+    def timed(name, fn, *args):
+        started = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            with lock:
+                errors[f"{name}: {e}"] += 1
+            return False
+        elapsed = time.perf_counter() - started
+        with lock:
+            timings[name].append(elapsed)
+        return True
+
+    def flow():
+        for _ in range(iterations):
+            file_id = str(uuid.uuid4())
+            task_id = str(uuid.uuid4())
+            record = {
+                "id": file_id,
+                "filename": "stress.csv",
+                "path": f"/tmp/{file_id}.csv",
+                "user_id": 1,
+                "created_at": datetime.now(),
+                "file_size": 1024,
+                "content_hash": uuid.uuid4().hex,
+                "task_id": task_id,
+            }
+            if not timed("create_file", crud.create_file_record_if_new, record):
+                continue
+            timed("update_status", crud.update_task_status, task_id, "processing")
+            for _ in range(reads):
+                timed("read_status", crud.get_task_status, task_id)
+            timed("complete_task", crud.complete_task, file_id, task_id, results)
+            for _ in range(reads):
+                timed("read_results", crud.get_analysis_record, task_id)
+
+    workers = [threading.Thread(target=flow) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    queue.put((dict(timings), dict(errors)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--reads', type=int, default=3, help='상태/결과 조회(폴링) 반복 횟수')
+    parser.add_argument('--results-size', type=int, default=20, help='저장할 상관행렬 변수 개수')
+    parser.add_argument('--db', default=None, help='사용할 DB 파일 (기본: 임시 파일)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "stress.db")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    started = time.perf_counter()
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(db_path, args.threads, args.iterations, args.results_size, args.reads, queue)
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    outputs = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    for process_timings, process_errors in outputs:
+        for name, values in process_timings.items():
+            timings[name].extend(values)
+        for message, count in process_errors.items():
+            errors[message] += count
+
+    total = sum(len(values) for values in timings.values())
+    print(f"DB: {db_path}")
+    print(f"{args.processes} processes x {args.threads} threads x {args.iterations} iterations, {elapsed:.2f}s")
+    print(f"{'operation':>14} {'count':>7} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for name, values in timings.items():
+        values = np.array(values) * 1000
+        print(f"{name:>14} {len(values):>7} {np.percentile(values, 50):>9.2f}"
+              f" {np.percentile(values, 99):>9.2f} {values.max():>9.2f}")
+    print(f"throughput: {total / elapsed:.0f} ops/s, errors: {sum(errors.values())}")
+    for message, count in sorted(errors.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {count:>5}  {message}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""벤치마크용 합성 학생 건강검사 CSV 생성
+
+실제 조사 파일과 같은 한글 컬럼 구성과 cp949 인코딩으로 파일을 만든다.
+행은 CHUNK_ROWS 단위로 만들고 청크마다 (seed, 청크 번호)로 난수 생성기를 정하므로
+같은 (rows, seed)에 대해 항상 같은 파일이 생성되며, 메모리 사용량은 청크 크기에 비례한다.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.synthetic_data --rows 1000000 --output /tmp/survey_1m.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# 한 번에 생성해 쓰는 행 수
+CHUNK_ROWS = 250_000
+
+# 생활습관 변수 (1-5 척도 / 0 또는 1)
+FOOD_COLUMNS = ['라면', '음료수', '패스트푸드', '우유유제품', '과일']
+ACTIVITY_COLUMNS = ['주3회이상운동', '하루30분이상운동', 'TV시청2시간이상', '게임2시간이상']
+
+# 분석에 쓰지 않지만 실제 파일에 있는 컬럼 (파싱 비용 재현용)
+REGIONS = ['서울', '부산', '대구', '인천', '광주', '대전', '울산', '세종', '경기', '강원',
+           '충북', '충남', '전북', '전남', '경북', '경남', '제주']
+SCHOOL_TYPES = ['초등학교', '중학교', '고등학교']
+
+
+def make_chunk(rows, seed, index, start):
+    """index번째 청크 (start번째 행부터 rows개)"""
+    rng = np.random.default_rng([seed, index])
+    grade = rng.integers(1, 7, rows)
+    height = rng.normal(125 + 5 * grade, 8)
+    weight = rng.normal(20 + 5 * grade, 7).clip(12)
+    bmi = weight / (height / 100) ** 2
+
+    df = pd.DataFrame({
+        '학년도': 2023,
+        'ID': np.arange(start, start + rows),
+        '시도': rng.choice(REGIONS, rows),
+        '학교급': rng.choice(SCHOOL_TYPES, rows, p=[0.5, 0.25, 0.25]),
+        '최종가중치': rng.uniform(20, 400, rows).round(4),
+        '학년': grade,
+        '성별': rng.choice(['남', '여'], rows),
+        '키_cm': height.round(1),
+        '몸무게_kg': weight.round(1),
+        '비만여부': np.select([bmi < 18.5, bmi < 23, bmi < 25], ['저체중', '정상', '과체중'], '비만'),
+        '허리둘레_cm': rng.normal(50 + 1.2 * bmi, 5).round(1),
+        '수축기혈압': rng.normal(110, 10, rows).round(0),
+        '이완기혈압': rng.normal(70, 8, rows).round(0),
+        '총콜레스테롤': rng.normal(160, 25, rows).round(0),
+    })
+    for col in FOOD_COLUMNS:
+        df[col] = rng.integers(1, 6, rows)
+    for col in ACTIVITY_COLUMNS:
+        df[col] = rng.integers(0, 2, rows)
+
+    glucose = (
+        80 + 0.8 * bmi + 2 * df['패스트푸드'] + 1.5 * df['음료수']
+        - 3 * df['주3회이상운동'] + rng.normal(0, 10, rows)
+    ).round(0)
+    df['혈당치_mgdL'] = glucose
+
+    # 실제 파일처럼 일부 측정값 결측
+    df.loc[rng.random(rows) < 0.01, '혈당치_mgdL'] = np.nan
+    df.loc[rng.random(rows) < 0.02, '허리둘레_cm'] = np.nan
+    df.loc[rng.random(rows) < 0.005, '몸무게_kg'] = np.nan
+    return df
+
+
+def write_survey_csv(path, rows, seed=0, encoding='cp949'):
+    """rows행짜리 합성 조사 파일을 path에 생성 (같은 인자면 같은 파일)"""
+    tmp_path = path + '.part'
+    with open(tmp_path, 'w', encoding=encoding, newline='') as f:
+        for index, start in enumerate(range(0, rows, CHUNK_ROWS)):
+            chunk = make_chunk(min(CHUNK_ROWS, rows - start), seed, index, start)
+            chunk.to_csv(f, index=False, header=index == 0)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--encoding', default='cp949')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    write_survey_csv(args.output, args.rows, args.seed, args.encoding)
+    print(f"{args.output}: {args.rows:,} 행, {os.path.getsize(args.output):,} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# gunicorn 설정 (Procfile에서 사용)
+# 워커와 분석 프로세스의 Prometheus 지표를 한 디렉토리에 모아 /api/metrics에서 합산한다.
+import os
+import glob
+import shutil
+import tempfile
+
+# on_starting에서 임시로 만든 지표 디렉토리 (종료 시 삭제)
+_created_dir = None
+
+
+def on_starting(server):
+    """마스터 시작 시 지표 디렉토리 준비 (이전 실행의 값은 삭제)"""
+    global _created_dir
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        path = _created_dir = tempfile.mkdtemp(prefix="prometheus-multiproc-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+    server.log.info(f"Prometheus 지표 디렉토리: {path}")
+
+
+def child_exit(server, worker):
+    """종료된 워커의 실행/대기 작업 수 게이지를 합산에서 제외하고 워커가 제출한 작업을 실패로 처리"""
+    from app.services.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+
+    from app.db.crud import fail_stale_tasks, process_owner, close_db_connection
+    try:
+        count = fail_stale_tasks("분석 작업을 제출한 워커가 종료되었습니다. 파일을 다시 업로드해주세요.",
+                                 owner=process_owner(worker.pid))
+        if count:
+            server.log.warning(f"워커 {worker.pid}의 분석 작업 {count}개를 실패로 처리")
+    except Exception as e:
+        server.log.error(f"워커 {worker.pid}의 작업 정리 실패: {e}")
+    finally:
+        # 마스터는 이후 워커를 fork하므로 연결을 남겨 두지 않음
+        close_db_connection()
+
+
+def on_exit(server):
+    if _created_dir:
+        shutil.rmtree(_created_dir, ignore_errors=True)
@@ -0,0 +1,34 @@
+"""테스트 공통 설정
+
+app 모듈은 import 시점에 환경 변수로 DB/업로드 경로를 정하므로, 저장소의 data/database.db와
+uploads 디렉토리를 건드리지 않도록 어떤 app 모듈보다 먼저 임시 경로를 지정한다.
+"""
+import os
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="health-tests-")
+os.environ["DB_PATH"] = os.path.join(_TMP_DIR, "test.db")
+os.environ["UPLOAD_DIR"] = os.path.join(_TMP_DIR, "uploads")
+os.environ["PARSED_CACHE_DIR"] = os.path.join(_TMP_DIR, "cache")
+
+# 합성 조사 파일 크기 (청크 여러 개와 결측치가 모두 포함되는 크기)
+SURVEY_ROWS = 20_000
+
+
+@pytest.fixture(scope="session")
+def survey_csv(tmp_path_factory):
+    """benchmarks.synthetic_data로 만든 cp949 합성 조사 파일 (가중치·결측치 포함)"""
+    from benchmarks.synthetic_data import write_survey_csv
+    path = tmp_path_factory.mktemp("data") / "survey.csv"
+    return write_survey_csv(str(path), SURVEY_ROWS, seed=0)
+
+
+@pytest.fixture(scope="session")
+def diabetes_data(survey_csv):
+    """메모리 모드 전처리 결과 (DiabetesAnalyzer 입력)"""
+    from app.preprocessing.health_data_processor import HealthDataProcessor
+    processor = HealthDataProcessor(survey_csv)
+    processor.preprocess()
+    return processor.get_diabetes_risk_factors()
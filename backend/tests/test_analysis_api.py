@@ -0,0 +1,128 @@
+"""분석 결과 API가 저장된 섹션 상태(오류 메시지만 저장된 섹션 등)에 맞는 응답을 하는지 확인"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analysis.accumulators import QuantileSketch
+from app.analysis.diabetes_analyzer import sketch_result
+from app.api.endpoints import analysis
+from app.db.crud import create_file_record, save_section, complete_task
+from app.main import app
+from app.services.auth_service import get_current_user
+
+# 느린 DB 조회(연결 풀 대기 등)를 흉내 내는 시간 (초)
+SLOW_LOOKUP = 0.5
+
+
+@pytest.fixture(scope="module")
+def client():
+    app.dependency_overrides[get_current_user] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def completed_task(sections):
+    """sections({섹션 이름: 값})를 저장한 완료 작업의 ID"""
+    file_id = uuid.uuid4().hex
+    task_id = "task_" + file_id
+    create_file_record({
+        "id": file_id, "filename": "survey.csv", "path": "/dev/null", "user_id": 1,
+        "created_at": datetime.now(), "file_size": 0,
+    })
+    for position, (section, value) in enumerate(sections.items()):
+        save_section(task_id, section, position, value)
+    complete_task(file_id, task_id)
+    return task_id
+
+
+def test_failed_cube_section_is_not_found(client):
+    task_id = completed_task({"cube": {"message": "집계 큐브 생성 중 오류 발생"}})
+    response = client.get(f"/api/analysis/{task_id}/cube")
+    assert response.status_code == 404
+    assert "집계 큐브 생성 중 오류 발생" in response.json()["detail"]
+
+
+def test_failed_sketches_section_is_not_found(client):
+    task_id = completed_task({"sketches": {"message": "분위수 스케치 생성 중 오류 발생"}})
+    response = client.get(f"/api/analysis/{task_id}/quantiles")
+    assert response.status_code == 404
+    assert "분위수 스케치 생성 중 오류 발생" in response.json()["detail"]
+
+
+def test_quantiles_without_measures_is_not_found(client):
+    task_id = completed_task({"sketches": sketch_result({})})
+    assert client.get(f"/api/analysis/{task_id}/quantiles").status_code == 404
+
+
+def test_quantiles_report_rank_error_of_stored_k(client):
+    sketch = QuantileSketch(k=100)
+    sketch.update(np.arange(1000.0))
+    task_id = completed_task({"sketches": sketch_result({"bmi": sketch})})
+    body = client.get(f"/api/analysis/{task_id}/quantiles", params={"q": "0.5"}).json()["data"]
+    assert body["rank_error"] == QuantileSketch.rank_error(100)
+    assert body["measures"]["bmi"]["n"] == 1000
+
+
+@pytest.mark.parametrize("path", ["", "/cube", "/quantiles"])
+def test_result_lookup_does_not_block_loop(client, monkeypatch, path):
+    # 조회가 이벤트 루프에서 실행되면 그동안 health 요청이 끝나지 못함
+    def slow_record(*args):
+        time.sleep(SLOW_LOOKUP)
+        return None
+
+    monkeypatch.setattr(analysis, "get_analysis_record", slow_record)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            started = time.perf_counter()
+            lookup = asyncio.create_task(http.get(f"/api/analysis/task_missing{path}"))
+            # 조회가 시작된 뒤에 health 요청
+            await asyncio.sleep(SLOW_LOOKUP / 10)
+            health = await http.get("/api/health")
+            return time.perf_counter() - started, health, await lookup
+
+    elapsed, health, lookup = asyncio.run(run())
+    assert health.status_code == 200
+    assert lookup.status_code == 404
+    assert elapsed < SLOW_LOOKUP / 2
+
+
+def test_event_stream_polling_does_not_block_loop(client, monkeypatch):
+    # 스트림이 작업 상태를 읽는 동안에도 다른 요청은 바로 응답해야 함
+    polls = []
+
+    def slow_progress(task_id):
+        time.sleep(SLOW_LOOKUP)
+        polls.append(task_id)
+        return {
+            "status": "completed" if len(polls) > 2 else "processing", "stage": "summary", "error": None,
+            "rows_processed": None, "rows_total": None, "stage_started_at": None,
+            "sections": [], "section_versions": {},
+        }
+
+    monkeypatch.setattr(analysis, "get_task_progress", slow_progress)
+    monkeypatch.setattr(analysis, "EVENTS_POLL_INTERVAL", 0.01)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            stream = asyncio.create_task(http.get("/api/analysis/task_slow/events"))
+            # health 요청과 짧은 대기를 반복하며 한 번에 걸린 시간 (루프가 막히면 조회 시간만큼 늘어남)
+            rounds = []
+            while not stream.done():
+                started = time.perf_counter()
+                await http.get("/api/health")
+                await asyncio.sleep(SLOW_LOOKUP / 10)
+                rounds.append(time.perf_counter() - started)
+            return rounds, await stream
+
+    rounds, stream = asyncio.run(run())
+    assert b"event: completed" in stream.content
+    assert max(rounds) < SLOW_LOOKUP / 2
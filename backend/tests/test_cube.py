@@ -0,0 +1,86 @@
+"""집계 큐브 질의 결과가 원본 데이터의 pandas groupby와 같은지 확인"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analysis.cube import Cube, MISSING_LABEL
+from app.analysis.diabetes_analyzer import DiabetesAnalyzer
+from app.services.serialization import dumpb
+
+
+@pytest.fixture(scope='module')
+def frame(diabetes_data):
+    """큐브 차원을 pandas 컬럼으로 만든 데이터 (BMI구간은 cube와 같은 경계, BMI 결측은 결측 수준)
+
+    측정값은 큐브와 같이 float64로 누적하도록 변환한다 (pandas는 float32 컬럼을 float32로 합산).
+    """
+    df = diabetes_data.copy()
+    for col in ['혈당치_mgdL', '허리둘레_cm']:
+        df[col] = df[col].astype(np.float64)
+    df['BMI구간'] = pd.cut(
+        df['BMI'], [-np.inf, 18.5, 23, 25, np.inf], right=False, labels=['저체중', '정상', '과체중', '비만']
+    ).cat.add_categories(MISSING_LABEL).fillna(MISSING_LABEL)
+    return df
+
+
+@pytest.fixture(scope='module')
+def cube(diabetes_data):
+    # 저장/복원을 거친 큐브로 질의 (결과 API와 같은 경로)
+    return Cube.from_dict(json.loads(dumpb(DiabetesAnalyzer(diabetes_data, bootstrap=0).cube_analysis())))
+
+
+def expected_groups(df, by):
+    grouped = df.groupby(by, observed=True)
+    table = pd.DataFrame({
+        'count': grouped.size(),
+        'glucose_sum': grouped['혈당치_mgdL'].sum(),
+        'glucose_n': grouped['혈당치_mgdL'].count(),
+        'waist_sum': grouped['허리둘레_cm'].sum(),
+        'waist_n': grouped['허리둘레_cm'].count(),
+    })
+    return table[table['count'] > 0]
+
+
+@pytest.mark.parametrize('by, filters', [
+    (['성별'], {}),
+    (['성별', '학년'], {'혈당수준': ['전당뇨', '당뇨의심'], 'BMI구간': ['비만']}),
+    (['학년', '혈당수준'], {'주3회이상운동': ['1']}),
+    (['BMI구간', '성별', '주3회이상운동'], {'학년': ['1', '2', '3']}),
+])
+def test_query_matches_groupby(cube, frame, by, filters):
+    selected = frame
+    for name, levels in filters.items():
+        selected = selected[selected[name].astype(str).isin(levels)]
+    expected = expected_groups(selected, by)
+
+    groups = cube.query(by, filters)['groups']
+    assert len(groups) == len(expected)
+    for group in groups:
+        key = tuple(group['key'][name] for name in by)
+        row = expected.loc[key if len(key) > 1 else key[0]]
+        assert group['count'] == row['count']
+        assert group['blood_glucose']['n'] == row['glucose_n']
+        assert np.isclose(group['blood_glucose']['sum'], row['glucose_sum'], rtol=1e-12)
+        assert group['waist']['n'] == row['waist_n']
+        assert np.isclose(group['waist']['sum'], row['waist_sum'], rtol=1e-12)
+
+
+def test_query_without_groups_is_total(cube, frame):
+    (group,) = cube.query()['groups']
+    assert group['count'] == len(frame)
+    assert np.isclose(group['waist']['mean'], frame['허리둘레_cm'].mean(), rtol=1e-12)
+
+
+def test_missing_values_go_to_missing_level():
+    df = pd.DataFrame({'학년': [1, 2, np.nan], '성별': ['남', None, '여'], 'BMI': [20.0, np.nan, 30.0],
+                       '혈당치_mgdL': [90.0, 100.0, np.nan]})
+    groups = Cube.from_frame(df).query(['성별'])['groups']
+    assert {group['key']['성별']: group['count'] for group in groups} == {'남': 1, '여': 1, MISSING_LABEL: 1}
+
+
+@pytest.mark.parametrize('by, filters', [(['없는차원'], {}), (['성별', '성별'], {}), ([], {'성별': ['모름']})])
+def test_invalid_query_raises(cube, by, filters):
+    with pytest.raises(ValueError):
+        cube.query(by, filters)
@@ -0,0 +1,116 @@
+"""app.db.crud 동시 쓰기: 스레드/프로세스가 같은 DB에 작업과 섹션을 동시에 써도
+갱신이 사라지지 않고 'database is locked' 오류가 나지 않는지 확인"""
+import multiprocessing
+import threading
+import uuid
+from datetime import datetime
+
+from app.db import crud
+
+THREADS = 8
+ITERATIONS = 10
+PROCESSES = 3
+
+
+def new_task(prefix):
+    """파일/작업 레코드를 만들고 (file_id, task_id) 반환"""
+    file_id, task_id = f"{prefix}-file-{uuid.uuid4()}", f"{prefix}-task-{uuid.uuid4()}"
+    existing = crud.create_file_record_if_new({
+        "id": file_id,
+        "filename": "concurrency.csv",
+        "path": f"/tmp/{file_id}.csv",
+        "user_id": 1,
+        "created_at": datetime.now(),
+        "file_size": 1024,
+        "content_hash": uuid.uuid4().hex,
+        "task_id": task_id,
+    })
+    assert existing is None
+    return file_id, task_id
+
+
+def write_flows(prefix, shared_task, threads=THREADS, iterations=ITERATIONS):
+    """threads개 스레드가 각자 작업 iterations개를 끝까지 처리하면서 공유 작업에 섹션을 하나씩 추가
+
+    Returns:
+        (완료한 작업 id 목록, 공유 작업에 쓴 섹션 이름 목록, 오류 메시지 목록)
+    """
+    completed, sections, errors = [], [], []
+    lock = threading.Lock()
+
+    def flow(worker):
+        for i in range(iterations):
+            try:
+                file_id, task_id = new_task(prefix)
+                crud.update_task_status(task_id, "processing")
+                crud.update_task_progress(task_id, "summary", i, iterations)
+                crud.save_section(task_id, "summary", 0, {"worker": worker, "i": i})
+                crud.save_section(task_id, "correlations", 1, {"values": list(range(50))})
+                section = f"{prefix}-{worker}-{i}"
+                crud.save_section(shared_task, section, worker * iterations + i, {"i": i})
+                crud.complete_task(file_id, task_id)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+                continue
+            with lock:
+                completed.append(task_id)
+                sections.append(section)
+
+    workers = [threading.Thread(target=flow, args=(worker,)) for worker in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return completed, sections, errors
+
+
+def run_process(prefix, shared_task, queue):
+    """spawn된 프로세스에서 write_flows 실행 (DB_PATH는 부모 환경 변수를 그대로 사용)"""
+    try:
+        queue.put(write_flows(prefix, shared_task))
+    finally:
+        crud.close_db_connection()
+
+
+def assert_completed(task_ids):
+    for task_id in task_ids:
+        record = crud.get_analysis_record(task_id)
+        assert record["status"] == "completed"
+        assert [name for name, _ in record["sections"]] == ["summary", "correlations"]
+
+
+def test_concurrent_threads_keep_every_write():
+    _, shared_task = new_task("shared-threads")
+
+    completed, sections, errors = write_flows("threads", shared_task)
+
+    assert errors == []
+    assert len(completed) == THREADS * ITERATIONS
+    assert_completed(completed)
+    saved = crud.get_task_progress(shared_task)["sections"]
+    assert sorted(saved) == sorted(sections)
+
+
+def test_concurrent_processes_keep_every_write():
+    _, shared_task = new_task("shared-processes")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_process, args=(f"process{i}", shared_task, queue))
+        for i in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    outputs = [queue.get(timeout=300) for _ in processes]
+    for process in processes:
+        process.join()
+
+    completed = [task_id for output in outputs for task_id in output[0]]
+    sections = [section for output in outputs for section in output[1]]
+    errors = [error for output in outputs for error in output[2]]
+    assert errors == []
+    assert len(completed) == PROCESSES * THREADS * ITERATIONS
+    assert_completed(completed)
+    saved = crud.get_task_progress(shared_task)["sections"]
+    assert sorted(saved) == sorted(sections)
@@ -0,0 +1,69 @@
+"""스키마 변환이 DB마다 한 번만 실행되는지, 관리 명령의 VACUUM이 지정한 DB 파일에 적용되는지 확인"""
+import json
+import os
+import sqlite3
+
+from app.db import crud
+from app.db.maintenance import vacuum, file_size
+
+
+def open_pool(path):
+    """path에 연결하는 새 연결 풀 (첫 연결에서 스키마 생성/변환 실행)"""
+    pool = crud.ConnectionPool(path)
+    pool.release(pool.acquire())
+    return pool
+
+
+def insert_legacy_result(path, task_id, results):
+    """이전 형식(analysis_results.results에 JSON 전체)으로 결과 저장"""
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO analysis_results (id, file_id, task_id, results, created_at) VALUES (?, ?, ?, ?, '')",
+            (task_id, "file", task_id, json.dumps(results))
+        )
+
+
+def section_names(path, task_id):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT section FROM analysis_sections WHERE task_id = ?", (task_id,))]
+
+
+def user_version(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_results_migrate_once(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    open_pool(path).close_all()
+    assert user_version(path) == crud.SCHEMA_VERSION
+
+    # 이전 버전 DB: 첫 연결에서 섹션으로 옮기고 버전을 올림
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    insert_legacy_result(path, "old", {"summary": {"total_students": 1}})
+    open_pool(path).close_all()
+    assert section_names(path, "old") == ["summary"]
+    assert user_version(path) == crud.SCHEMA_VERSION
+
+    # 변환한 DB는 이후 연결에서 analysis_results를 다시 훑지 않음
+    insert_legacy_result(path, "later", {"summary": {"total_students": 2}})
+    open_pool(path).close_all()
+    assert section_names(path, "later") == []
+
+
+def test_vacuum_uses_given_path(tmp_path):
+    path = str(tmp_path / "other.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE blobs (data BLOB)")
+        conn.executemany("INSERT INTO blobs VALUES (?)", [(os.urandom(4096),) for _ in range(500)])
+        conn.execute("DELETE FROM blobs")
+    before = file_size(path)
+    crud.initialize_db()
+    default_before = file_size(crud.DB_PATH)
+
+    vacuum(path)
+
+    assert file_size(path) < before / 10
+    assert file_size(crud.DB_PATH) == default_before
@@ -0,0 +1,48 @@
+"""분석 프로세스별 공용 풀(AnalysisPool)이 프로세스를 재사용하고 닫을 때 지표 파일을 정리하는지 확인"""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services import metrics
+from app.services.job_executor import AnalysisPool
+
+
+def child_pid():
+    # 이 모듈을 import한 풀 프로세스는 지표 모듈도 import하므로 livesum 게이지 파일을 만든다
+    return os.getpid()
+
+
+def crash():
+    os._exit(1)
+
+
+def livesum_files(pids):
+    return [pid for pid in pids if os.path.exists(os.path.join(metrics.MULTIPROC_DIR, f"gauge_livesum_{pid}.db"))]
+
+
+def test_pool_reuses_processes_and_marks_them_dead():
+    pool = AnalysisPool(2, start_method="spawn")
+    try:
+        pids = {pool.submit(child_pid).result() for _ in range(6)}
+        pids |= {future.result() for future in [pool.submit(child_pid) for _ in range(6)]}
+        # 제출마다 새 프로세스를 만들지 않음
+        assert len(pids) <= 2
+        assert livesum_files(pids) == list(pids)
+    finally:
+        pool.shutdown()
+    assert livesum_files(pids) == []
+
+
+def test_broken_pool_is_replaced():
+    pool = AnalysisPool(1, start_method="spawn")
+    try:
+        crashed = pool.submit(child_pid).result()
+        try:
+            pool.submit(crash).result()
+        except BrokenProcessPool:
+            pass
+        replaced = pool.submit(child_pid).result()
+        assert replaced != crashed
+        # 깨진 풀의 프로세스도 합산에서 제외
+        assert livesum_files([crashed]) == []
+    finally:
+        pool.shutdown()
@@ -0,0 +1,84 @@
+"""app.analysis.kernels가 pandas Series 연산과 같은 결과를 내는지 확인 (비트 단위 비교)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analysis.kernels import describe, mean, category_counts, bucket_counts, BMI_EDGES
+
+
+def pandas_describe(series):
+    return {
+        'mean': series.mean(),
+        'median': series.median(),
+        'std': series.std(),
+        'min': series.min(),
+        'max': series.max(),
+    }
+
+
+def assert_same(actual, expected):
+    for key, value in expected.items():
+        if pd.isna(value):
+            assert np.isnan(actual[key]), key
+        else:
+            assert actual[key] == value, (key, actual[key], value)
+
+
+def make_series(kind, n, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == 'int':
+        return pd.Series(rng.integers(60, 140, n))
+    values = rng.normal(100, 15, n).round(1)
+    if kind == 'float_nan':
+        values[rng.random(n) < 0.05] = np.nan
+    return pd.Series(values)
+
+
+# 10만 행 이상은 표본으로 후보 구간을 좁히는 선택 알고리즘 경로를 탄다
+@pytest.mark.parametrize('kind', ['float', 'float_nan', 'int'])
+@pytest.mark.parametrize('n', [1, 2, 999, 1000, 150_000, 150_001])
+def test_describe_matches_pandas(kind, n):
+    series = make_series(kind, n)
+    assert_same(describe(series), pandas_describe(series))
+
+
+def test_describe_skewed_large_array_matches_pandas():
+    # 값이 한쪽에 몰려 있어 표본 경계 밖으로 벗어나는 경우도 전체 선택으로 정확해야 함
+    values = np.concatenate([np.full(200_000, 100.0), np.random.default_rng(1).normal(100, 1, 1001)])
+    series = pd.Series(values)
+    assert_same(describe(series), pandas_describe(series))
+
+
+@pytest.mark.parametrize('values', [[], [np.nan, np.nan]])
+def test_describe_without_values_is_nan(values):
+    result = describe(pd.Series(values, dtype=np.float64))
+    assert all(np.isnan(value) for value in result.values())
+
+
+@pytest.mark.parametrize('kind', ['float', 'float_nan', 'int'])
+def test_mean_matches_pandas(kind):
+    series = make_series(kind, 10_001)
+    assert mean(series) == series.mean()
+
+
+def test_category_counts_matches_value_counts():
+    labels = ['정상', '전당뇨', '당뇨의심']
+    values = np.random.default_rng(2).choice(labels + [None], 5000)
+    for series in (pd.Series(values), pd.Series(values).astype('category')):
+        counts = series.value_counts()
+        assert category_counts(series, labels) == [counts.get(label, 0) for label in labels]
+    # 범주 목록에 없는 라벨은 0
+    categorical = pd.Series(['정상', '정상']).astype('category')
+    assert category_counts(categorical, labels) == [2, 0, 0]
+
+
+def test_bucket_counts_matches_masks():
+    series = make_series('float_nan', 20_000) / 4
+    series.iloc[:4] = BMI_EDGES.tolist() + [np.nan]
+    expected = [
+        (series < 18.5).sum(),
+        ((series >= 18.5) & (series < 23)).sum(),
+        ((series >= 23) & (series < 25)).sum(),
+        (series >= 25).sum(),
+    ]
+    assert bucket_counts(series).tolist() == expected
@@ -0,0 +1,48 @@
+"""전처리 결과 컬럼 캐시(ParsedFrameCache)가 같은 데이터프레임을 복원하고 수치형 컬럼을 메모리 맵으로 유지하는지 확인"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.cache_service import ParsedFrameCache
+
+
+def memory_mapped(array):
+    """array가 np.memmap의 메모리를 그대로 사용하는지 (base를 따라가며 확인)"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+@pytest.fixture
+def cached(tmp_path, diabetes_data):
+    cache = ParsedFrameCache(str(tmp_path), max_bytes=1 << 30)
+    risk_columns = list(diabetes_data.columns[:6])
+    assert cache.store("key", diabetes_data, risk_columns)
+    return cache.load("key"), risk_columns
+
+
+def test_load_restores_frame(cached, diabetes_data):
+    frame, risk_columns = cached
+    pd.testing.assert_frame_equal(frame.df, diabetes_data)
+    pd.testing.assert_frame_equal(frame.get_diabetes_risk_factors(), diabetes_data[risk_columns])
+
+
+def test_numeric_columns_are_not_copied(cached):
+    # 블록을 합치거나 컬럼을 선택하며 복사하면 캐시를 읽을 때마다 파일 전체가 메모리에 올라감
+    frame, _ = cached
+    for df in (frame.df, frame.get_diabetes_risk_factors()):
+        numeric = df.select_dtypes('number')
+        assert len(numeric.columns) > 0
+        for col in numeric.columns:
+            assert memory_mapped(df[col].to_numpy()), col
+
+
+def test_in_place_changes_do_not_touch_cache(cached, tmp_path):
+    frame, _ = cached
+    col = frame.df.select_dtypes('number').columns[0]
+    original = frame.df[col].to_numpy().copy()
+    frame.df[col].to_numpy()[:] = -1
+    reloaded = ParsedFrameCache(str(tmp_path)).load("key")
+    np.testing.assert_array_equal(reloaded.df[col].to_numpy(), original)
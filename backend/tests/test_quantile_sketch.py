@@ -0,0 +1,61 @@
+"""KLL 분위수 스케치(QuantileSketch)의 순위 오차가 rank_error() 한계 안에 있는지 확인
+
+시드를 고정하므로 결과는 항상 같다.
+"""
+import numpy as np
+import pytest
+
+from app.analysis.accumulators import QuantileSketch
+
+QUANTILES = np.linspace(0.05, 0.95, 19)
+SEEDS = range(10)
+
+
+def rank_errors(sketch, values):
+    """분위수별 정규화 순위 오차 (추정값의 순위 구간이 q를 벗어난 정도)"""
+    ordered = np.sort(values)
+    estimates = sketch.quantile(QUANTILES)
+    lower = np.searchsorted(ordered, estimates, side='left') / len(values)
+    upper = np.searchsorted(ordered, estimates, side='right') / len(values)
+    return np.maximum(lower - QUANTILES, 0) + np.maximum(QUANTILES - upper, 0)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_chunked_updates_within_rank_error(seed):
+    values = np.random.default_rng(seed).lognormal(4.6, 0.2, 200_000)
+    sketch = QuantileSketch(seed=seed)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+
+    assert sketch.n == len(values)
+    assert rank_errors(sketch, values).max() <= QuantileSketch.rank_error()
+    # 보관하는 값 수는 행 수가 아니라 k에 비례
+    assert sum(len(level) for level in sketch.levels) < 4 * sketch.k
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_merged_sketches_within_rank_error(seed):
+    rng = np.random.default_rng(100 + seed)
+    parts = [rng.normal(100 + i, 10, rng.integers(1000, 50_000)) for i in range(8)]
+    sketches = []
+    for i, part in enumerate(parts):
+        sketch = QuantileSketch(seed=i)
+        sketch.update(part)
+        # 결과에 저장했다가 다시 읽은 스케치끼리 병합 (여러 작업을 합치는 경로)
+        sketches.append(QuantileSketch.from_dict(sketch.to_dict()))
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    values = np.concatenate(parts)
+    assert merged.n == len(values)
+    assert rank_errors(merged, values).max() <= QuantileSketch.rank_error()
+    assert merged.quantile(0) == values.min()
+    assert merged.quantile(1) == values.max()
+
+
+def test_small_input_is_exact():
+    values = np.random.default_rng(0).normal(100, 10, 150)
+    sketch = QuantileSketch()
+    sketch.update(values)
+    assert rank_errors(sketch, values).max() == 0
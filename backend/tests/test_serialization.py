@@ -0,0 +1,29 @@
+"""결과 직렬화(dumps)가 NaN/inf를 null로 인코딩하는지 확인 (토큰 치환 경로와 문자열에 따옴표가 있는 경로)"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.serialization import dumps
+
+VALUES = {
+    'nan': float('nan'), 'inf': np.float64('inf'), 'neg_inf': -np.inf,
+    'array': np.array([1.5, np.nan]), 'series': pd.Series([np.inf, 2.0]),
+    'count': np.int64(3), 'flag': np.bool_(True), 'missing': pd.NA,
+}
+EXPECTED = {
+    'nan': None, 'inf': None, 'neg_inf': None, 'array': [1.5, None], 'series': [None, 2.0],
+    'count': 3, 'flag': True, 'missing': None,
+}
+
+
+@pytest.mark.parametrize('message', ['NaN 값 제외', 'NaN이 "Infinity"로 표시됨'])
+def test_nonfinite_values_are_null(message):
+    text = dumps({**VALUES, 'message': message, 'nested': [(np.nan, message)]})
+    assert json.loads(text) == {**EXPECTED, 'message': message, 'nested': [[None, message]]}
+
+
+def test_unknown_type_raises():
+    with pytest.raises(TypeError):
+        dumps({'value': object()})
@@ -0,0 +1,106 @@
+"""스트리밍 모드(청크 누적) 결과가 메모리 모드와 같은지, 회귀분석이 statsmodels와 같은지 확인"""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from app.preprocessing.health_data_processor import HealthDataProcessor, WEIGHT_COLUMN
+from app.analysis.diabetes_analyzer import DiabetesAnalyzer, REGRESSION_COLUMNS
+from app.analysis.streaming_analyzer import StreamingDiabetesAnalyzer, StratifiedStreamingAnalyzer
+from app.services.serialization import dumpb
+
+# 파일 하나가 여러 청크로 나뉘도록 작게 설정
+CHUNKSIZE = 3000
+GLUCOSE = '혈당치_mgdL'
+
+
+def assert_close(actual, expected, path='', rtol=1e-9):
+    """중첩 dict/list 결과를 재귀적으로 비교 (숫자는 상대 오차 rtol 이내, 나머지는 같은 값)"""
+    if isinstance(expected, dict):
+        assert set(actual) == set(expected), (path, set(actual) ^ set(expected))
+        for key in expected:
+            assert_close(actual[key], expected[key], f'{path}/{key}', rtol)
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_close(a, e, f'{path}[{i}]', rtol)
+    elif isinstance(expected, (bool, np.bool_, str)) or expected is None:
+        assert actual == expected, (path, actual, expected)
+    else:
+        assert np.isclose(actual, expected, rtol=rtol, atol=1e-12, equal_nan=True), (path, actual, expected)
+
+
+@pytest.fixture(scope='module')
+def memory(diabetes_data):
+    return DiabetesAnalyzer(diabetes_data, bootstrap=0)
+
+
+@pytest.fixture(scope='module')
+def streaming(survey_csv):
+    return StreamingDiabetesAnalyzer.from_processor(HealthDataProcessor(survey_csv), CHUNKSIZE)
+
+
+@pytest.mark.parametrize('method', [
+    'get_summary_stats', 'correlation_analysis', 'lifestyle_impact_analysis', 'weighted_analysis', 'cube_analysis'
+])
+def test_streaming_matches_memory(memory, streaming, method):
+    assert streaming.total == len(memory.df)
+    # 저장되는 형식(JSON)으로 비교 (큐브 배열 등 NumPy 값 포함)
+    actual, expected = (json.loads(dumpb(getattr(analyzer, method)())) for analyzer in (streaming, memory))
+    assert_close(actual, expected)
+
+
+def test_regression_matches_statsmodels_ols(diabetes_data, memory):
+    df = diabetes_data[REGRESSION_COLUMNS + [GLUCOSE]].dropna()
+    model = sm.OLS(df[GLUCOSE], sm.add_constant(df[REGRESSION_COLUMNS].astype(float))).fit()
+    result = memory.lifestyle_impact_analysis()
+
+    for name in model.params.index:
+        assert_close(result['coefficients'][name]['coefficient'], model.params[name], name, rtol=1e-9)
+        assert np.isclose(result['coefficients'][name]['p_value'], model.pvalues[name], atol=1e-12)
+    assert np.isclose(result['model_summary']['r_squared'], model.rsquared, rtol=1e-9)
+
+
+def test_weighted_regression_matches_statsmodels_wls(diabetes_data, streaming):
+    df = diabetes_data[REGRESSION_COLUMNS + [GLUCOSE, WEIGHT_COLUMN]].dropna()
+    model = sm.WLS(
+        df[GLUCOSE], sm.add_constant(df[REGRESSION_COLUMNS].astype(float)), weights=df[WEIGHT_COLUMN]
+    ).fit()
+    result = streaming.weighted_analysis()['lifestyle_impact']
+
+    for name in model.params.index:
+        assert_close(result['coefficients'][name]['coefficient'], model.params[name], name, rtol=1e-9)
+        assert np.isclose(result['coefficients'][name]['p_value'], model.pvalues[name], atol=1e-12)
+    assert np.isclose(result['model_summary']['r_squared'], model.rsquared, rtol=1e-9)
+
+
+def test_weighted_mean_matches_numpy(diabetes_data, streaming):
+    glucose = diabetes_data[GLUCOSE].to_numpy(dtype=np.float64)
+    weights = diabetes_data[WEIGHT_COLUMN].to_numpy(dtype=np.float64)
+    result = streaming.weighted_analysis()
+    assert np.isclose(result['blood_glucose']['mean'], np.average(glucose, weights=weights), rtol=1e-12)
+
+
+# 혈당수준으로 나누면 혈당치 결측 행이 중앙값이 속한 수준으로 들어가야 함
+@pytest.mark.parametrize('by', [['학년', '성별'], ['혈당수준'], ['학년', '혈당수준'], ['비만여부']])
+def test_stratified_streaming_matches_memory(diabetes_data, survey_csv, by):
+    expected = DiabetesAnalyzer(diabetes_data, bootstrap=0).stratified_analysis(by)
+    analyzer = StratifiedStreamingAnalyzer.from_processor(HealthDataProcessor(survey_csv), by, CHUNKSIZE)
+    assert_close(analyzer.stratified_analysis(), expected)
+
+
+def test_cube_keeps_out_of_range_glucose_in_missing_level(survey_csv, tmp_path):
+    # 혈당치 0 이하 행은 혈당수준만 결측이고 중앙값으로 대체하지 않음 (preprocess()의 fillna와 같은 행만 대체)
+    df = pd.read_csv(survey_csv, encoding='cp949')
+    df.loc[df.index[::500], GLUCOSE] = 0
+    df.loc[df.index[250::500], GLUCOSE] = -5
+    path = tmp_path / 'out_of_range.csv'
+    df.to_csv(path, index=False, encoding='cp949')
+
+    processor = HealthDataProcessor(str(path))
+    processor.preprocess()
+    expected = DiabetesAnalyzer(processor.get_diabetes_risk_factors(), bootstrap=0).cube_analysis()
+    actual = StreamingDiabetesAnalyzer.from_processor(HealthDataProcessor(str(path)), CHUNKSIZE).cube_analysis()
+    assert_close(json.loads(dumpb(actual)), json.loads(dumpb(expected)))
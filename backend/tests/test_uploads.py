@@ -0,0 +1,218 @@
+"""업로드 저장(save_file → MultipartFileWriter)을 동시에 여러 개 실행해 확인
+
+- 대용량 업로드 20개가 진행되는 동안 /api/health 응답 시간이 유휴 상태와 같은 수준인지
+  (파싱/해시/쓰기가 이벤트 루프 밖에서 실행)
+- os.replace로 만든 최종 파일이 업로드한 바이트와 같은지
+- 크기 제한 초과나 끊긴 본문으로 중단되면 .part 파일이 남지 않는지
+"""
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+
+import httpx
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+from app.api.endpoints import uploads
+from app.db.crud import get_file_info
+from app.main import app
+from app.services.auth_service import get_current_user, User
+from app.services import file_service
+from app.services.file_service import save_file, FileTooLargeError, InvalidUploadError
+
+UPLOADS = 20
+UPLOAD_BYTES = 4 * 1024 * 1024
+# 네트워크에서 받는 요청 본문 조각 크기
+RECEIVE_CHUNK = 64 * 1024
+# 이벤트 루프 지연 측정 간격과 허용치 (초)
+TICK_INTERVAL = 0.005
+MAX_LOOP_LAG = 0.1
+# 유휴 상태 health 요청 수와 업로드 중 p95 응답 시간 증가 허용치 (초)
+HEALTH_SAMPLES = 50
+MAX_HEALTH_SLOWDOWN = 0.02
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_service, "UPLOAD_DIR", str(tmp_path))
+    # CapacityLimiter는 이벤트 루프마다 새로 만들어야 함
+    monkeypatch.setattr(file_service, "_writer_limiter", None)
+    return tmp_path
+
+
+def csv_bytes(size, seed):
+    """size 바이트 내외의 서로 다른 CSV 내용 (세 자리 숫자 세 개짜리 12바이트 행)"""
+    rows = np.empty((size // 12, 12), dtype=np.uint8)
+    rows[:, [0, 1, 2, 4, 5, 6, 8, 9, 10]] = np.random.default_rng(seed).integers(ord("0"), ord("9") + 1, (len(rows), 9))
+    rows[:, [3, 7]] = ord(",")
+    rows[:, 11] = ord("\n")
+    return "학년,키_cm,혈당치_mgdL\n".encode("cp949") + rows.tobytes()
+
+
+def multipart_request(content, filename="survey.csv", complete=True):
+    """content를 file 필드로 담은 multipart 요청 (본문은 RECEIVE_CHUNK씩 나눠 전달)"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    if not complete:
+        body = body[:len(body) // 2]
+    chunks = [body[i:i + RECEIVE_CHUNK] for i in range(0, len(body), RECEIVE_CHUNK)]
+
+    async def receive():
+        # 실제 소켓처럼 조각마다 이벤트 루프에 양보
+        await asyncio.sleep(0)
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/upload",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+    }
+    return Request(scope, receive)
+
+
+async def measure_loop_lag(done):
+    """done이 설정될 때까지 TICK_INTERVAL마다 깨어나며 예정보다 늦어진 시간의 최댓값 반환"""
+    worst = 0.0
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        worst = max(worst, time.perf_counter() - started - TICK_INTERVAL)
+    return worst
+
+
+def part_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".part")]
+
+
+def latency_stats(latencies):
+    """(p95, 최댓값) 초"""
+    return float(np.percentile(latencies, 95)), max(latencies)
+
+
+def test_health_latency_flat_during_concurrent_uploads(upload_dir, monkeypatch):
+    # 분석 작업은 등록만 하고 실행하지 않음 (업로드 경로만 측정)
+    monkeypatch.setattr(uploads.job_executor, "submit", lambda *args, **kwargs: None)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: User(id=1, username="test", email=""))
+    contents = [csv_bytes(UPLOAD_BYTES, seed) for seed in range(UPLOADS)]
+
+    async def upload(http, content):
+        boundary = uuid.uuid4().hex
+        head = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="survey.csv"\r\n'
+            "Content-Type: text/csv\r\n\r\n"
+        ).encode()
+
+        async def body():
+            # 실제 소켓처럼 RECEIVE_CHUNK씩 나눠 보내며 조각마다 이벤트 루프에 양보
+            yield head
+            for start in range(0, len(content), RECEIVE_CHUNK):
+                await asyncio.sleep(0)
+                yield content[start:start + RECEIVE_CHUNK]
+            yield f"\r\n--{boundary}--\r\n".encode()
+
+        headers = {"content-type": f"multipart/form-data; boundary={boundary}"}
+        return await http.post("/api/upload", content=body(), headers=headers)
+
+    async def health_latencies(http, until):
+        """until이 끝날 때까지(None이면 HEALTH_SAMPLES번) TICK_INTERVAL마다 보낸 /api/health의 응답 시간 목록
+
+        요청 예정 시각부터 재므로 이벤트 루프가 막혀 요청을 늦게 처리한 시간도 포함된다.
+        """
+        latencies = []
+        while len(latencies) < HEALTH_SAMPLES if until is None else not until.done():
+            scheduled = time.perf_counter() + TICK_INTERVAL
+            await asyncio.sleep(TICK_INTERVAL)
+            response = await http.get("/api/health")
+            latencies.append(time.perf_counter() - scheduled)
+            assert response.status_code == 200
+        return latencies
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as http:
+            # 첫 요청의 초기화 비용은 기준에서 제외
+            await http.get("/api/health")
+            idle = await health_latencies(http, None)
+            uploading = asyncio.ensure_future(asyncio.gather(*[upload(http, content) for content in contents]))
+            busy = await health_latencies(http, uploading)
+            return idle, busy, await uploading
+
+    idle, busy, responses = asyncio.run(run())
+
+    idle_p95, _ = latency_stats(idle)
+    busy_p95, busy_max = latency_stats(busy)
+    # p95를 구할 만큼 업로드와 겹쳐 측정했는지
+    assert len(busy) >= 10
+    assert busy_p95 < idle_p95 + MAX_HEALTH_SLOWDOWN
+    assert busy_max < idle_p95 + MAX_LOOP_LAG
+    assert part_files(upload_dir) == []
+    for response, content in zip(responses, contents):
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "pending" and "deduplicated" not in body
+        file_info = get_file_info(body["file_id"])
+        with open(file_info["path"], "rb") as f:
+            assert f.read() == content
+        assert file_info["file_size"] == len(content)
+        assert file_info["content_hash"] == hashlib.sha256(content).hexdigest()
+
+
+def test_slow_disk_does_not_block_loop(upload_dir, monkeypatch):
+    # 쓰기마다 허용치보다 오래 걸리는 디스크: 쓰기가 이벤트 루프에서 실행되면 지연이 허용치를 넘음
+    write = file_service.MultipartFileWriter.write
+
+    def slow_write(self, chunks):
+        time.sleep(2 * MAX_LOOP_LAG)
+        write(self, chunks)
+
+    monkeypatch.setattr(file_service.MultipartFileWriter, "write", slow_write)
+    monkeypatch.setattr(file_service, "UPLOAD_WRITERS", 4)
+    contents = [csv_bytes(2 * 1024 * 1024, 300 + seed) for seed in range(4)]
+
+    async def run():
+        done = asyncio.Event()
+        lag = asyncio.create_task(measure_loop_lag(done))
+        results = await asyncio.gather(*[save_file(multipart_request(content), 1) for content in contents])
+        done.set()
+        return results, await lag
+
+    results, worst_lag = asyncio.run(run())
+
+    assert worst_lag < MAX_LOOP_LAG
+    for result, content in zip(results, contents):
+        with open(get_file_info(result["file_id"])["path"], "rb") as f:
+            assert f.read() == content
+
+
+def test_size_cap_abort_leaves_no_part_file(upload_dir, monkeypatch):
+    monkeypatch.setattr(file_service, "MAX_FILE_SIZE", 1024 * 1024)
+    contents = [csv_bytes(3 * 1024 * 1024, 100 + seed) for seed in range(3)]
+
+    async def run():
+        return await asyncio.gather(
+            *[save_file(multipart_request(content), 1) for content in contents], return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, FileTooLargeError) for result in results)
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.parametrize("request_kwargs", [{"complete": False}, {"filename": "survey.xlsx"}])
+def test_invalid_upload_leaves_no_part_file(upload_dir, request_kwargs):
+    content = csv_bytes(2 * 1024 * 1024, 200)
+
+    with pytest.raises(InvalidUploadError):
+        asyncio.run(save_file(multipart_request(content, **request_kwargs), 1))
+    assert os.listdir(upload_dir) == []
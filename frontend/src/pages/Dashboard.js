@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
-import { Layout, Spin, Tabs, Card, Statistic, Row, Col, Typography, Alert } from 'antd';
+import { Layout, Spin, Tabs, Card, Statistic, Row, Col, Typography, Alert, Progress } from 'antd';
 import { UserOutlined, AlertOutlined, BarChartOutlined, HeartOutlined } from '@ant-design/icons';
-import { fetchAnalysisResults } from '../services/api';
+import { fetchAnalysisResults, streamAnalysisEvents } from '../services/api';
 import DiabetesRiskChart from '../components/charts/DiabetesRiskChart';
 import BMIDistributionChart from '../components/charts/BMIDistributionChart';
 import CorrelationHeatmap from '../components/charts/CorrelationHeatmap';
@@ -12,39 +12,121 @@ const { Header, Content, Footer } = Layout;
 const { TabPane } = Tabs;
 const { Title, Paragraph } = Typography;
 
+// 분석 단계 표시 이름
+const STAGE_LABELS = {
+  sampling: '표본 분석 중',
+  loading: '파일 읽는 중',
+  preprocessing: '전처리 중',
+  summary: '요약 통계 계산 중',
+  correlation: '상관관계 분석 중',
+  regression: '회귀분석 중',
+  weighted: '가중 분석 중',
+  sketch: '분위수 스케치 생성 중',
+  cube: '집계 큐브 생성 중',
+  saving: '결과 저장 중',
+};
+
 const Dashboard = ({ fileId, taskId }) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [analysisData, setAnalysisData] = useState(null);
+  const [progress, setProgress] = useState(null);
+  // 섹션별 결과 버전 (provisional: 표본 기반 임시 결과, exact: 전체 데이터 결과)
+  const [versions, setVersions] = useState({});
   
   useEffect(() => {
-    // 분석 결과 가져오기
+    const controller = new AbortController();
+    let pollTimer = null;
+
+    // 탭에 필요한 섹션은 요약 카드를 먼저 표시한 뒤 불러옴
+    const fetchDetails = async () => {
+      try {
+        const [correlations, lifestyle] = await Promise.all([
+          fetchAnalysisResults(taskId, { sections: ['correlations'], fields: ['glucose_correlation'] }),
+          fetchAnalysisResults(taskId, { sections: ['lifestyle_impact'] }),
+        ]);
+        setAnalysisData((prev) => ({ ...prev, ...correlations.data, ...lifestyle.data }));
+      } catch (err) {
+        console.error('상세 분석 결과를 불러오는 중 오류:', err);
+      }
+    };
+
+    // 스트림을 사용할 수 없을 때: 분석 결과 폴링 (첫 화면에는 요약 통계만 필요)
     const fetchData = async () => {
       try {
-        const result = await fetchAnalysisResults(taskId);
+        const result = await fetchAnalysisResults(taskId, { sections: ['summary'] });
         if (result.status === 'completed') {
           setAnalysisData(result.data);
+          setVersions({});
           setLoading(false);
-        } else if (result.status === 'processing') {
-          // 아직 처리 중이면 5초 후 다시 시도
-          setTimeout(fetchData, 5000);
+          fetchDetails();
+        } else if (result.status === 'pending' || result.status === 'processing') {
+          // 처리 중에도 먼저 저장된 결과(표본 기반 임시 결과 포함)가 있으면 표시
+          if (result.data && result.data.summary) {
+            setAnalysisData((prev) => ({ ...prev, ...result.data }));
+            setVersions(result.versions || {});
+            setLoading(false);
+          }
+          // 대기 중이거나 처리 중이면 5초 후 다시 시도
+          pollTimer = setTimeout(fetchData, 5000);
         } else {
-          throw new Error('분석 작업이 실패했습니다.');
+          throw new Error(result.error || '분석 작업이 실패했습니다.');
         }
       } catch (err) {
         setError(err.message || '데이터를 불러오는 중 오류가 발생했습니다.');
         setLoading(false);
       }
     };
+
+    // 진행 상황 스트림: 섹션이 끝나는 대로 표시 (요약 통계가 오면 대시보드 표시)
+    const streamData = async () => {
+      try {
+        const result = await streamAnalysisEvents(taskId, {
+          onProgress: setProgress,
+          onSection: (section, data, version) => {
+            setAnalysisData((prev) => ({ ...prev, [section]: data }));
+            setVersions((prev) => ({ ...prev, [section]: version }));
+            if (section === 'summary') setLoading(false);
+          },
+        }, controller.signal);
+        if (result.status === 'failed') {
+          setError(result.error || '분석 작업이 실패했습니다.');
+        }
+        setLoading(false);
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error('진행 상황 스트림 오류, 폴링으로 전환:', err);
+        fetchData();
+      }
+    };
     
-    fetchData();
+    streamData();
+
+    return () => {
+      controller.abort();
+      clearTimeout(pollTimer);
+    };
   }, [taskId]);
   
   if (loading) {
+    const percent = progress && progress.rows_total
+      ? Math.round((progress.rows_processed || 0) / progress.rows_total * 100)
+      : null;
     return (
       <div style={{ textAlign: 'center', padding: '100px 0' }}>
         <Spin size="large" />
-        <p style={{ marginTop: 20 }}>분석 결과를 불러오는 중입니다...</p>
+        <p style={{ marginTop: 20 }}>
+          {progress && progress.stage ? STAGE_LABELS[progress.stage] || progress.stage : '분석 결과를 불러오는 중입니다...'}
+        </p>
+        {percent !== null && (
+          <div style={{ maxWidth: 400, margin: '0 auto' }}>
+            <Progress percent={percent} status="active" />
+            <p>
+              {progress.rows_processed.toLocaleString()} / {progress.rows_total.toLocaleString()} 행
+              {progress.eta_seconds !== null && ` · 약 ${Math.ceil(progress.eta_seconds)}초 남음`}
+            </p>
+          </div>
+        )}
       </div>
     );
   }
@@ -62,6 +144,7 @@ const Dashboard = ({ fileId, taskId }) => {
   }
   
   const { summary, correlations, lifestyle_impact } = analysisData;
+  const provisional = Object.values(versions).includes('provisional');
   
   return (
     <Layout>
@@ -70,6 +153,20 @@ const Dashboard = ({ fileId, taskId }) => {
       </Header>
       
       <Content style={{ padding: '20px' }}>
+        {provisional && (
+          <Alert
+            type="info"
+            showIcon
+            style={{ marginBottom: '20px' }}
+            message="표본 기반 임시 결과"
+            description={
+              `전체 약 ${summary.sample ? summary.sample.estimated_total_rows.toLocaleString() : '-'}행 중 `
+              + `${summary.sample ? summary.sample.rows.toLocaleString() : '-'}행 무작위 표본으로 계산한 결과입니다. `
+              + '전체 데이터 분석이 끝나면 정확한 결과로 바뀝니다'
+              + (progress && progress.stage ? ` (${STAGE_LABELS[progress.stage] || progress.stage}).` : '.')
+            }
+          />
+        )}
         {/* 요약 통계 카드 */}
         <Row gutter={[16, 16]} style={{ marginBottom: '20px' }}>
           <Col span={6}>
@@ -85,9 +85,78 @@ export const uploadHealthData = async (file) => {
 };
 
 // 분석 결과 가져오기
-export const fetchAnalysisResults = async (taskId) => {
+// sections/fields를 지정하면 해당 섹션(예: ['summary'])과 항목(예: ['glucose_correlation'])만 받음
+// 응답의 version은 exact(전체 데이터) 또는 provisional(점진 모드 표본 결과, 처리 중에만)
+export const fetchAnalysisResults = async (taskId, { sections, fields } = {}) => {
   try {
-    const response = await api.get(`/analysis/${taskId}`);
+    const params = {};
+    if (sections) params.sections = sections.join(',');
+    if (fields) params.fields = fields.join(',');
+
+    const response = await api.get(`/analysis/${taskId}`, { params });
+    return response.data;
+  } catch (error) {
+    throw error;
+  }
+};
+
+// 분석 진행 상황 스트림 구독 (Server-Sent Events)
+// EventSource는 Authorization 헤더를 보낼 수 없으므로 fetch 스트림을 직접 파싱함
+// handlers: { onProgress, onSection } / 마지막 이벤트(completed 또는 failed)의 data로 resolve
+export const streamAnalysisEvents = async (taskId, { onProgress, onSection } = {}, signal) => {
+  const headers = { Accept: 'text/event-stream' };
+  const token = localStorage.getItem('token');
+  if (token) {
+    headers.Authorization = `Bearer ${token}`;
+  }
+
+  const response = await fetch(`${API_URL}/analysis/${taskId}/events`, { headers, signal });
+  if (!response.ok) {
+    throw new Error(`진행 상황을 불러오지 못했습니다 (HTTP ${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder('utf-8');
+  let buffer = '';
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      throw new Error('진행 상황 스트림이 종료되었습니다.');
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // 이벤트는 빈 줄로 구분됨
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      block.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      });
+      if (!data) continue;  // 연결 유지용 주석
+
+      const payload = JSON.parse(data);
+      if (event === 'progress' && onProgress) onProgress(payload);
+      else if (event === 'section' && onSection) onSection(payload.section, payload.data, payload.version);
+      else if (event === 'completed' || event === 'failed') {
+        reader.cancel();
+        return payload;
+      }
+    }
+  }
+};
+
+// 그룹(예: 학년×성별)별 분석 결과 가져오기
+export const fetchStratifiedResults = async (taskId, by = ['학년', '성별']) => {
+  try {
+    const response = await api.get(`/analysis/${taskId}/stratified`, {
+      params: { by: by.join(',') },
+    });
     return response.data;
   } catch (error) {
     throw error;